@@ -190,6 +190,17 @@ RETURNS timestamptz AS $$
     ;
 $$ LANGUAGE SQL IMMUTABLE STRICT;
 
+-- stac_q_tsvector: the full-text vector matched by the q operator, over the description, title
+-- and keywords of an item's properties or of a collection. Stored in collections.q_tsv and, with
+-- q_tsvector on, in items.q_tsv.
+CREATE OR REPLACE FUNCTION stac_q_tsvector(properties jsonb)
+RETURNS tsvector AS $$
+    SELECT
+        to_tsvector('english', coalesce(properties->>'description', '')) ||
+        to_tsvector('english', coalesce(properties->>'title', '')) ||
+        to_tsvector('english', coalesce(properties->>'keywords', ''));
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+
 -- Drop function signatures whose argument lists changed (CREATE OR REPLACE cannot alter them)
 DROP FUNCTION IF EXISTS chunker(pred_envelope);
 DROP FUNCTION IF EXISTS search_bands(pred_envelope, boolean, integer, integer);
@@ -211,6 +222,9 @@ DROP FUNCTION IF EXISTS search_page(jsonb, integer, text, boolean);
 DROP FUNCTION IF EXISTS search_plan(jsonb, text);
 DROP FUNCTION IF EXISTS search_query(jsonb, boolean, jsonb);
 DROP FUNCTION IF EXISTS where_stats(text, text, boolean, jsonb);
+DROP FUNCTION IF EXISTS where_stats(text, text, boolean, jsonb, text);
+DROP FUNCTION IF EXISTS where_stats(text, text, boolean, jsonb, text, jsonb);
+DROP FUNCTION IF EXISTS partition_stats_count(jsonb);
 DROP FUNCTION IF EXISTS keyset_sortkeys(jsonb);
 DROP FUNCTION IF EXISTS paging_dtrange(jsonb);
 DROP FUNCTION IF EXISTS paging_collections(jsonb);
@@ -221,4 +235,5 @@ DROP FUNCTION IF EXISTS sort_dir_to_op(text, boolean);
 DROP FUNCTION IF EXISTS sort_sqlorderby(jsonb, boolean);
 DROP FUNCTION IF EXISTS parse_sort_dir(text, boolean);
 DROP FUNCTION IF EXISTS cql2_envelope_safe(jsonb);
+DROP FUNCTION IF EXISTS fields_to_itemcols(jsonb);
 DROP TABLE IF EXISTS search_wheres;
@@ -63,6 +63,38 @@ CREATE OR REPLACE FUNCTION readonly(conf jsonb DEFAULT NULL) RETURNS boolean AS
     SELECT pgstac.get_setting_bool('readonly', conf);
 $$ LANGUAGE SQL;
 
+CREATE OR REPLACE FUNCTION use_item_lookup(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('use_item_lookup', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION page_cache(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('page_cache', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION page_cache_ttl(conf jsonb DEFAULT NULL) RETURNS interval AS $$
+  SELECT pgstac.get_setting('page_cache_ttl', conf)::interval;
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION compiled_searches(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('compiled_searches', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION prepared_searches(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('prepared_searches', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION defer_search_usage(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('defer_search_usage', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION exact_partition_counts(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('exact_partition_counts', conf);
+$$ LANGUAGE SQL;
+
+CREATE OR REPLACE FUNCTION q_tsvector(conf jsonb DEFAULT NULL) RETURNS boolean AS $$
+    SELECT pgstac.get_setting_bool('q_tsvector', conf);
+$$ LANGUAGE SQL;
+
 CREATE OR REPLACE FUNCTION context(conf jsonb DEFAULT NULL) RETURNS text AS $$
   SELECT pgstac.get_setting('context', conf);
 $$ LANGUAGE SQL;
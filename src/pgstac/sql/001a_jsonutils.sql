@@ -364,6 +364,16 @@ CREATE OR REPLACE FUNCTION jsonb_merge_recursive(frag jsonb, item jsonb) RETURNS
     END;
 $$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
 
+-- jsonb_merge_member: The value of one key of jsonb_merge_recursive(frag, item), NULL when
+-- neither side has the key. Lets a sparse fields projection merge a single asset or property
+-- instead of the whole object.
+CREATE OR REPLACE FUNCTION jsonb_merge_member(frag jsonb, item jsonb, _key text) RETURNS jsonb AS $$
+    SELECT CASE
+        WHEN item ? _key THEN jsonb_merge_recursive(frag -> _key, item -> _key)
+        WHEN frag ? _key THEN frag -> _key
+    END;
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+
 
 CREATE OR REPLACE FUNCTION jsonb_include(j jsonb, f jsonb) RETURNS jsonb AS $$
 DECLARE
@@ -411,8 +421,13 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL IMMUTABLE;
 
+-- jsonb_fields: Apply a STAC fields include/exclude. Returns j untouched when f has neither, which
+-- folds away at plan time when f is a constant.
 CREATE OR REPLACE FUNCTION jsonb_fields(j jsonb, f jsonb DEFAULT '{"fields":[]}') RETURNS jsonb AS $$
-    SELECT jsonb_exclude(jsonb_include(j, f), f);
+    SELECT CASE
+        WHEN f ?| ARRAY['include', 'exclude'] THEN jsonb_exclude(jsonb_include(j, f), f)
+        ELSE j
+    END;
 $$ LANGUAGE SQL IMMUTABLE;
 
 
@@ -63,8 +63,11 @@ CREATE TABLE IF NOT EXISTS collections (
     datetime timestamptz GENERATED ALWAYS AS (pgstac.collection_datetime(content)) STORED,
     end_datetime timestamptz GENERATED ALWAYS AS (pgstac.collection_enddatetime(content)) STORED,
     private jsonb,
-    partition_trunc text CHECK (partition_trunc IN ('year', 'month'))
+    partition_trunc text CHECK (partition_trunc IN ('year', 'month')),
+    q_tsv tsvector GENERATED ALWAYS AS (pgstac.stac_q_tsvector(content)) STORED
 );
+-- q_tsv is generated so it is never NULL; collection search matches q against it directly.
+CREATE INDEX IF NOT EXISTS collections_q_tsv_idx ON collections USING gin (q_tsv);
 
 -- create_collection: Insert a new collection.
 -- _partition_trunc: optional 'year' or 'month' sub-partitioning; defaults to none.
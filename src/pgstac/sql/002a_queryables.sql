@@ -277,6 +277,7 @@ SELECT
     i.indexname,
     regexp_replace(btrim(replace(replace(indexdef, i.indexname, ''),'pgstac.',''),' \t\n'), '[ ]+', ' ', 'g') as idx,
     COALESCE(
+        CASE WHEN indexdef ~ '\mq_tsv\M' THEN 'q_tsv' END,
         substring(indexdef FROM '\(([a-zA-Z0-9_]+)\)'),
         substring(indexdef FROM '\(content -> ''properties''::text\) -> ''([a-zA-Z0-9\:\_-]+)''::text'),
         CASE WHEN indexdef ~* '\(datetime desc, end_datetime\)' THEN 'datetime' ELSE NULL END
@@ -295,6 +296,7 @@ SELECT
     i.indexname,
     indexdef,
     COALESCE(
+        CASE WHEN indexdef ~ '\mq_tsv\M' THEN 'q_tsv' END,
         substring(indexdef FROM '\(([a-zA-Z0-9_]+)\)'),
         substring(indexdef FROM '\(content -> ''properties''::text\) -> ''([a-zA-Z0-9\:\_]+)''::text'),
         CASE WHEN indexdef ~* '\(datetime desc, end_datetime\)' THEN 'datetime_end_datetime' ELSE NULL END
@@ -341,6 +343,7 @@ WITH p AS (
             indexname,
             regexp_replace(btrim(replace(replace(indexdef, indexname, ''),'pgstac.',''),' \t\n'), '[ ]+', ' ', 'g') as iidx,
             COALESCE(
+                CASE WHEN indexdef ~ '\mq_tsv\M' THEN 'q_tsv' END,
                 substring(indexdef FROM '\(([a-zA-Z0-9_]+)\)'),
                 substring(indexdef FROM '\(content -> ''properties''::text\) -> ''([a-zA-Z0-9\:\_-]+)''::text'),
                 CASE WHEN indexdef ~* '\(datetime desc, end_datetime\)' THEN 'datetime' ELSE NULL END
@@ -357,6 +360,10 @@ WITH p AS (
         FROM queryables, unnest_collection(queryables.collection_ids) collection
             JOIN p USING (collection)
         WHERE property_index_type IS NOT NULL OR name IN ('datetime','geometry','id')
+        UNION ALL
+        SELECT 'q_tsv', collection, partition, format('CREATE INDEX ON %I USING gin (COALESCE(q_tsv, stac_q_tsvector(properties)))', partition)
+        FROM p
+        WHERE q_tsvector()
     )
     SELECT
         collection,
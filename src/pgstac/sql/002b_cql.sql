@@ -222,16 +222,16 @@ $$
 LANGUAGE plpgsql;
 
 -- q_op_query: SQL predicate for the pgstac `q` full-text operator. args is the search term(s)
--- (a string or array of strings, the STAC `q` parameter); it is matched against a tsvector
--- built from the row's description/title/keywords. Modeled on spatial_op_query /
--- temporal_op_query so full-text is a first-class CQL2 op.
+-- (a string or array of strings, the STAC `q` parameter); it is matched against the tsvector of
+-- the row's description/title/keywords (stac_q_tsvector). With q_tsvector on, the stored q_tsv
+-- column of items is matched instead, falling back to stac_q_tsvector for rows update_q_tsvector
+-- has not backfilled yet; the per-partition GIN indexes are built on that same expression so they
+-- apply. collection_search_plan rewrites the predicate to the always-filled collections q_tsv. Modeled on spatial_op_query / temporal_op_query so full-text is
+-- a first-class CQL2 op.
 CREATE OR REPLACE FUNCTION q_op_query(args jsonb) RETURNS text AS $$
     SELECT format(
-        $q$(
-            to_tsvector('english', coalesce(properties->>'description', '')) ||
-            to_tsvector('english', coalesce(properties->>'title', '')) ||
-            to_tsvector('english', coalesce(properties->>'keywords', ''))
-        ) @@ %L$q$,
+        '%s @@ %L',
+        CASE WHEN q_tsvector() THEN 'COALESCE(q_tsv, stac_q_tsvector(properties))' ELSE 'stac_q_tsvector(properties)' END,
         q_to_tsquery(args)
     );
 $$ LANGUAGE SQL STABLE;
@@ -53,18 +53,62 @@ CREATE OR REPLACE FUNCTION keyset_orderby(_search jsonb, _prev boolean DEFAULT f
     FROM keyset_sortkeys(_search);
 $$ LANGUAGE sql STABLE;
 
--- Build a multi-level WHERE clause for keyset seek from token values.
--- Handles NULLS FIRST/LAST and direction-aware comparisons.
-CREATE OR REPLACE FUNCTION keyset_where(_search jsonb, _values text[], prev boolean DEFAULT false)
-RETURNS text AS $$
+-- keyset_sortkeys_typed: keyset_sortkeys as a jsonb array with the SQL type of each expression,
+-- as stored by search_compile for keyset_where_sortkeys' parameter mode. Sort expressions are
+-- items columns or a wrapper function over a path (queryable()), so the type is read from the
+-- catalog; only other expressions are typed by evaluating them.
+CREATE OR REPLACE FUNCTION keyset_sortkeys_typed(_search jsonb) RETURNS jsonb AS $$
+DECLARE
+    k record;
+    typ text;
+    out jsonb := '[]'::jsonb;
+BEGIN
+    FOR k IN
+        SELECT s.*, coalesce(
+            (SELECT format_type(a.atttypid, NULL) FROM pg_attribute a
+             WHERE a.attrelid = 'pgstac.items'::regclass AND a.attname = s.expr
+             AND a.attnum > 0 AND NOT a.attisdropped),
+            (SELECT CASE WHEN count(DISTINCT p.prorettype) = 1
+                         THEN format_type(min(p.prorettype), NULL) END
+             FROM pg_proc p
+             WHERE p.pronamespace = 'pgstac'::regnamespace
+             AND p.proname = substring(s.expr FROM '^"?([a-z_][a-z0-9_]*)"?\(')
+             HAVING count(*) > 0)
+        ) AS catalog_type
+        FROM keyset_sortkeys(_search) s ORDER BY s.ord
+    LOOP
+        typ := k.catalog_type;
+        IF typ IS NULL THEN
+            EXECUTE format('SELECT pg_typeof(%s)::text FROM (SELECT (NULL::items).*) i', k.expr) INTO typ;
+        END IF;
+        out := out || jsonb_build_object(
+            'ord', k.ord, 'field', k.field, 'expr', k.expr, 'dir', k.dir, 'notnull', k.notnull, 'type', typ);
+    END LOOP;
+    RETURN out;
+END;
+$$ LANGUAGE PLPGSQL STABLE;
+
+-- keyset_where_sortkeys: keyset_where over sort keys given as a jsonb array (keyset_sortkeys
+-- rows). With _param (e.g. '$4') the token values are not inlined: value n is referenced as
+-- ($4[n])::type, using each key's type from keyset_sortkeys_typed, so the clause only depends on
+-- which values are NULL and pages of the same search share one query text.
+CREATE OR REPLACE FUNCTION keyset_where_sortkeys(
+    _sortkeys jsonb, _values text[], prev boolean DEFAULT false, _param text DEFAULT NULL
+) RETURNS text AS $$
 DECLARE
     k record; vlit text; orterm text;
     andfilters text[] := '{}'::text[];
     orfilters  text[] := '{}'::text[];
 BEGIN
     IF _values IS NULL THEN RETURN NULL; END IF;
-    FOR k IN SELECT * FROM keyset_sortkeys(_search) ORDER BY ord LOOP
-        vlit := CASE WHEN _values[k.ord] IS NULL THEN NULL ELSE quote_literal(_values[k.ord]) END;
+    FOR k IN
+        SELECT * FROM jsonb_to_recordset(_sortkeys) AS t(ord int, expr text, dir text, notnull boolean, type text)
+        ORDER BY ord
+    LOOP
+        vlit := CASE
+            WHEN _values[k.ord] IS NULL THEN NULL
+            WHEN _param IS NOT NULL THEN format('(%s[%s])::%s', _param, k.ord, k.type)
+            ELSE quote_literal(_values[k.ord]) END;
         orterm := NULL;
         IF vlit IS NOT NULL AND ((prev AND k.dir='ASC') OR (NOT prev AND k.dir='DESC')) THEN
             orterm := format('(%s < %s)', k.expr, vlit);
@@ -92,6 +136,15 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL STABLE;
 
+-- Build a multi-level WHERE clause for keyset seek from token values.
+-- Handles NULLS FIRST/LAST and direction-aware comparisons.
+CREATE OR REPLACE FUNCTION keyset_where(_search jsonb, _values text[], prev boolean DEFAULT false)
+RETURNS text AS $$
+    SELECT keyset_where_sortkeys(
+        (SELECT jsonb_agg(to_jsonb(k) ORDER BY k.ord) FROM keyset_sortkeys(_search) k),
+        _values, prev);
+$$ LANGUAGE SQL STABLE;
+
 -- Extract sort direction (ASC/DESC) from a sortby JSON element.
 CREATE OR REPLACE FUNCTION get_sort_dir(sort_item jsonb) RETURNS text AS $$
     SELECT CASE WHEN sort_item->>'direction' ILIKE 'desc%' THEN 'DESC' ELSE 'ASC' END;
@@ -95,7 +95,10 @@ CREATE TABLE items (
     link_hrefs text[],
     -- Operator-private metadata: not returned by the STAC API, not included in
     -- item_hash, not part of the dehydrate/hydrate path. Set via direct UPDATE.
-    private jsonb
+    private jsonb,
+    -- Full-text vector used by the q operator (stac_q_tsvector of the properties). Only filled
+    -- while the q_tsvector setting is on; update_q_tsvector backfills existing rows.
+    q_tsv tsvector
 )
 PARTITION BY LIST (collection)
 ;
@@ -124,6 +127,17 @@ CREATE TABLE IF NOT EXISTS item_field_registry (
 );
 CREATE INDEX IF NOT EXISTS item_field_registry_path_idx ON item_field_registry (path);
 
+-- Optional global id lookup. Unique id indexes only exist per leaf partition, so
+-- a lookup by id alone has to probe every partition. When use_item_lookup is
+-- enabled, this table is maintained by the items triggers and maps each id to the
+-- collection and datetime needed to prune to a single partition.
+CREATE TABLE IF NOT EXISTS item_lookup (
+    id text NOT NULL,
+    collection text NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+    datetime timestamptz NOT NULL,
+    PRIMARY KEY (id, collection)
+);
+
 CREATE INDEX "datetime_idx" ON items USING BTREE (datetime DESC, end_datetime ASC);
 CREATE INDEX "geometry_idx" ON items USING GIST (geometry);
 CREATE INDEX IF NOT EXISTS items_fragment_id_idx ON items (fragment_id) WHERE fragment_id IS NOT NULL;
@@ -153,6 +167,125 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL SECURITY DEFINER;
 
+-- partition_count_triggerfunc: keep partition_stats current as items are inserted, updated and
+-- deleted, including while update_partition_stats is queued. exact_n follows the rows, dtrange
+-- and edtrange are widened to cover the written rows (never narrowed, so a stale range is only
+-- ever too wide), and last_updated and the writes counter are bumped for every partition
+-- written. The stats rows are locked in partition order first, so concurrent writers touching
+-- several partitions cannot deadlock. With exact_partition_counts off, the partitions are only
+-- marked as written (exact_n unknown until recounted, writes bumped) without counting the rows.
+-- Its triggers are named to fire before the items_after_* stats triggers below, so a
+-- synchronous recount by update_partition_stats always has the last word. Rows written directly
+-- to a partition do not fire it; writers doing that call partition_written instead.
+CREATE OR REPLACE FUNCTION partition_count_triggerfunc() RETURNS TRIGGER AS $$
+DECLARE
+    _partitions text[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT item_lookup_partition(c.key, c.partition_trunc, r.datetime)) INTO _partitions
+        FROM new_rows r JOIN collections c ON c.id = r.collection;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT item_lookup_partition(c.key, c.partition_trunc, r.datetime)) INTO _partitions
+        FROM old_rows r JOIN collections c ON c.id = r.collection;
+    ELSE
+        SELECT array_agg(DISTINCT item_lookup_partition(c.key, c.partition_trunc, r.datetime)) INTO _partitions
+        FROM (
+            SELECT collection, datetime FROM new_rows
+            UNION ALL
+            SELECT collection, datetime FROM old_rows
+        ) r JOIN collections c ON c.id = r.collection;
+    END IF;
+    PERFORM 1 FROM partition_stats
+    WHERE partition = ANY(_partitions)
+    ORDER BY partition
+    FOR UPDATE;
+
+    IF NOT exact_partition_counts() THEN
+        UPDATE partition_stats SET
+            exact_n = NULL,
+            last_updated = now(),
+            writes = writes + 1
+        WHERE partition = ANY(_partitions);
+    ELSIF TG_OP = 'INSERT' THEN
+        UPDATE partition_stats ps SET
+            exact_n = ps.exact_n + d.n,
+            dtrange = range_merge(ps.dtrange, d.dtrange),
+            edtrange = range_merge(ps.edtrange, d.edtrange),
+            last_updated = now(),
+            writes = ps.writes + 1
+        FROM (
+            SELECT
+                item_lookup_partition(c.key, c.partition_trunc, r.datetime) AS partition,
+                count(*) AS n,
+                tstzrange(min(r.datetime), max(r.datetime), '[]') AS dtrange,
+                tstzrange(min(r.end_datetime), max(r.end_datetime), '[]') AS edtrange
+            FROM new_rows r JOIN collections c ON c.id = r.collection
+            GROUP BY 1
+        ) d
+        WHERE ps.partition = d.partition;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE partition_stats ps SET
+            exact_n = ps.exact_n - d.n,
+            last_updated = now(),
+            writes = ps.writes + 1
+        FROM (
+            SELECT item_lookup_partition(c.key, c.partition_trunc, r.datetime) AS partition, count(*) AS n
+            FROM old_rows r JOIN collections c ON c.id = r.collection
+            GROUP BY 1
+        ) d
+        WHERE ps.partition = d.partition;
+    ELSE
+        UPDATE partition_stats ps SET
+            exact_n = ps.exact_n + d.n,
+            dtrange = coalesce(range_merge(ps.dtrange, d.dtrange), ps.dtrange),
+            edtrange = coalesce(range_merge(ps.edtrange, d.edtrange), ps.edtrange),
+            last_updated = now(),
+            writes = ps.writes + 1
+        FROM (
+            SELECT
+                item_lookup_partition(c.key, c.partition_trunc, r.datetime) AS partition,
+                sum(r.n) AS n,
+                -- Only the new rows widen the ranges; NULL when the partition only lost rows.
+                CASE WHEN bool_or(r.n > 0) THEN tstzrange(
+                    min(r.datetime) FILTER (WHERE r.n > 0), max(r.datetime) FILTER (WHERE r.n > 0), '[]'
+                ) END AS dtrange,
+                CASE WHEN bool_or(r.n > 0) THEN tstzrange(
+                    min(r.end_datetime) FILTER (WHERE r.n > 0), max(r.end_datetime) FILTER (WHERE r.n > 0), '[]'
+                ) END AS edtrange
+            FROM (
+                SELECT collection, datetime, end_datetime, 1 AS n FROM new_rows
+                UNION ALL
+                SELECT collection, datetime, end_datetime, -1 AS n FROM old_rows
+            ) r JOIN collections c ON c.id = r.collection
+            GROUP BY 1
+        ) d
+        WHERE ps.partition = d.partition;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS items_after_count_insert_trigger ON items;
+CREATE TRIGGER items_after_count_insert_trigger
+AFTER INSERT ON items
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION partition_count_triggerfunc();
+
+DROP TRIGGER IF EXISTS items_after_count_update_trigger ON items;
+CREATE TRIGGER items_after_count_update_trigger
+AFTER UPDATE ON items
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION partition_count_triggerfunc();
+
+DROP TRIGGER IF EXISTS items_after_count_delete_trigger ON items;
+CREATE TRIGGER items_after_count_delete_trigger
+AFTER DELETE ON items
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION partition_count_triggerfunc();
+
 DROP TRIGGER IF EXISTS items_after_insert_trigger ON items;
 CREATE TRIGGER items_after_insert_trigger
 AFTER INSERT ON items
@@ -354,6 +487,118 @@ CREATE TRIGGER items_delete_log_after_delete_trigger
     REFERENCING OLD TABLE AS old_rows
     FOR EACH STATEMENT EXECUTE FUNCTION items_delete_log_trigger();
 
+-- item_lookup_partition: name of the leaf partition holding an item, computed from
+-- the collection key and partition_trunc the same way as partition_name().
+CREATE OR REPLACE FUNCTION item_lookup_partition(key text, partition_trunc text, dt timestamptz)
+RETURNS text AS $$
+    SELECT concat(
+        '_items_',
+        key,
+        CASE partition_trunc
+            WHEN 'year' THEN '_' || to_char(dt, 'YYYY')
+            WHEN 'month' THEN '_' || to_char(dt, 'YYYYMM')
+        END
+    );
+$$ LANGUAGE SQL STABLE PARALLEL SAFE;
+
+-- items_lookup_triggerfunc: keep item_lookup in sync with inserts, updates and
+-- deletes on items. The triggers are only installed while use_item_lookup is
+-- enabled (see item_lookup_triggers); the check here covers a session turning the
+-- setting off. Rows written directly to a partition do not fire these triggers,
+-- item_lookup_rebuild() catches them up.
+CREATE OR REPLACE FUNCTION items_lookup_triggerfunc() RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT use_item_lookup() THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM item_lookup l
+        USING old_rows o
+        WHERE l.id = o.id AND l.collection = o.collection;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO item_lookup (id, collection, datetime)
+        SELECT DISTINCT ON (n.id, n.collection)
+            n.id,
+            n.collection,
+            n.datetime
+        FROM new_rows n
+        ORDER BY n.id, n.collection, n.datetime DESC
+        ON CONFLICT (id, collection) DO UPDATE SET
+            datetime = EXCLUDED.datetime;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER;
+
+-- item_lookup_triggers: install the item_lookup statement triggers on items when
+-- use_item_lookup is enabled and drop them otherwise, so the transition tables are
+-- not collected on every write to items while the lookup is unused. Called when
+-- pgstac_settings changes and by item_lookup_rebuild().
+CREATE OR REPLACE FUNCTION item_lookup_triggers() RETURNS boolean AS $$
+DECLARE
+    enabled boolean := use_item_lookup();
+    installed boolean := EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = 'pgstac.items'::regclass
+        AND tgname = 'items_lookup_after_insert_trigger'
+    );
+BEGIN
+    IF enabled AND NOT installed THEN
+        CREATE TRIGGER items_lookup_after_insert_trigger
+            AFTER INSERT ON items
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION items_lookup_triggerfunc();
+        CREATE TRIGGER items_lookup_after_update_trigger
+            AFTER UPDATE ON items
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION items_lookup_triggerfunc();
+        CREATE TRIGGER items_lookup_after_delete_trigger
+            AFTER DELETE ON items
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION items_lookup_triggerfunc();
+    ELSIF NOT enabled AND installed THEN
+        DROP TRIGGER IF EXISTS items_lookup_after_insert_trigger ON items;
+        DROP TRIGGER IF EXISTS items_lookup_after_update_trigger ON items;
+        DROP TRIGGER IF EXISTS items_lookup_after_delete_trigger ON items;
+    END IF;
+    RETURN enabled;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+CREATE OR REPLACE FUNCTION item_lookup_triggers_triggerfunc() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM item_lookup_triggers();
+    RETURN NULL;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+DROP TRIGGER IF EXISTS pgstac_settings_item_lookup_trigger ON pgstac_settings;
+CREATE TRIGGER pgstac_settings_item_lookup_trigger
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pgstac_settings
+FOR EACH STATEMENT EXECUTE FUNCTION item_lookup_triggers_triggerfunc();
+
+-- item_lookup_rebuild: install the item_lookup triggers and repopulate item_lookup
+-- from items, for use after enabling use_item_lookup or after loading directly into
+-- partitions.
+CREATE OR REPLACE FUNCTION item_lookup_rebuild() RETURNS bigint AS $$
+DECLARE
+    nrows bigint;
+BEGIN
+    PERFORM item_lookup_triggers();
+    TRUNCATE item_lookup;
+    INSERT INTO item_lookup (id, collection, datetime)
+    SELECT DISTINCT ON (i.id, i.collection)
+        i.id,
+        i.collection,
+        i.datetime
+    FROM items i
+    ORDER BY i.id, i.collection, i.datetime DESC;
+    GET DIAGNOSTICS nrows = ROW_COUNT;
+    RETURN nrows;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER;
+
 
 
 
@@ -488,7 +733,8 @@ CREATE OR REPLACE FUNCTION content_dehydrate(content jsonb) RETURNS items AS $$
         ((content->'properties')->>'sat:anx_datetime')::timestamptz AS sat_anx_datetime,
         stac_links_href_array(content->'links') AS link_hrefs,
         -- private is operator-managed metadata outside the STAC item; always NULL from ingest
-        NULL::jsonb AS private;
+        NULL::jsonb AS private,
+        CASE WHEN q_tsvector() THEN stac_q_tsvector(content->'properties') END AS q_tsv;
 $$ LANGUAGE SQL STABLE;
 
 -- include_field: STAC fields include/exclude decision over a fields jsonb (used by content_hydrate);
@@ -531,8 +777,71 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL IMMUTABLE;
 
+-- content_hydrate_fragment: Reassemble a full STAC item JSON from the split columns and a
+-- fragment, given as the fragment content with its links_template merged in (see
+-- page_fragments). A NULL fragment hydrates from the item columns alone. Written as a single
+-- SQL expression so it is inlined into the calling query; with constant fields the checks for
+-- excluded top-level keys fold away, so an excluded links/properties/assets is never built.
+-- search_page and geometrysearch use it for pages without an include list (see
+-- fields_projection).
+CREATE OR REPLACE FUNCTION content_hydrate_fragment(
+    _item items,
+    _frag jsonb,
+    fields jsonb DEFAULT '{}'::jsonb
+) RETURNS jsonb AS $$
+    SELECT jsonb_fields(
+        jsonb_build_object(
+            'id',         _item.id,
+            'geometry',   CASE WHEN include_field('geometry', fields)
+                              THEN ST_ASGeoJson(_item.geometry, 20)::jsonb END,
+            'collection', _item.collection,
+            'type',       'Feature',
+            'links',      CASE WHEN fields->'exclude' ? 'links' THEN NULL
+                              WHEN _frag IS NOT NULL
+                              THEN stac_links_hydrate(_frag->'links_template', _item.link_hrefs)
+                              ELSE COALESCE(_item.links, '[]'::jsonb) END,
+            'properties', CASE WHEN fields->'exclude' ? 'properties' THEN NULL
+                              ELSE promoted_properties_from_item(_item) || COALESCE(
+                              jsonb_merge_recursive(_frag->'properties', COALESCE(_item.properties, '{}'::jsonb)),
+                              '{}'::jsonb) END
+        )
+        || CASE WHEN _item.bbox IS NOT NULL
+               THEN jsonb_build_object('bbox', _item.bbox) ELSE '{}'::jsonb END
+        || CASE WHEN COALESCE(_item.stac_version, _frag->>'stac_version') IS NOT NULL
+               THEN jsonb_build_object('stac_version', COALESCE(_item.stac_version, _frag->>'stac_version'))
+               ELSE '{}'::jsonb END
+        || CASE
+               WHEN _item.stac_extensions IS NOT NULL AND _item.stac_extensions <> '[]'::jsonb
+               THEN jsonb_build_object('stac_extensions', _item.stac_extensions)
+               WHEN _frag->'stac_extensions' <> '[]'::jsonb
+               THEN jsonb_build_object('stac_extensions', _frag->'stac_extensions')
+               ELSE '{}'::jsonb END
+        || CASE
+               WHEN fields->'exclude' ? 'assets'
+                    OR COALESCE(_frag->'assets', '{}'::jsonb) = '{}'::jsonb
+                    AND COALESCE(_item.assets, '{}'::jsonb) = '{}'::jsonb
+               THEN '{}'::jsonb
+               ELSE jsonb_build_object('assets',
+                   jsonb_merge_recursive(_frag->'assets', COALESCE(_item.assets, '{}'::jsonb)))
+           END
+        || COALESCE(_item.extra, '{}'::jsonb),
+        fields
+    );
+$$ LANGUAGE SQL STABLE PARALLEL SAFE;
+
+-- page_fragments: read the fragments of a page of items with a single item_fragments lookup,
+-- returned as a jsonb object keyed by fragment id in the form content_hydrate_fragment takes.
+CREATE OR REPLACE FUNCTION page_fragments(_rows items[]) RETURNS jsonb AS $$
+    SELECT jsonb_object_agg(
+        f.id::text,
+        COALESCE(f.content, '{}'::jsonb) || jsonb_build_object('links_template', f.links_template)
+    )
+    FROM item_fragments f
+    WHERE f.id IN (SELECT DISTINCT r.fragment_id FROM unnest(_rows) r WHERE r.fragment_id IS NOT NULL);
+$$ LANGUAGE SQL STABLE PARALLEL SAFE;
+
 -- content_hydrate: Reassemble a full STAC item JSON from the split columns
--- and the shared fragment content. This is the single hydrate function;
+-- and the shared fragment content. This is the single item hydrate function;
 -- the old content_nonhydrated wrapper and 3-arg _collection parameter have
 -- been removed.
 CREATE OR REPLACE FUNCTION content_hydrate(
@@ -541,74 +850,18 @@ CREATE OR REPLACE FUNCTION content_hydrate(
     _skip_fragment boolean DEFAULT false
 ) RETURNS jsonb AS $$
 DECLARE
-    geom jsonb;
-    output jsonb;
-    frag_content jsonb;
-    frag_links_template jsonb;
-    merged_assets jsonb;
-    merged_properties jsonb;
-    hydrated_stac_version text;
-    hydrated_stac_extensions jsonb;
-    hydrated_links jsonb;
+    frag jsonb;
 BEGIN
-    IF include_field('geometry', fields) THEN
-        geom := ST_ASGeoJson(_item.geometry, 20)::jsonb;
-    END IF;
-
     -- Fetch shared fragment content (NULL when item has no fragment). _skip_fragment lets a caller
     -- that has already determined the requested fields are satisfiable from item columns alone
-    -- (via needs_fragment) avoid this per-row lookup entirely.
+    -- (via needs_fragment) avoid this lookup entirely.
     IF _item.fragment_id IS NOT NULL AND NOT _skip_fragment THEN
-        SELECT content, links_template
-        INTO frag_content, frag_links_template
+        SELECT COALESCE(content, '{}'::jsonb) || jsonb_build_object('links_template', links_template)
+        INTO frag
         FROM item_fragments
         WHERE id = _item.fragment_id;
     END IF;
-
-    -- Merge: fragment provides shared asset/property values; per-item provides individual values.
-    merged_assets     := jsonb_merge_recursive(frag_content->'assets', COALESCE(_item.assets, '{}'::jsonb));
-    merged_properties := jsonb_merge_recursive(frag_content->'properties', COALESCE(_item.properties, '{}'::jsonb));
-    merged_properties := promoted_properties_from_item(_item) || COALESCE(merged_properties, '{}'::jsonb);
-    hydrated_stac_version := COALESCE(_item.stac_version, frag_content->>'stac_version');
-    hydrated_stac_extensions := CASE
-        WHEN _item.stac_extensions IS NOT NULL AND _item.stac_extensions <> '[]'::jsonb THEN _item.stac_extensions
-        ELSE COALESCE(frag_content->'stac_extensions', _item.stac_extensions)
-    END;
-    IF _item.fragment_id IS NOT NULL AND NOT _skip_fragment THEN
-        hydrated_links := stac_links_hydrate(frag_links_template, _item.link_hrefs);
-    ELSE
-        hydrated_links := COALESCE(_item.links, '[]'::jsonb);
-    END IF;
-
-    output := jsonb_build_object(
-        'id',         _item.id,
-        'geometry',   geom,
-        'collection', _item.collection,
-        'type',       'Feature'
-    );
-    IF _item.bbox IS NOT NULL THEN
-        output := output || jsonb_build_object('bbox', _item.bbox);
-    END IF;
-    IF hydrated_stac_version IS NOT NULL THEN
-        output := output || jsonb_build_object('stac_version', hydrated_stac_version);
-    END IF;
-    IF hydrated_stac_extensions IS NOT NULL AND hydrated_stac_extensions <> '[]'::jsonb THEN
-        output := output || jsonb_build_object('stac_extensions', hydrated_stac_extensions);
-    END IF;
-    IF hydrated_links IS NOT NULL THEN
-        output := output || jsonb_build_object('links', hydrated_links);
-    END IF;
-    IF merged_assets != '{}'::jsonb THEN
-        output := output || jsonb_build_object('assets', merged_assets);
-    END IF;
-    IF merged_properties IS NOT NULL THEN
-        output := output || jsonb_build_object('properties', merged_properties);
-    END IF;
-    IF _item.extra IS NOT NULL THEN
-        output := output || _item.extra;
-    END IF;
-
-    RETURN jsonb_fields(output, fields);
+    RETURN content_hydrate_fragment(_item, frag, fields);
 END;
 $$ LANGUAGE PLPGSQL STABLE PARALLEL SAFE;
 
@@ -754,7 +1007,8 @@ CREATE OR REPLACE FUNCTION items_staging_dehydrate(_contents jsonb[]) RETURNS SE
                 r.sat_platform_international_designator,
                 r.sat_anx_datetime,
                 r.link_hrefs,
-                NULL::jsonb AS private
+                NULL::jsonb AS private,
+                r.q_tsv
             FROM fragmented r
             LEFT JOIN fragments f ON f.collection = r.collection AND f.frag_hash = r.frag_hash
             LEFT JOIN all_fragments af ON af.collection = f.collection AND af.hash = f.frag_hash
@@ -854,24 +1108,92 @@ CREATE TRIGGER items_staging_insert_upsert_trigger AFTER INSERT ON items_staging
     FOR EACH STATEMENT EXECUTE PROCEDURE items_staging_triggerfunc();
 
 
+-- item_by_id / get_item / delete_item: without a collection, an id would have to
+-- be probed in every partition. With use_item_lookup enabled the collection and
+-- datetime are taken from item_lookup so only one partition is probed, falling
+-- back to the full probe if the lookup has no (or a stale) entry.
 CREATE OR REPLACE FUNCTION item_by_id(_id text, _collection text DEFAULT NULL) RETURNS items AS
 $$
 DECLARE
     i items%ROWTYPE;
+    l item_lookup%ROWTYPE;
 BEGIN
+    IF _collection IS NULL AND use_item_lookup() THEN
+        FOR l IN SELECT * FROM item_lookup WHERE id=_id LOOP
+            SELECT * INTO i FROM items WHERE id=_id AND collection=l.collection AND datetime=l.datetime;
+            IF FOUND THEN
+                RETURN i;
+            END IF;
+        END LOOP;
+    END IF;
     SELECT * INTO i FROM items WHERE id=_id AND (_collection IS NULL OR collection=_collection) LIMIT 1;
     RETURN i;
 END;
 $$ LANGUAGE PLPGSQL STABLE SET SEARCH_PATH TO pgstac, public;
 
 CREATE OR REPLACE FUNCTION get_item(_id text, _collection text DEFAULT NULL) RETURNS jsonb AS $$
-    SELECT content_hydrate(items) FROM items WHERE id=_id AND (_collection IS NULL OR collection=_collection);
+    SELECT content_hydrate(i) FROM item_by_id(_id, _collection) i WHERE i.id IS NOT NULL;
 $$ LANGUAGE SQL STABLE SET SEARCH_PATH TO pgstac, public;
 
+-- get_items: fetch many items by id in one call. collections is either NULL or
+-- paired with ids, a NULL entry matching any collection. Each partition is probed
+-- once through its id index for the whole array rather than once per id, the
+-- fragments of all found items are read with a single page_fragments lookup, and the
+-- hydrated items are returned in the order they were requested. Ids that are not
+-- found are skipped.
+CREATE OR REPLACE FUNCTION get_items(ids text[], collections text[] DEFAULT NULL) RETURNS SETOF jsonb AS $$
+DECLARE
+    _collections text[];
+    _found items[];
+    _frags jsonb;
+BEGIN
+    IF collections IS NOT NULL AND cardinality(collections) != cardinality(ids) THEN
+        RAISE EXCEPTION 'collections must be NULL or have one entry per id.';
+    END IF;
+    -- Only restrict the collection partitions when every id has a collection,
+    -- either given or found in item_lookup.
+    IF collections IS NOT NULL AND array_position(collections, NULL) IS NULL THEN
+        _collections := collections;
+    ELSIF use_item_lookup() THEN
+        SELECT array_agg(DISTINCT l.collection) INTO _collections
+        FROM item_lookup l
+        WHERE l.id = ANY(ids)
+        HAVING count(DISTINCT l.id) = (SELECT count(DISTINCT r) FROM unnest(ids) r);
+    END IF;
+    SELECT array_agg(i) INTO _found
+    FROM items i
+    WHERE i.id = ANY(ids)
+    AND (_collections IS NULL OR i.collection = ANY(_collections));
+    _frags := page_fragments(_found);
+    RETURN QUERY
+    WITH req AS (
+        SELECT r.id, r.collection, r.ord
+        FROM unnest(ids, collections) WITH ORDINALITY AS r(id, collection, ord)
+    )
+    SELECT content_hydrate_fragment(i, _frags->(i.fragment_id::text))
+    FROM req
+    JOIN unnest(_found) i
+        ON i.id = req.id
+        AND (req.collection IS NULL OR i.collection = req.collection)
+    ORDER BY req.ord, i.collection;
+END;
+$$ LANGUAGE PLPGSQL STABLE SET SEARCH_PATH TO pgstac, public;
+
 CREATE OR REPLACE FUNCTION delete_item(_id text, _collection text DEFAULT NULL) RETURNS VOID AS $$
 DECLARE
 out items%ROWTYPE;
+l item_lookup%ROWTYPE;
 BEGIN
+    IF _collection IS NULL AND use_item_lookup() THEN
+        SELECT * INTO l FROM item_lookup WHERE id = _id;
+        -- Only use the lookup when the id is unambiguous.
+        IF FOUND AND (SELECT count(*) FROM item_lookup WHERE id = _id) = 1 THEN
+            DELETE FROM items WHERE id = _id AND collection = l.collection AND datetime = l.datetime RETURNING * INTO out;
+            IF FOUND THEN
+                RETURN;
+            END IF;
+        END IF;
+    END IF;
     DELETE FROM items WHERE id = _id AND (_collection IS NULL OR collection=_collection) RETURNING * INTO STRICT out;
 END;
 $$ LANGUAGE PLPGSQL;
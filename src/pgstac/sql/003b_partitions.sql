@@ -7,7 +7,11 @@ CREATE TABLE partition_stats (
     spatial geometry,
     last_updated timestamptz,
     n bigint,
-    keys text[]
+    keys text[],
+    exact_n bigint,
+    -- Bumped by every write to the partition (the items statement triggers and partition_written),
+    -- so anything derived from its rows can tell whether it changed since.
+    writes bigint NOT NULL DEFAULT 0
 ) WITH (FILLFACTOR=90);
 
 CREATE INDEX partitions_range_idx ON partition_stats USING GIST(dtrange);
@@ -188,6 +192,24 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL;
 
+-- partition_written: record that rows were written directly to a partition, bypassing the
+-- statement triggers on items, then refresh its stats through update_partition_stats_q. Until
+-- that recount runs (it may be queued) exact_n is unknown and dtrange / edtrange are widened to
+-- the partition's datetime constraints, which the writer has to have widened to fit its rows.
+CREATE OR REPLACE FUNCTION partition_written(_partition text) RETURNS VOID AS $$
+    UPDATE partition_stats ps SET
+        exact_n = NULL,
+        dtrange = CASE WHEN isfinite(lower(m.constraint_dtrange)) AND isfinite(upper(m.constraint_dtrange))
+            THEN range_merge(ps.dtrange, m.constraint_dtrange) ELSE ps.dtrange END,
+        edtrange = CASE WHEN isfinite(lower(m.constraint_edtrange)) AND isfinite(upper(m.constraint_edtrange))
+            THEN range_merge(ps.edtrange, m.constraint_edtrange) ELSE ps.edtrange END,
+        last_updated = now(),
+        writes = ps.writes + 1
+    FROM partition_sys_meta m
+    WHERE m.partition = _partition AND ps.partition = _partition;
+    SELECT update_partition_stats_q(_partition);
+$$ LANGUAGE SQL SECURITY DEFINER;
+
 CREATE OR REPLACE FUNCTION update_partition_stats(_partition text, istrigger boolean default false) RETURNS VOID AS $$
 DECLARE
     dtrange tstzrange;
@@ -198,17 +220,19 @@ DECLARE
     collection text;
     _part_dtrange tstzrange;
     _n bigint;
+    _exact_n bigint;
 BEGIN
     RAISE NOTICE 'Updating stats for %.', _partition;
     EXECUTE format(
         $q$
             SELECT
                 tstzrange(min(datetime), max(datetime),'[]'),
-                tstzrange(min(end_datetime), max(end_datetime), '[]')
+                tstzrange(min(end_datetime), max(end_datetime), '[]'),
+                count(*)
             FROM %I
         $q$,
         _partition
-    ) INTO dtrange, edtrange;
+    ) INTO dtrange, edtrange, _exact_n;
     EXECUTE format('ANALYZE %I;', _partition);
     extent := st_estimatedextent('pgstac', _partition, 'geometry');
     RAISE DEBUG 'Estimated Extent: %', extent;
@@ -221,8 +245,8 @@ BEGIN
     _n := (SELECT reltuples::bigint FROM pg_class WHERE oid = quote_ident(_partition)::regclass);
 
     INSERT INTO partition_stats
-        (partition, collection, partition_dtrange, dtrange, edtrange, spatial, n, last_updated)
-        SELECT _partition, collection, _part_dtrange, dtrange, edtrange, extent, _n, now()
+        (partition, collection, partition_dtrange, dtrange, edtrange, spatial, n, exact_n, last_updated)
+        SELECT _partition, collection, _part_dtrange, dtrange, edtrange, extent, _n, _exact_n, now()
         ON CONFLICT (partition) DO
             UPDATE SET
                 collection=EXCLUDED.collection,
@@ -231,6 +255,7 @@ BEGIN
                 edtrange=EXCLUDED.edtrange,
                 spatial=EXCLUDED.spatial,
                 n=EXCLUDED.n,
+                exact_n=EXCLUDED.exact_n,
                 last_updated=EXCLUDED.last_updated
     ;
 
@@ -535,6 +560,11 @@ BEGIN
             RAISE INFO 'Error Context:%', err_context;
     END;
     PERFORM maintain_partitions(_partition_name);
+    -- Give a new partition its stats row right away, with the ranges of the rows about to be
+    -- written, so its writes are tracked while update_partition_stats is queued.
+    INSERT INTO partition_stats (partition, collection, partition_dtrange, dtrange, edtrange, last_updated)
+    VALUES (_partition_name, _collection, _partition_dtrange, _dtrange, _edtrange, now())
+    ON CONFLICT (partition) DO NOTHING;
     PERFORM update_partition_stats_q(_partition_name, true);
     REFRESH MATERIALIZED VIEW partitions;
     REFRESH MATERIALIZED VIEW partition_steps;
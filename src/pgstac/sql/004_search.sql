@@ -17,7 +17,7 @@ $$ LANGUAGE SQL STABLE PARALLEL SAFE;
 
 -- Searches cache table stores derived search metadata (WHERE clause, ORDER BY,
 -- hash) so that repeated equivalent queries re-use the cached context count.
--- metadata IS NULL = anonymous search (short-lived GC).
+-- anonymous = registered by search_page/search_plan while searching (see gc_searches).
 CREATE TABLE IF NOT EXISTS searches(
     hash text PRIMARY KEY,
     search jsonb NOT NULL,
@@ -28,10 +28,74 @@ CREATE TABLE IF NOT EXISTS searches(
     metadata jsonb DEFAULT '{}'::jsonb NOT NULL,
     created_at timestamptz DEFAULT now(),
     statslastupdated timestamptz,
-    context_count bigint
+    context_count bigint,
+    -- Registered by search_page / search_plan while searching rather than by a caller of
+    -- search_query; only these are deleted by gc_searches.
+    anonymous boolean DEFAULT false NOT NULL
 );
 CREATE INDEX IF NOT EXISTS searches_lastused_anon_idx
-    ON searches (lastused) WHERE metadata IS NOT NULL;
+    ON searches (lastused) WHERE anonymous;
+
+-- Deferred usage of registered searches. With defer_search_usage on, register_search appends a
+-- row here instead of updating searches.lastused/usecount; the table is unlogged and append only,
+-- so read traffic writes no WAL and takes no row locks on popular hashes. flush_search_usage
+-- folds it into searches.
+CREATE UNLOGGED TABLE IF NOT EXISTS search_usage(
+    hash text NOT NULL,
+    used_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Per-partition context counts for a search hash. writes is the partition's
+-- partition_stats.writes when it was counted, so only partitions written since need
+-- recounting when the searches.context_count expires. The counts go with the partition's stats
+-- row, so a partition that is dropped and created again (its writes starting over at 0) is never
+-- matched with counts of its previous rows.
+CREATE TABLE IF NOT EXISTS search_partition_counts(
+    hash text NOT NULL,
+    partition text NOT NULL REFERENCES partition_stats(partition) ON DELETE CASCADE,
+    writes bigint NOT NULL,
+    count bigint NOT NULL,
+    PRIMARY KEY (hash, partition)
+);
+CREATE INDEX IF NOT EXISTS search_partition_counts_partition_idx ON search_partition_counts (partition);
+
+-- Compiled searches. When the compiled_searches setting is on, search_compile stores what
+-- search_page, search_plan and search_query derive from a search body (CQL2, WHERE clause, where
+-- hash, envelope and sort keys), keyed by a hash of the body without its paging/fields/conf
+-- members plus the settings the translation reads, so a repeated search skips the CQL2
+-- translation and queryable lookups. Cleared whenever queryables or pgstac_settings change;
+-- gc_search_compiled deletes entries by age.
+CREATE TABLE IF NOT EXISTS search_compiled(
+    key text PRIMARY KEY,
+    cql2 jsonb,
+    _where text NOT NULL,
+    hash text NOT NULL,
+    env pred_envelope,
+    orderby text,
+    orderby_prev text,
+    keys_proj text,
+    lead_field text,
+    lead_dir text,
+    sortkeys jsonb,
+    created_at timestamptz DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION search_compiled_invalidate_triggerfunc() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM search_compiled;
+    RETURN NULL;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+DROP TRIGGER IF EXISTS queryables_search_compiled_trigger ON queryables;
+CREATE TRIGGER queryables_search_compiled_trigger
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON queryables
+FOR EACH STATEMENT EXECUTE FUNCTION search_compiled_invalidate_triggerfunc();
+
+DROP TRIGGER IF EXISTS pgstac_settings_search_compiled_trigger ON pgstac_settings;
+CREATE TRIGGER pgstac_settings_search_compiled_trigger
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pgstac_settings
+FOR EACH STATEMENT EXECUTE FUNCTION search_compiled_invalidate_triggerfunc();
 
 -- stac_search_to_where: convert a STAC search JSON to a SQL WHERE clause
 -- via the unified CQL2 representation (search_to_cql2 -> cql2_query).
@@ -44,12 +108,158 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL STABLE;
 
+-- search_compile_key: cache key of a search body in search_compiled. default_filter_lang,
+-- additional_properties and q_tsvector can be set per session, so their effective values are part
+-- of the key.
+CREATE OR REPLACE FUNCTION search_compile_key(_search jsonb) RETURNS text AS $$
+    SELECT pgstac_hash(format('%s|%s|%s|%s',
+        coalesce(_search, '{}'::jsonb) - '{limit,token,fields,conf}'::text[],
+        get_setting('default_filter_lang', _search->'conf'),
+        additional_properties(),
+        q_tsvector()
+    ));
+$$ LANGUAGE SQL STABLE;
+
+-- search_compile: the compiled form of a search body, from search_compiled when compiled_searches
+-- is on and it has been compiled before. Not stored in readonly mode.
+CREATE OR REPLACE FUNCTION search_compile(_search jsonb) RETURNS search_compiled AS $$
+DECLARE
+    _key text := search_compile_key(_search);
+    use_compiled boolean := compiled_searches(_search->'conf');
+    c search_compiled%ROWTYPE;
+BEGIN
+    IF use_compiled THEN
+        SELECT * INTO c FROM search_compiled WHERE key = _key;
+        IF FOUND THEN RETURN c; END IF;
+    END IF;
+
+    c.key := _key;
+    c.cql2 := search_to_cql2(_search);
+    c._where := cql2_query(c.cql2);
+    IF c._where IS NULL OR btrim(c._where) = '' THEN c._where := ' TRUE '; END IF;
+    c.hash := search_hash_from_where(c._where, '{}'::jsonb);
+    c.env := cql2_envelope(c.cql2);
+    SELECT string_agg(expr || ' ' || dir, ', ' ORDER BY ord),
+           string_agg(expr || ' ' || CASE dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END, ', ' ORDER BY ord),
+           'ARRAY[' || string_agg(format('(%s)::text', expr), ',' ORDER BY ord) || ']::text[]',
+           (array_agg(field ORDER BY ord))[1],
+           (array_agg(dir ORDER BY ord))[1]
+    INTO c.orderby, c.orderby_prev, c.keys_proj, c.lead_field, c.lead_dir
+    FROM keyset_sortkeys(_search);
+    c.sortkeys := keyset_sortkeys_typed(_search);
+    c.created_at := now();
+
+    IF use_compiled AND NOT pgstac.readonly(_search->'conf') THEN
+        INSERT INTO search_compiled VALUES (c.*) ON CONFLICT (key) DO NOTHING;
+    END IF;
+    RETURN c;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+-- gc_search_compiled: delete compiled searches created more than retention_interval ago. They are
+-- compiled and stored again the next time they are used.
+CREATE OR REPLACE FUNCTION gc_search_compiled(retention_interval interval DEFAULT '1 day') RETURNS bigint AS $$
+    WITH deleted AS (
+        DELETE FROM search_compiled WHERE created_at < now() - retention_interval RETURNING 1
+    )
+    SELECT count(*)::bigint FROM deleted;
+$$ LANGUAGE SQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+-- partition_stats_countable: whether a CQL2 filter only constrains collections (= / in) and the
+-- datetime interval (anyinteracts / t_intersects), so its envelope matches exactly the rows it
+-- selects and the match count can be summed from partition_stats.
+CREATE OR REPLACE FUNCTION partition_stats_countable(j jsonb) RETURNS boolean AS $$
+DECLARE op text; args jsonb; child jsonb;
+BEGIN
+    IF j IS NULL THEN RETURN true; END IF;
+    op := lower(j->>'op'); args := j->'args';
+    IF op = 'and' THEN
+        FOR child IN SELECT * FROM jsonb_array_elements(args) LOOP
+            IF NOT partition_stats_countable(child) THEN RETURN false; END IF;
+        END LOOP;
+        RETURN true;
+    ELSIF op IN ('=','eq','in') AND args->0->>'property' = 'collection' THEN
+        RETURN cql2_collection_set(op, args) IS NOT NULL;
+    ELSIF op IN ('anyinteracts','t_intersects') AND args->0->>'property' = 'datetime' THEN
+        RETURN true;
+    END IF;
+    RETURN false;
+END;
+$$ LANGUAGE PLPGSQL STABLE;
+
+-- partition_stats_count: exact number of items matching a CQL2 filter, summed from
+-- partition_stats.exact_n. Returns NULL when the filter is not partition_stats_countable or a
+-- partition with items is only partly inside the datetime interval or has not been counted.
+-- _env is the envelope of _cql2 when the caller already has it.
+CREATE OR REPLACE FUNCTION partition_stats_count(_cql2 jsonb, _env pred_envelope DEFAULT NULL)
+RETURNS bigint AS $$
+DECLARE total bigint; partial boolean;
+BEGIN
+    IF NOT partition_stats_countable(_cql2) THEN RETURN NULL; END IF;
+    _env := coalesce(_env, cql2_envelope(_cql2));
+    SELECT sum(ps.exact_n),
+           bool_or(ps.exact_n IS NULL OR NOT coalesce(
+               ps.dtrange <@ (_env).dt AND ps.edtrange <@ (_env).edt, false))
+    INTO total, partial
+    FROM partition_stats ps
+    WHERE partition_in_envelope(ps, _env) AND ps.exact_n IS DISTINCT FROM 0;
+    IF partial THEN RETURN NULL; END IF;
+    RETURN coalesce(total, 0);
+END;
+$$ LANGUAGE PLPGSQL STABLE;
+
+-- search_partition_count: count the rows matching a search partition by partition, reusing the
+-- search_partition_counts of partitions whose partition_stats.writes has not moved since they were
+-- counted. Every write path bumps writes (see partition_count_triggerfunc and partition_written),
+-- including while update_partition_stats is queued. writes is read before the partition is
+-- counted, so a write committed in between only causes an extra recount.
+-- Candidate partitions are pruned with the envelope against their enforced datetime constraints.
+-- recount ignores the stored counts; ro skips storing the new ones.
+CREATE OR REPLACE FUNCTION search_partition_count(
+    inhash text, inwhere text, _env pred_envelope,
+    recount boolean DEFAULT false, ro boolean DEFAULT false
+) RETURNS bigint AS $$
+DECLARE p record; n bigint; total bigint := 0;
+BEGIN
+    FOR p IN
+        SELECT m.partition, ps.writes, c.count AS counted, c.writes AS counted_writes
+        FROM partition_sys_meta m
+        LEFT JOIN partition_stats ps ON ps.partition = m.partition
+        LEFT JOIN search_partition_counts c ON c.hash = inhash AND c.partition = m.partition
+        WHERE ((_env).colls IS NULL OR m.collection = ANY((_env).colls))
+          AND (_env).dt && m.constraint_dtrange
+          AND (_env).edt && m.constraint_edtrange
+    LOOP
+        IF NOT recount AND p.counted IS NOT NULL AND p.counted_writes = p.writes THEN
+            total := total + p.counted;
+            CONTINUE;
+        END IF;
+        EXECUTE format('SELECT count(*) FROM %I i WHERE %s', p.partition, inwhere) INTO n;
+        total := total + n;
+        IF NOT ro AND p.writes IS NOT NULL THEN
+            INSERT INTO search_partition_counts (hash, partition, writes, count)
+            VALUES (inhash, p.partition, p.writes, n)
+            ON CONFLICT (hash, partition) DO UPDATE SET
+                writes = EXCLUDED.writes,
+                count = EXCLUDED.count;
+        END IF;
+    END LOOP;
+    RETURN total;
+END;
+$$ LANGUAGE PLPGSQL;
+
 -- where_stats: estimate or count matching rows for a search, cached in the searches
 -- table. The inclamp parameter is a sound partition clamp (collection + datetime range)
--- that lets the planner prune partitions for the count query.
+-- that lets the planner prune partitions for the count query. incql2 and inenv are the
+-- CQL2 and envelope of the search as already compiled by the caller (search_compile), so
+-- the search is not translated again here. When the search only selects whole partitions
+-- by collection and datetime the exact count is summed from partition_stats without
+-- touching items or the cache; other searches are counted with search_partition_count so
+-- only partitions changed since the last count are scanned.
 CREATE OR REPLACE FUNCTION where_stats(
     inhash text, inwhere text, updatestats boolean default false,
-    conf jsonb default null, inclamp text default null
+    conf jsonb default null, inclamp text default null,
+    incql2 jsonb default null, inenv pred_envelope default null
 ) RETURNS searches AS $$
 DECLARE
     t timestamptz; i interval; explain_json jsonb;
@@ -63,6 +273,13 @@ DECLARE
 BEGIN
     IF updatestats THEN _stats_ttl := '0'::interval; END IF;
     IF _context = 'off' THEN RETURN sw; END IF;
+    IF (inenv).dt IS NOT NULL THEN
+        sw.context_count := partition_stats_count(incql2, inenv);
+        IF sw.context_count IS NOT NULL THEN
+            sw.hash := inhash; sw._where := inwhere; sw.statslastupdated := now();
+            RETURN sw;
+        END IF;
+    END IF;
     SELECT * INTO sw FROM searches WHERE hash = inhash;
     IF sw IS NULL THEN sw.hash := inhash; sw._where := inwhere; sw_statslastupdated := NULL;
     ELSE sw_statslastupdated := sw.statslastupdated; END IF;
@@ -86,8 +303,12 @@ BEGIN
         RETURN sw;
     END IF;
     t := clock_timestamp();
-    EXECUTE format('SELECT count(*) FROM items i WHERE %s', concat_ws(' AND ', inclamp, inwhere))
-        INTO sw.context_count;
+    IF (inenv).dt IS NOT NULL THEN
+        sw.context_count := search_partition_count(inhash, inwhere, inenv, updatestats, ro);
+    ELSE
+        EXECUTE format('SELECT count(*) FROM items i WHERE %s', concat_ws(' AND ', inclamp, inwhere))
+            INTO sw.context_count;
+    END IF;
     i := clock_timestamp() - t;
     IF NOT ro THEN
         UPDATE searches SET statslastupdated = now(), context_count = sw.context_count
@@ -101,25 +322,50 @@ $$ LANGUAGE PLPGSQL SECURITY DEFINER;
 
 -- register_search: persist a pre-derived search row in the searches cache table
 -- (hash, _where, orderby, search, metadata already populated). Best-effort and
--- non-blocking: returns the canonical cached row.
+-- non-blocking: returns the canonical cached row. With defer_search_usage on, a hash is
+-- only written once and later uses are appended to search_usage. A search registered explicitly
+-- (anonymous false) clears the anonymous flag of a row first registered while searching.
 CREATE OR REPLACE FUNCTION register_search(search searches) RETURNS searches AS $$
-DECLARE cached_search searches%ROWTYPE;
+DECLARE
+    cached_search searches%ROWTYPE;
+    _anonymous boolean := coalesce(search.anonymous, false);
 BEGIN
     IF pgstac.readonly() THEN RETURN search; END IF;
-    UPDATE searches SET lastused = now(), usecount = searches.usecount + 1
-    WHERE ctid = (SELECT ctid FROM searches WHERE hash = search.hash FOR UPDATE SKIP LOCKED LIMIT 1)
-    RETURNING * INTO cached_search;
-    IF cached_search IS NULL THEN
-        IF pg_try_advisory_xact_lock(hashtext(search.hash)) THEN
-            INSERT INTO searches (hash, search, _where, orderby, lastused, usecount, metadata)
-                VALUES (search.hash, search.search, search._where, search.orderby, now(), 1, search.metadata)
-                ON CONFLICT (hash) DO UPDATE SET lastused = EXCLUDED.lastused, usecount = searches.usecount + 1
+    IF defer_search_usage() THEN
+        SELECT * INTO cached_search FROM searches WHERE hash = search.hash;
+        IF FOUND THEN
+            INSERT INTO search_usage (hash) VALUES (search.hash);
+            IF cached_search.anonymous AND NOT _anonymous THEN
+                UPDATE searches SET anonymous = false WHERE hash = search.hash;
+            END IF;
+        ELSE
+            INSERT INTO searches (hash, search, _where, orderby, lastused, usecount, metadata, anonymous)
+                VALUES (search.hash, search.search, search._where, search.orderby, now(), 1, search.metadata, _anonymous)
+                ON CONFLICT (hash) DO NOTHING
                 RETURNING * INTO cached_search;
         END IF;
+    ELSE
+        UPDATE searches SET
+            lastused = now(),
+            usecount = searches.usecount + 1,
+            anonymous = searches.anonymous AND _anonymous
+        WHERE ctid = (SELECT ctid FROM searches WHERE hash = search.hash FOR UPDATE SKIP LOCKED LIMIT 1)
+        RETURNING * INTO cached_search;
         IF cached_search IS NULL THEN
-            SELECT * INTO cached_search FROM searches WHERE hash = search.hash;
+            IF pg_try_advisory_xact_lock(hashtext(search.hash)) THEN
+                INSERT INTO searches (hash, search, _where, orderby, lastused, usecount, metadata, anonymous)
+                    VALUES (search.hash, search.search, search._where, search.orderby, now(), 1, search.metadata, _anonymous)
+                    ON CONFLICT (hash) DO UPDATE SET
+                        lastused = EXCLUDED.lastused,
+                        usecount = searches.usecount + 1,
+                        anonymous = searches.anonymous AND EXCLUDED.anonymous
+                    RETURNING * INTO cached_search;
+            END IF;
         END IF;
     END IF;
+    IF cached_search IS NULL THEN
+        SELECT * INTO cached_search FROM searches WHERE hash = search.hash;
+    END IF;
     IF cached_search IS NOT NULL THEN
         cached_search._where := search._where;
         cached_search.orderby := search.orderby;
@@ -129,19 +375,66 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
 
+-- flush_search_usage: fold the uses recorded in search_usage into searches.lastused/usecount.
+-- Returns the number of searches updated. Run periodically when defer_search_usage is on.
+CREATE OR REPLACE FUNCTION flush_search_usage() RETURNS bigint AS $$
+DECLARE
+    flushed bigint;
+BEGIN
+    WITH used AS (
+        DELETE FROM search_usage RETURNING hash, used_at
+    ),
+    agg AS (
+        SELECT hash, count(*) AS n, max(used_at) AS lastused FROM used GROUP BY hash
+    ),
+    upd AS (
+        UPDATE searches s
+        SET usecount = s.usecount + agg.n, lastused = GREATEST(s.lastused, agg.lastused)
+        FROM agg WHERE s.hash = agg.hash
+        RETURNING 1
+    )
+    SELECT count(*) INTO flushed FROM upd;
+    RETURN flushed;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
+-- gc_searches: delete anonymous searches (flagged as registered by search_page and search_plan)
+-- that have not been used within retention_interval, along with their per-partition context
+-- counts, and compiled searches older than retention_interval. Pending deferred usage is flushed
+-- first. Searches registered through search_query or search_from_json are kept.
+CREATE OR REPLACE FUNCTION gc_searches(retention_interval interval DEFAULT '30 days') RETURNS bigint AS $$
+DECLARE
+    deleted_count bigint;
+BEGIN
+    PERFORM flush_search_usage();
+    PERFORM gc_search_compiled(retention_interval);
+    WITH deleted AS (
+        DELETE FROM searches
+        WHERE anonymous AND lastused < now() - retention_interval
+        RETURNING hash
+    ),
+    counts AS (
+        DELETE FROM search_partition_counts c USING deleted d WHERE c.hash = d.hash
+    )
+    SELECT count(*) INTO deleted_count FROM deleted;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
+
 -- search_query: derive hash/where/orderby from a STAC search JSON, register
 -- it, and return only the hash and metadata. Used by external callers.
 CREATE OR REPLACE FUNCTION search_query(
     _search jsonb = '{}'::jsonb,
     _metadata jsonb = '{}'::jsonb
 ) RETURNS TABLE(hash text, metadata jsonb) AS $$
-DECLARE search searches%ROWTYPE;
+DECLARE search searches%ROWTYPE; compiled search_compiled%ROWTYPE;
 BEGIN
+    compiled := search_compile(_search);
     search.search := _search;
     search.metadata := _metadata;
-    search._where := stac_search_to_where(_search);
+    search._where := compiled._where;
     search.hash := search_hash_from_where(search._where, search.metadata);
-    search.orderby := keyset_orderby(_search);
+    search.orderby := compiled.orderby;
     search.lastused := now();
     search.usecount := 1;
     search := register_search(search);
@@ -160,13 +453,14 @@ CREATE OR REPLACE FUNCTION search_from_json(
     _search jsonb DEFAULT '{}'::jsonb,
     _metadata jsonb DEFAULT '{}'::jsonb
 ) RETURNS TABLE(hash text, metadata jsonb) AS $$
-DECLARE search searches%ROWTYPE;
+DECLARE search searches%ROWTYPE; compiled search_compiled%ROWTYPE;
 BEGIN
+    compiled := search_compile(_search);
     search.search := _search;
     search.metadata := _metadata;
-    search._where := stac_search_to_where(_search);
+    search._where := compiled._where;
     search.hash := search_hash_from_where(search._where, search.metadata);
-    search.orderby := keyset_orderby(_search);
+    search.orderby := compiled.orderby;
     search.lastused := now();
     search.usecount := 1;
     search := register_search(search);
@@ -177,12 +471,15 @@ $$ LANGUAGE PLPGSQL SECURITY DEFINER SET search_path TO pgstac, public;
 -- field_included: STAC fields include/exclude decision over text[] arrays (the array-form used by
 -- the column projector fields_to_itemcols). include_field() is the equivalent over a fields jsonb
 -- (used by content_hydrate); both apply the same rule: exclude wins, then an explicit include list
--- restricts to its members, otherwise everything is included.
+-- restricts to its members, otherwise everything is included. A column is kept when the include
+-- list names a path beneath it (properties.gsd keeps the properties column).
 CREATE OR REPLACE FUNCTION field_included(_field text, _includes text[], _excludes text[])
 RETURNS boolean LANGUAGE sql IMMUTABLE AS $$
     SELECT CASE
         WHEN _field = ANY(_excludes) THEN false
-        WHEN array_length(_includes, 1) IS NOT NULL THEN _field = ANY(_includes)
+        WHEN array_length(_includes, 1) IS NOT NULL THEN
+            _field = ANY(_includes) OR EXISTS (
+                SELECT 1 FROM unnest(_includes) inc WHERE starts_with(inc, _field || '.'))
         ELSE true END;
 $$;
 
@@ -222,8 +519,13 @@ $$ LANGUAGE PLPGSQL STABLE PARALLEL SAFE;
 
 -- fields_to_itemcols: produce a SELECT list of item columns in attnum order.
 -- Heavy columns (geometry, bbox, assets, links, properties, extra) are emitted as
--- NULL::type when their controlling field is excluded/not-included.
-CREATE OR REPLACE FUNCTION fields_to_itemcols(fields jsonb DEFAULT '{}'::jsonb) RETURNS text AS $$
+-- NULL::type when their controlling field is excluded/not-included. With _geojson the
+-- list is for client side hydration (pypgstac.items.ItemHydrator): geometry is returned
+-- as GeoJSON and the columns that are never needed to build an item are left out.
+CREATE OR REPLACE FUNCTION fields_to_itemcols(
+    fields jsonb DEFAULT '{}'::jsonb,
+    _geojson boolean DEFAULT false
+) RETURNS text AS $$
 DECLARE
     includes text[] := ARRAY(SELECT jsonb_array_elements_text(fields->'include'));
     excludes text[] := ARRAY(SELECT jsonb_array_elements_text(fields->'exclude'));
@@ -235,16 +537,223 @@ BEGIN
                                       'extra','properties','stac_version','stac_extensions'])
                AND NOT field_included(CASE WHEN a.attname = 'link_hrefs' THEN 'links' ELSE a.attname END,
                                       includes, excludes)
-          THEN format('NULL::%s', format_type(a.atttypid, a.atttypmod))
+          THEN format('NULL::%s AS %I',
+                      CASE WHEN _geojson AND a.attname = 'geometry' THEN 'jsonb'
+                           ELSE format_type(a.atttypid, a.atttypmod) END,
+                      a.attname)
+          WHEN a.attname = 'q_tsv' THEN 'NULL::tsvector AS q_tsv'
+          WHEN _geojson AND a.attname = 'geometry' THEN 'ST_AsGeoJSON(i.geometry, 20)::jsonb AS geometry'
           ELSE format('i.%I', a.attname)
         END, ', ' ORDER BY a.attnum)
     INTO cols
     FROM pg_attribute a
-    WHERE a.attrelid = 'items'::regclass AND a.attnum > 0 AND NOT a.attisdropped;
+    WHERE a.attrelid = 'items'::regclass AND a.attnum > 0 AND NOT a.attisdropped
+      AND NOT (_geojson AND a.attname IN ('private', 'item_hash', 'q_tsv'));
     RETURN cols;
 END;
 $$ LANGUAGE PLPGSQL STABLE;
 
+-- fields_projection: compile a STAC fields include/exclude once per query into the SQL expression
+-- that hydrates one page row (items row i, page_fragments entry fr.frag). An include list is built
+-- directly as nested jsonb_build_object calls over the included paths: only those top-level keys
+-- are hydrated, and properties.x / assets.x merge just that member, so the full item is never
+-- assembled and there is no jsonb_fields pass. Excludes are applied with #- on the result. Without
+-- an include list the item is built by content_hydrate_fragment, which skips excluded top-level
+-- keys. The output matches content_hydrate(i, fields).
+CREATE OR REPLACE FUNCTION fields_projection(fields jsonb DEFAULT '{}'::jsonb) RETURNS text AS $$
+DECLARE
+    includes jsonb := fields->'include';
+    excludes jsonb := fields->'exclude';
+    promoted text[] := ARRAY['datetime','start_datetime','end_datetime']
+                       || ARRAY(SELECT name FROM promoted_item_property_defs());
+    expr text;
+    path text[];
+BEGIN
+    IF includes IS NULL OR jsonb_array_length(includes) = 0 THEN
+        RETURN format('content_hydrate_fragment(i, fr.frag, %L::jsonb)', fields);
+    END IF;
+    -- Same implicit members as jsonb_include.
+    expr := fields_projection_tree(
+        '{}'::text[],
+        ARRAY(SELECT jsonb_array_elements_text(includes || '["id","collection"]'::jsonb)),
+        promoted
+    );
+    FOR path IN SELECT explode_dotpaths(excludes) LOOP
+        expr := format('(%s #- %L::text[])', expr, path);
+    END LOOP;
+    RETURN expr;
+END;
+$$ LANGUAGE PLPGSQL STABLE;
+
+-- fields_projection_tree: the object for the included dotted _paths below _prefix ('' is the
+-- prefix itself, which is then included whole). Missing paths come out as JSON null, as they do
+-- from jsonb_include.
+CREATE OR REPLACE FUNCTION fields_projection_tree(
+    _prefix text[],
+    _paths text[],
+    _promoted text[]
+) RETURNS text AS $$
+DECLARE
+    head text;
+    parts text[] := '{}'::text[];
+BEGIN
+    IF '' = ANY (_paths) THEN
+        RETURN fields_projection_value(_prefix, _promoted);
+    END IF;
+    FOR head IN SELECT DISTINCT split_part(p, '.', 1) FROM unnest(_paths) p ORDER BY 1 LOOP
+        parts := parts || format('jsonb_build_object(%L, %s)', head, fields_projection_tree(
+            _prefix || head,
+            ARRAY(SELECT substr(p, length(head) + 2) FROM unnest(_paths) p WHERE split_part(p, '.', 1) = head),
+            _promoted
+        ));
+    END LOOP;
+    RETURN format('(%s)', array_to_string(parts, ' || '));
+END;
+$$ LANGUAGE PLPGSQL IMMUTABLE;
+
+-- fields_projection_value: the expression for the value at _path of the hydrated item, using the
+-- same column/fragment rules as content_hydrate_fragment but building only that part.
+CREATE OR REPLACE FUNCTION fields_projection_value(_path text[], _promoted text[]) RETURNS text AS $$
+DECLARE
+    expr text;
+    rest text[] := _path[2:];
+BEGIN
+    IF _path[1] = 'properties' AND cardinality(_path) > 1 THEN
+        -- Item/fragment properties take precedence over the promoted columns.
+        expr := format('jsonb_merge_member(fr.frag->''properties'', i.properties, %L)', _path[2]);
+        IF _path[2] = ANY (_promoted) THEN
+            expr := format('COALESCE(%s, promoted_properties_from_item(i)->%L)', expr, _path[2]);
+        END IF;
+        rest := _path[3:];
+    ELSIF _path[1] = 'assets' AND cardinality(_path) > 1 THEN
+        expr := format('jsonb_merge_member(fr.frag->''assets'', i.assets, %L)', _path[2]);
+        rest := _path[3:];
+    ELSE
+        expr := CASE _path[1]
+            WHEN 'id' THEN 'to_jsonb(i.id)'
+            WHEN 'collection' THEN 'to_jsonb(i.collection)'
+            WHEN 'type' THEN $e$'"Feature"'::jsonb$e$
+            WHEN 'geometry' THEN 'ST_AsGeoJson(i.geometry, 20)::jsonb'
+            WHEN 'bbox' THEN 'i.bbox'
+            WHEN 'links' THEN $e$CASE WHEN fr.frag IS NOT NULL
+                THEN stac_links_hydrate(fr.frag->'links_template', i.link_hrefs)
+                ELSE COALESCE(i.links, '[]'::jsonb) END$e$
+            WHEN 'properties' THEN $e$(promoted_properties_from_item(i) || COALESCE(
+                jsonb_merge_recursive(fr.frag->'properties', COALESCE(i.properties, '{}'::jsonb)),
+                '{}'::jsonb))$e$
+            WHEN 'stac_version' THEN $e$to_jsonb(COALESCE(i.stac_version, fr.frag->>'stac_version'))$e$
+            WHEN 'stac_extensions' THEN $e$CASE
+                WHEN i.stac_extensions IS NOT NULL AND i.stac_extensions <> '[]'::jsonb THEN i.stac_extensions
+                WHEN fr.frag->'stac_extensions' <> '[]'::jsonb THEN fr.frag->'stac_extensions' END$e$
+            WHEN 'assets' THEN $e$CASE
+                WHEN COALESCE(fr.frag->'assets', '{}'::jsonb) = '{}'::jsonb
+                     AND COALESCE(i.assets, '{}'::jsonb) = '{}'::jsonb THEN NULL
+                ELSE jsonb_merge_recursive(fr.frag->'assets', COALESCE(i.assets, '{}'::jsonb)) END$e$
+            ELSE format('(i.extra->%L)', _path[1])
+        END;
+    END IF;
+    IF cardinality(rest) > 0 THEN
+        expr := format('(%s #> %L::text[])', expr, rest);
+    END IF;
+    RETURN expr;
+END;
+$$ LANGUAGE PLPGSQL IMMUTABLE;
+
+-- Page cache for search_page, used when the page_cache setting is on. Entries are keyed by a
+-- hash of the raw request (search body, limit, token, direction and fields) so a hit needs no
+-- CQL2 parsing. env records the search's envelope and stats_key its envelope_writes when the page
+-- was built; an entry is stale once it is older than page_cache_ttl or any partition that can
+-- hold rows of the envelope has been written since (or has appeared or gone).
+CREATE TABLE IF NOT EXISTS search_page_cache(
+    key text PRIMARY KEY,
+    hash text NOT NULL,
+    token text,
+    lim int NOT NULL,
+    prev boolean NOT NULL,
+    fields jsonb,
+    features json NOT NULL,
+    number_returned integer NOT NULL,
+    next_token text,
+    prev_token text,
+    number_matched bigint,
+    env pred_envelope,
+    stats_key text,
+    created_at timestamptz DEFAULT now() NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_page_cache_created_at_idx ON search_page_cache (created_at);
+
+-- partition_in_envelope: whether a partition can hold rows matching an envelope, using the same
+-- test partition_bounds uses to pick its candidate partitions.
+CREATE OR REPLACE FUNCTION partition_in_envelope(ps partition_stats, _env pred_envelope) RETURNS boolean AS $$
+    SELECT ((_env).colls IS NULL OR ps.collection = ANY((_env).colls))
+        AND (_env).dt && COALESCE(ps.dtrange, tstzrange('-infinity','infinity','[]'))
+        AND (_env).edt && COALESCE(ps.edtrange, tstzrange('-infinity','infinity','[]'))
+        AND ((_env).geom IS NULL OR ps.spatial IS NULL OR ps.spatial && (_env).geom);
+$$ LANGUAGE SQL STABLE PARALLEL SAFE;
+
+-- envelope_writes: fingerprint of the partition_stats.writes of every partition that can hold rows
+-- in an envelope's collections and datetime intervals. The spatial test is left out because
+-- partition_stats.spatial is only refreshed by update_partition_stats, while the datetime ranges
+-- are widened by every write (see partition_count_triggerfunc and partition_written).
+CREATE OR REPLACE FUNCTION envelope_writes(_env pred_envelope) RETURNS text AS $$
+    SELECT pgstac_hash(coalesce(string_agg(format('%s:%s', ps.partition, ps.writes), ',' ORDER BY ps.partition), ''))
+    FROM partition_stats ps
+    WHERE partition_in_envelope(ps, ROW((_env).colls, (_env).dt, (_env).edt, NULL)::pred_envelope);
+$$ LANGUAGE SQL STABLE PARALLEL SAFE;
+
+-- search_page_cache_key: cache key for a search_page request.
+CREATE OR REPLACE FUNCTION search_page_cache_key(
+    _search jsonb, _limit int, _token text, _prev boolean, _fields jsonb
+) RETURNS text AS $$
+    SELECT pgstac_hash(format('%s|%s|%s|%s|%s', _search, _limit, quote_nullable(_token), _prev, _fields));
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+
+-- gc_search_page_cache: delete page cache entries older than the page_cache_ttl.
+CREATE OR REPLACE FUNCTION gc_search_page_cache(ttl interval DEFAULT page_cache_ttl()) RETURNS bigint AS $$
+    WITH deleted AS (
+        DELETE FROM search_page_cache WHERE created_at < now() - ttl RETURNING 1
+    )
+    SELECT count(*)::bigint FROM deleted;
+$$ LANGUAGE SQL SECURITY DEFINER;
+
+-- search_page_rows: run one of search_page's row queries, which take the band bounds ($1, $2),
+-- the row limit ($3) and the keyset token values ($4) as parameters. With prepared_searches on,
+-- the query is PREPAREd once per session under a name derived from its text, so repeated search
+-- shapes reuse the statement and, after the first few executions, a generic plan instead of being
+-- planned on every request. At most 100 of these statements are kept per session, the oldest
+-- prepared being deallocated first. The CQL2 filter values are still inlined in _sql, so each
+-- distinct filter is its own statement: plans are reused across the pages of one search and by
+-- repeats of the same search, while a stream of different filters only cycles through the 100.
+CREATE OR REPLACE FUNCTION search_page_rows(
+    _sql text, _lo timestamptz, _hi timestamptz, _lim int, _keys text[], conf jsonb DEFAULT NULL
+) RETURNS items[] AS $$
+DECLARE
+    stmt text;
+    old_stmt text;
+    page_rows items[];
+BEGIN
+    IF NOT prepared_searches(conf) THEN
+        EXECUTE _sql USING _lo, _hi, _lim, _keys INTO page_rows;
+        RETURN page_rows;
+    END IF;
+    stmt := 'pgstac_page_' || left(md5(_sql), 16);
+    IF NOT EXISTS (SELECT 1 FROM pg_prepared_statements WHERE name = stmt) THEN
+        FOR old_stmt IN
+            SELECT name FROM pg_prepared_statements
+            WHERE name LIKE 'pgstac\_page\_%'
+            ORDER BY prepare_time
+            OFFSET 0 LIMIT greatest(
+                (SELECT count(*) FROM pg_prepared_statements WHERE name LIKE 'pgstac\_page\_%') - 99, 0)
+        LOOP
+            EXECUTE format('DEALLOCATE %I', old_stmt);
+        END LOOP;
+        EXECUTE format('PREPARE %I(timestamptz, timestamptz, int, text[]) AS %s', stmt, _sql);
+    END IF;
+    EXECUTE format('EXECUTE %I(%L, %L, %L, %L)', stmt, _lo, _hi, _lim, _keys) INTO page_rows;
+    RETURN page_rows;
+END;
+$$ LANGUAGE PLPGSQL;
+
 -- search_page: server-hydrate page primitive with keyset pagination and
 -- adaptive cumulative-count bands over partition_bounds' per-month histogram.
 -- Returns typed page components (features json, count, next/prev tokens) so
@@ -265,13 +774,13 @@ DECLARE
     band_margin CONSTANT numeric := 3.0;
     band_safety CONSTANT numeric := 1.5;
     _where text; _hash text; total_count bigint;
-    keyset_w text; full_where text; orderby_str text; keys_proj text;
+    keyset_w text; keys text[]; full_where text; orderby_str text; keys_proj text;
     lead_field text; eff_lead_dir text; datetime_leading boolean;
     acc json := '[]'::json; cnt bigint := 0; has_more boolean := false;
     first_k text[]; last_k text[]; fwd_first_k text[]; fwd_last_k text[];
     have_row boolean := false; next_tok text; prev_tok text;
     next_present boolean; prev_present boolean;
-    _env pred_envelope; _cql2 jsonb;
+    _env pred_envelope; compiled search_compiled%ROWTYPE;
     bnds record; clamp text; clamped_where text;
     band_cap_months CONSTANT int := 18;
     page_rows items[] := '{}'::items[]; chunk_rows items[];
@@ -280,56 +789,82 @@ DECLARE
     band_target numeric; obs_sel numeric; band_where text;
     guard int := 0; cum_scanned bigint := 0;
     proj_expr text; mo interval := interval '1 month';
-    cursor_idx int;
+    cursor_idx int; use_fragments boolean; frags jsonb;
+    use_cache boolean := page_cache(_search->'conf');
+    cache_key text; cached search_page_cache%ROWTYPE;
+    cache_stats_key text;
 BEGIN
     -- The requested STAC `fields` live in the search request; honor them over the (defaulted)
     -- parameter so include/exclude projection is actually applied for search().
     _fields := coalesce(_search->'fields', _fields, '{}'::jsonb);
-    _cql2 := search_to_cql2(_search);
-    _where := cql2_query(_cql2);
-    IF _where IS NULL OR btrim(_where) = '' THEN _where := ' TRUE '; END IF;
-    _hash := search_hash_from_where(_where, '{}'::jsonb);
-    _env := cql2_envelope(_cql2);
+
+    IF use_cache THEN
+        cache_key := search_page_cache_key(_search, _limit, _token, _prev, _fields);
+        SELECT * INTO cached FROM search_page_cache c
+        WHERE c.key = cache_key
+          AND c.created_at >= now() - page_cache_ttl(_search->'conf')
+          AND c.stats_key = envelope_writes(c.env);
+        IF FOUND THEN
+            features := cached.features;
+            number_returned := cached.number_returned;
+            next_token := cached.next_token;
+            prev_token := cached.prev_token;
+            number_matched := cached.number_matched;
+            RETURN;
+        END IF;
+    END IF;
+
+    compiled := search_compile(_search);
+    _where := compiled._where;
+    _hash := compiled.hash;
+    _env := compiled.env;
+
+    -- Read the partition writes before the page so a write landing while it is built changes
+    -- envelope_writes and invalidates the entry.
+    IF use_cache THEN
+        cache_stats_key := envelope_writes(_env);
+    END IF;
 
     SELECT * INTO bnds FROM partition_bounds(_env);
     IF bnds.collections IS NOT NULL THEN
         clamp := format('i.collection = ANY (%L::text[])', bnds.collections);
     END IF;
 
-    SELECT string_agg(expr||' '||CASE WHEN _prev THEN (CASE dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END) ELSE dir END, ', ' ORDER BY ord),
-           'ARRAY['||string_agg(format('(%s)::text', expr), ',' ORDER BY ord)||']::text[]',
-           (array_agg(field ORDER BY ord))[1],
-           (array_agg(CASE WHEN _prev THEN (CASE dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END) ELSE dir END ORDER BY ord))[1]
-    INTO orderby_str, keys_proj, lead_field, eff_lead_dir
-    FROM keyset_sortkeys(_search);
+    orderby_str := CASE WHEN _prev THEN compiled.orderby_prev ELSE compiled.orderby END;
+    keys_proj := compiled.keys_proj;
+    lead_field := compiled.lead_field;
+    eff_lead_dir := CASE WHEN _prev THEN (CASE compiled.lead_dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END)
+                    ELSE compiled.lead_dir END;
     datetime_leading := (lead_field = 'datetime');
     is_asc := (eff_lead_dir = 'ASC');
 
     IF context(_search->'conf') <> 'off' THEN
         DECLARE s searches%ROWTYPE; BEGIN
             s.search := _search; s.metadata := '{}'::jsonb; s._where := _where; s.hash := _hash;
-            s.orderby := keyset_orderby(_search); s.lastused := now(); s.usecount := 1;
+            s.orderby := compiled.orderby; s.lastused := now(); s.usecount := 1; s.anonymous := true;
             PERFORM register_search(s);
         END;
-        total_count := (where_stats(_hash, _where, false, _search->'conf', clamp)).context_count;
+        total_count := (where_stats(
+            _hash, _where, false, _search->'conf', clamp, compiled.cql2, _env)).context_count;
     END IF;
 
+    -- The row queries take the keyset values as $4 rather than inlined, so every page of a search
+    -- runs the same query text (see search_page_rows).
     IF _token IS NOT NULL THEN
-        keyset_w := keyset_where(_search, keyset_decode(_token), _prev);
+        keys := keyset_decode(_token);
+        keyset_w := keyset_where_sortkeys(compiled.sortkeys, keys, _prev, '$4');
     END IF;
     full_where := concat_ws(' AND ', _where, keyset_w);
     IF full_where IS NULL OR btrim(full_where) = '' THEN full_where := 'TRUE'; END IF;
     clamped_where := concat_ws(' AND ', clamp, full_where);
     IF clamped_where IS NULL OR btrim(clamped_where) = '' THEN clamped_where := 'TRUE'; END IF;
 
-    -- Per-row projection. When the requested fields can be satisfied from item columns alone
-    -- (needs_fragment, evaluated once for the whole query), tell content_hydrate to skip the shared
-    -- item_fragments lookup entirely; otherwise it fetches and merges the fragment per row.
-    IF needs_fragment(_fields, bnds.collections) THEN
-        proj_expr := format('content_hydrate(i, %L::jsonb)', _fields);
-    ELSE
-        proj_expr := format('content_hydrate(i, %L::jsonb, true)', _fields);
-    END IF;
+    -- Per-row projection, compiled from the fields once (fields_projection). The page's fragments
+    -- are read once after the page is collected and looked up per row by id; when the requested
+    -- fields can be satisfied from item columns alone (needs_fragment, evaluated once for the
+    -- whole query) item_fragments is not read at all.
+    use_fragments := needs_fragment(_fields, bnds.collections);
+    proj_expr := fields_projection(_fields);
 
     IF datetime_leading AND array_length(bnds.months, 1) IS NOT NULL THEN
         cursor_ts := CASE WHEN is_asc THEN bnds.months[1] ELSE bnds.months[array_length(bnds.months, 1)] + mo END;
@@ -341,10 +876,12 @@ BEGIN
             -- a valid band must be processed even when next_band also flags done (it consumed the
             -- last bucket); only stop when there is no band at all.
             EXIT WHEN band.band_start_idx IS NULL;
-            band_where := format('i.datetime >= %L AND i.datetime < %L AND (%s)',
-                bnds.months[band.band_start_idx], bnds.months[band.band_end_idx] + mo, full_where);
-            EXECUTE format('SELECT array_agg(i ORDER BY %s) FROM (SELECT * FROM items i WHERE %s ORDER BY %s LIMIT %s) i',
-                orderby_str, band_where, orderby_str, target - got) INTO chunk_rows;
+            band_where := format('i.datetime >= $1 AND i.datetime < $2 AND (%s)', full_where);
+            chunk_rows := search_page_rows(
+                format('SELECT array_agg(i ORDER BY %s) FROM (SELECT * FROM items i WHERE %s ORDER BY %s LIMIT $3) i',
+                    orderby_str, band_where, orderby_str),
+                bnds.months[band.band_start_idx], bnds.months[band.band_end_idx] + mo, target - got, keys,
+                _search->'conf');
             got_band := coalesce(array_length(chunk_rows, 1), 0);
             IF chunk_rows IS NOT NULL THEN page_rows := page_rows || chunk_rows; got := got + got_band; END IF;
             cum_scanned := cum_scanned + band.scanned;
@@ -354,16 +891,21 @@ BEGIN
             band_target := ((target - got) / obs_sel) * band_safety;
         END LOOP;
     ELSE
-        EXECUTE format('SELECT array_agg(i ORDER BY %s) FROM (SELECT * FROM items i WHERE %s ORDER BY %s LIMIT %s) i',
-            orderby_str, clamped_where, orderby_str, target) INTO page_rows;
+        page_rows := search_page_rows(
+            format('SELECT array_agg(i ORDER BY %s) FROM (SELECT * FROM items i WHERE %s ORDER BY %s LIMIT $3) i',
+                orderby_str, clamped_where, orderby_str),
+            NULL, NULL, target, keys, _search->'conf');
     END IF;
 
+    IF use_fragments THEN frags := page_fragments(page_rows); END IF;
+
     EXECUTE format($q$
         WITH page AS (
             SELECT %1$s AS content,
                    CASE WHEN row_number() OVER (ORDER BY %2$s) IN (1, %3$s) THEN %4$s END AS keys,
                    row_number() OVER (ORDER BY %2$s) AS rn
-            FROM unnest($1::items[]) i
+            FROM unnest($1::items[]) i,
+                 LATERAL (SELECT $2 -> (i.fragment_id::text) AS frag OFFSET 0) fr
         ),
         counts AS (SELECT count(*) AS n FROM page)
         SELECT
@@ -373,7 +915,7 @@ BEGIN
             (SELECT keys FROM page WHERE rn = LEAST(%3$s, (SELECT n FROM counts)::int))
         FROM page
     $q$, proj_expr, orderby_str, _limit, keys_proj)
-    USING page_rows INTO acc, cnt, first_k, last_k;
+    USING page_rows, frags INTO acc, cnt, first_k, last_k;
 
     IF acc IS NULL THEN acc := '[]'::json; END IF;
     has_more := cnt > _limit;
@@ -397,6 +939,24 @@ BEGIN
     next_token := next_tok;
     prev_token := prev_tok;
     number_matched := total_count;
+
+    IF use_cache AND NOT pgstac.readonly(_search->'conf') THEN
+        INSERT INTO search_page_cache (
+            key, hash, token, lim, prev, fields, features, number_returned, next_token,
+            prev_token, number_matched, env, stats_key, created_at
+        ) VALUES (
+            cache_key, _hash, _token, _limit, _prev, _fields, features, number_returned, next_token,
+            prev_token, number_matched, _env, cache_stats_key, now()
+        ) ON CONFLICT (key) DO UPDATE SET
+            features = EXCLUDED.features,
+            number_returned = EXCLUDED.number_returned,
+            next_token = EXCLUDED.next_token,
+            prev_token = EXCLUDED.prev_token,
+            number_matched = EXCLUDED.number_matched,
+            env = EXCLUDED.env,
+            stats_key = EXCLUDED.stats_key,
+            created_at = EXCLUDED.created_at;
+    END IF;
 END;
 $$;
 
@@ -462,20 +1022,20 @@ CREATE OR REPLACE FUNCTION search_plan(
     OUT context_count    bigint
 ) RETURNS record LANGUAGE plpgsql VOLATILE SECURITY DEFINER SET search_path TO pgstac, public AS $$
 DECLARE
-    _cql2   jsonb := search_to_cql2(_search);
-    _where  text  := cql2_query(_cql2);
+    compiled search_compiled%ROWTYPE := search_compile(_search);
+    _cql2   jsonb := compiled.cql2;
+    _where  text  := compiled._where;
     is_prev boolean := _token LIKE 'prev:%';
     keyset  text  := nullif(regexp_replace(coalesce(_token, ''), '^(next|prev):', ''), '');
     keyset_w text; full_where text; orderby_str text; collist text;
     lead_field text; eff_dir text; _env pred_envelope; _hash text;
     bnds record; coll_clamp text := ''; clamp text;
 BEGIN
-    IF _where IS NULL OR btrim(_where) = '' THEN _where := ' TRUE '; END IF;
     collist := fields_to_itemcols(coalesce(_search->'fields', '{}'::jsonb));
-    orderby_str := keyset_orderby(_search, is_prev);
-    SELECT (array_agg(field ORDER BY ord))[1],
-           (array_agg(CASE WHEN is_prev THEN (CASE dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END) ELSE dir END ORDER BY ord))[1]
-    INTO lead_field, eff_dir FROM keyset_sortkeys(_search);
+    orderby_str := CASE WHEN is_prev THEN compiled.orderby_prev ELSE compiled.orderby END;
+    lead_field := compiled.lead_field;
+    eff_dir := CASE WHEN is_prev THEN (CASE compiled.lead_dir WHEN 'ASC' THEN 'DESC' ELSE 'ASC' END)
+               ELSE compiled.lead_dir END;
     datetime_leading := (lead_field = 'datetime');
     lead_desc := (eff_dir = 'DESC');
 
@@ -485,7 +1045,7 @@ BEGIN
     full_where := concat_ws(' AND ', _where, keyset_w);
     IF full_where IS NULL OR btrim(full_where) = '' THEN full_where := 'TRUE'; END IF;
 
-    _env := cql2_envelope(_cql2);
+    _env := compiled.env;
     SELECT * INTO bnds FROM partition_bounds(_env);
     min_datetime := bnds.months[1];
     max_datetime := bnds.months[array_length(bnds.months, 1)];
@@ -499,8 +1059,8 @@ BEGIN
 
     IF datetime_leading AND array_length(bnds.months, 1) IS NOT NULL THEN
         query := format(
-            'SELECT %s FROM items i WHERE i.collection = ANY($4) AND i.datetime >= $1 AND i.datetime < $2 AND (%s) ORDER BY %s LIMIT $3',
-            collist, full_where, orderby_str);
+            'SELECT %s FROM items i WHERE %si.datetime >= $1 AND i.datetime < $2 AND (%s) ORDER BY %s LIMIT $3',
+            collist, coll_clamp, full_where, orderby_str);
         -- serialize the per-month histogram (months[]/counts[]) to jsonb for the streaming client
         histogram := (
             SELECT jsonb_agg(jsonb_build_object('m', m, 'n', n) ORDER BY ord)
@@ -519,22 +1079,27 @@ BEGIN
     END IF;
 
     IF context(_search->'conf') <> 'off' THEN
-        _hash := search_hash_from_where(_where, '{}'::jsonb);
+        _hash := compiled.hash;
         DECLARE s searches%ROWTYPE; BEGIN
             s.search := _search; s.metadata := '{}'::jsonb; s._where := _where; s.hash := _hash;
-            s.orderby := keyset_orderby(_search); s.lastused := now(); s.usecount := 1;
+            s.orderby := compiled.orderby; s.lastused := now(); s.usecount := 1; s.anonymous := true;
             PERFORM register_search(s);
         END;
-        -- Inline the cached count when stats are fresh (same rule as where_stats), so the client
-        -- can skip ctx_query on a cache hit. NULL => miss/stale => client races ctx_query.
-        SELECT s2.context_count INTO context_count
-        FROM searches s2
-        WHERE s2.hash = _hash
-          AND s2.statslastupdated IS NOT NULL
-          AND s2.context_count IS NOT NULL
-          AND now() - s2.statslastupdated <= context_stats_ttl(_search->'conf');
-        ctx_query := format('SELECT (where_stats(%L, %L, false, %L, %L)).context_count',
-                            _hash, _where, _search->'conf', clamp);
+        -- Inline the exact count from partition_stats or the cached count when stats are fresh
+        -- (same rules as where_stats), so the client can skip ctx_query on a cache hit.
+        -- NULL => miss/stale => client races ctx_query.
+        context_count := partition_stats_count(_cql2, _env);
+        IF context_count IS NULL THEN
+            SELECT s2.context_count INTO context_count
+            FROM searches s2
+            WHERE s2.hash = _hash
+              AND s2.statslastupdated IS NOT NULL
+              AND s2.context_count IS NOT NULL
+              AND now() - s2.statslastupdated <= context_stats_ttl(_search->'conf');
+        END IF;
+        ctx_query := format(
+            'SELECT (where_stats(%L, %L, false, %L, %L, %L, %L::pred_envelope)).context_count',
+            _hash, _where, _search->'conf', clamp, _cql2, _env);
     ELSE
         ctx_query := NULL;
         context_count := NULL;
@@ -18,7 +18,8 @@ SELECT
         'stac_version', content->'stac_version',
         'stac_extensions', content->'stac_extensions'
     ) AS content,
-    content as collectionjson
+    content as collectionjson,
+    q_tsv
 FROM collections;
 
 
@@ -45,7 +46,10 @@ DECLARE
     _eff jsonb := CASE WHEN _search ? 'sortby' THEN _search
                        ELSE _search || '{"sortby":[{"field":"id","direction":"asc"}]}'::jsonb END;
     _cql2 jsonb := search_to_cql2(_search);
-    _where text := coalesce(nullif(btrim(cql2_query(_cql2)), ''), 'TRUE');
+    -- collections always store q_tsv, so q matches it (and its GIN index) whatever q_tsvector is.
+    _where text := coalesce(nullif(btrim(replace(replace(cql2_query(_cql2),
+        'COALESCE(q_tsv, stac_q_tsvector(properties)) @@ ', 'q_tsv @@ '),
+        'stac_q_tsvector(properties) @@ ', 'q_tsv @@ ')), ''), 'TRUE');
     orderby_str text; keys_proj text; keyset_w text; full_where text;
 BEGIN
     -- effective ORDER BY (reversed for prev) + the key projection, from the keyset keys.
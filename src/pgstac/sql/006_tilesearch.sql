@@ -1,7 +1,8 @@
 
 -- geometrysearch: tile/area feature search. Walks the SAME next_band loop as search_page (server-side
 -- adaptive cumulative-count bands over partition_bounds' unified per-month histogram) and hydrates the
--- SAME way (content_hydrate with the needs_fragment skip, json_agg, json output). It differs from
+-- SAME way (page_fragments + content_hydrate_fragment with the needs_fragment skip, json_agg, json
+-- output). It differs from
 -- search_page only in its per-row action: a greedy coverage filter (st_intersection/union +
 -- skipcovered/exitwhenfull) and the scan/limit/time budget that drives early exit. Rows that pass
 -- coverage are collected and hydrated once at the end.
@@ -34,9 +35,13 @@ DECLARE
     unionedgeom_area float := 0; prev_area float := 0;
     _env pred_envelope; bnds record;
     lead_field text; eff_dir text; datetime_leading boolean; is_asc boolean; orderby_str text;
-    cursor_idx int; mo interval := interval '1 month'; band record; band_target numeric; obs_sel numeric;
-    band_fetched int; guard int := 0; cum_scanned bigint := 0;
+    cursor_idx int; use_fragments boolean; frags jsonb;
+    mo interval := interval '1 month'; band record; band_target numeric; obs_sel numeric;
+    band_fetched int; guard int := 0; cum_scanned bigint := 0; nbands int := 0;
 BEGIN
+    -- Clear the counters of any earlier call so they are never read for a call that did not
+    -- finish; they are set again just before returning.
+    PERFORM set_config('pgstac.geometrysearch_stats', '', true);
     -- If the passed in geometry is not an area, coverage tests are meaningless.
     IF ST_GeometryType(geom) !~* 'polygon' THEN
         skipcovered := FALSE; exitwhenfull := FALSE;
@@ -69,13 +74,11 @@ BEGIN
     is_asc := (datetime_leading AND eff_dir = 'ASC');
     orderby_str := search.orderby;
 
-    -- Per-row projection: skip the shared item_fragments lookup when the requested fields are
-    -- satisfiable from item columns alone (needs_fragment, evaluated once for the whole query).
-    IF needs_fragment(coalesce(fields, '{}'::jsonb), bnds.collections) THEN
-        proj_expr := format('content_hydrate(i, %L::jsonb)', coalesce(fields, '{}'::jsonb));
-    ELSE
-        proj_expr := format('content_hydrate(i, %L::jsonb, true)', coalesce(fields, '{}'::jsonb));
-    END IF;
+    -- Per-row projection compiled from the fields (fields_projection): the page's fragments are
+    -- read once at the end, and not at all when the requested fields are satisfiable from item
+    -- columns alone (needs_fragment, evaluated once).
+    use_fragments := needs_fragment(coalesce(fields, '{}'::jsonb), bnds.collections);
+    proj_expr := fields_projection(coalesce(fields, '{}'::jsonb));
 
     IF array_length(bnds.months, 1) IS NOT NULL THEN
         cursor_idx := 1;
@@ -86,6 +89,7 @@ BEGIN
             SELECT * INTO band FROM next_band(bnds.counts, cursor_idx, band_target, band_cap_months);
             -- process a valid band even when next_band also flags done; stop only on no band.
             EXIT bands WHEN band.band_start_idx IS NULL;
+            nbands := nbands + 1;
             query := format(
                 'SELECT * FROM items i WHERE i.collection = ANY(%L::text[]) AND i.datetime >= %L AND i.datetime < %L AND %s ORDER BY %s LIMIT %L',
                 bnds.collections, bnds.months[band.band_start_idx], bnds.months[band.band_end_idx] + mo, _where, orderby_str, remaining_limit);
@@ -133,10 +137,26 @@ BEGIN
         END LOOP;
     END IF;
 
-    -- Hydrate the collected rows once (content_hydrate + needs_fragment skip, json output -- 1GB text
-    -- ceiling, no 256MB jsonb-array limit), exactly like search_page.
-    EXECUTE format('SELECT coalesce(json_agg(%s), ''[]''::json) FROM unnest($1::items[]) i', proj_expr)
-    USING page_rows INTO features;
+    -- Hydrate the collected rows once (page_fragments + content_hydrate_fragment, json output -- 1GB
+    -- text ceiling, no 256MB jsonb-array limit), exactly like search_page.
+    IF use_fragments THEN frags := page_fragments(page_rows); END IF;
+    EXECUTE format(
+        'SELECT coalesce(json_agg(%s), ''[]''::json)
+         FROM unnest($1::items[]) i,
+              LATERAL (SELECT $2 -> (i.fragment_id::text) AS frag OFFSET 0) fr',
+        proj_expr)
+    USING page_rows, frags INTO features;
+
+    -- Scan counters for this call, readable with current_setting('pgstac.geometrysearch_stats', true)
+    -- until the end of the transaction (the tile load harness reads them in the same statement).
+    -- This is the only return, so the counters are set whether or not any band was scanned.
+    PERFORM set_config('pgstac.geometrysearch_stats', json_build_object(
+        'returned', coalesce(array_length(page_rows, 1), 0),
+        'scanned', scancounter - 1,
+        'bands', nbands,
+        'band_rows', cum_scanned,
+        'covered', tilearea > 0 AND unionedgeom_area >= tilearea
+    )::text, true);
 
     RETURN json_build_object(
         'type', 'FeatureCollection',
@@ -149,3 +149,299 @@ BEGIN
 END;
 $$ LANGUAGE PLPGSQL;
 
+
+-- index_expr_key: normalize an index column list or expression so that the deparsed definition
+-- of an existing index can be compared with the expressions queryable() builds (casts,
+-- parentheses, quotes, whitespace and case are dropped).
+CREATE OR REPLACE FUNCTION index_expr_key(expr text) RETURNS text AS $$
+    SELECT regexp_replace(lower(expr), '::[a-z_]+|[\s()"]', '', 'g');
+$$ LANGUAGE SQL IMMUTABLE STRICT PARALLEL SAFE;
+
+-- search_filter_fields: the properties a search filters on, without the prefix used in
+-- queryables and without the core fields that are always indexed. Searches that can no longer
+-- be translated return no fields.
+CREATE OR REPLACE FUNCTION search_filter_fields(_search jsonb) RETURNS text[] AS $$
+BEGIN
+    RETURN ARRAY(
+        SELECT DISTINCT f
+        FROM jsonb_path_query(search_to_cql2(_search), '$.**.property') p
+        JOIN LATERAL replace(p #>> '{}', 'properties.', '') f ON TRUE
+        WHERE f NOT IN ('id', 'collection', 'geometry', 'datetime', 'start_datetime', 'end_datetime')
+        ORDER BY f
+    );
+EXCEPTION WHEN others THEN
+    RETURN '{}'::text[];
+END;
+$$ LANGUAGE PLPGSQL STABLE;
+
+-- index_recommendations: per collection index changes suggested by the searches history
+-- (filters and sortby weighted by searches.usecount) and the index counters in
+-- pg_stat_user_indexes. create_index covers a queryable that searches of at least min_uses
+-- filter on, create_sort_index the sort keys of a sortby that does not lead with a core field,
+-- and drop_index the indexes on a queryable that have never been scanned in a partition that
+-- has been. estimated_rows is the number of rows in the partitions concerned, estimated_size is
+-- a rough size for new indexes (about 16 bytes per key column and 16 per entry) and the current
+-- size for drops. statements are the DDL for each partition, run by index_advisor.
+CREATE OR REPLACE FUNCTION index_recommendations(min_uses bigint DEFAULT 10)
+RETURNS TABLE(
+    action text,
+    collection text,
+    fields text[],
+    searches bigint,
+    uses bigint,
+    idx_scan bigint,
+    estimated_rows bigint,
+    estimated_size bigint,
+    statements text[]
+) AS $$
+WITH parts AS (
+    SELECT
+        m.partition,
+        m.collection,
+        greatest(m.reltuples, 0)::bigint AS reltuples,
+        coalesce(t.seq_scan, 0) + coalesce(t.idx_scan, 0) AS scans
+    FROM partition_sys_meta m
+    LEFT JOIN pg_stat_user_tables t ON (t.relid = format('pgstac.%I', m.partition)::regclass)
+), idx AS (
+    SELECT
+        p.collection,
+        p.partition,
+        p.reltuples,
+        p.scans,
+        c.relname::text AS indexname,
+        index_expr_key(pg_get_indexdef(i.indexrelid, 1, true)) AS lead_key,
+        index_expr_key(substring(pg_get_indexdef(i.indexrelid) FROM 'USING \w+ \((.*)\)')) AS cols_key,
+        i.indisunique AS isunique,
+        coalesce(s.idx_scan, 0) AS idx_scan,
+        pg_relation_size(i.indexrelid) AS size
+    FROM parts p
+    JOIN pg_index i ON (i.indrelid = format('pgstac.%I', p.partition)::regclass)
+    JOIN pg_class c ON (c.oid = i.indexrelid)
+    LEFT JOIN pg_stat_user_indexes s ON (s.indexrelid = i.indexrelid)
+), qx AS (
+    SELECT
+        q.name,
+        replace(q.name, 'properties.', '') AS field,
+        q.collection_ids,
+        q.definition,
+        e.expression,
+        index_expr_key(e.expression) AS key,
+        CASE WHEN q.definition->>'type' = 'array' OR e.wrapper = 'to_text_array' THEN 'gin' ELSE 'btree' END AS method
+    FROM queryables q
+    JOIN LATERAL queryable(q.name) e ON TRUE
+    WHERE
+        q.name NOT IN ('id', 'collection', 'geometry', 'datetime', 'end_datetime')
+        AND coalesce(q.definition->>'type', '') != 'object'
+), used AS (
+    SELECT s.hash, s.search, s.usecount, c.collection
+    FROM searches s
+    JOIN (SELECT DISTINCT collection FROM parts) c ON (
+        NOT s.search ? 'collections' OR s.search->'collections' ? c.collection
+    )
+    WHERE s.usecount > 0
+), filter_uses AS (
+    SELECT u.collection, f.field, count(*) AS searches, sum(u.usecount)::bigint AS uses
+    FROM used u
+    JOIN (
+        SELECT hash, unnest(search_filter_fields(search)) AS field FROM searches WHERE usecount > 0
+    ) f USING (hash)
+    GROUP BY 1, 2
+), sort_uses AS (
+    SELECT u.collection, k.fields, k.cols, k.rcols, k.nkeys, count(*) AS searches, sum(u.usecount)::bigint AS uses
+    FROM used u
+    JOIN LATERAL (
+        SELECT
+            array_agg(replace(field, 'properties.', '') ORDER BY ord) AS fields,
+            string_agg(expr || CASE dir WHEN 'DESC' THEN ' DESC' ELSE '' END, ', ' ORDER BY ord) AS cols,
+            string_agg(expr || CASE dir WHEN 'DESC' THEN '' ELSE ' DESC' END, ', ' ORDER BY ord) AS rcols,
+            count(*) AS nkeys
+        FROM keyset_sortkeys(u.search)
+    ) k ON TRUE
+    WHERE
+        u.search ? 'sortby'
+        AND k.fields[1] NOT IN ('id', 'collection', 'datetime', 'start_datetime', 'end_datetime')
+    GROUP BY 1, 2, 3, 4, 5
+), recs AS (
+    SELECT
+        'create_index'::text AS action,
+        f.collection,
+        ARRAY[f.field] AS fields,
+        f.searches,
+        f.uses,
+        NULL::bigint AS idx_scan,
+        sum(p.reltuples)::bigint AS estimated_rows,
+        (sum(p.reltuples) * 32)::bigint AS estimated_size,
+        array_agg(
+            format('CREATE INDEX ON %I USING %s (%s);', p.partition, q.method, q.expression)
+            ORDER BY p.partition
+        ) AS statements
+    FROM filter_uses f
+    JOIN LATERAL (
+        SELECT * FROM qx
+        WHERE qx.field = f.field AND (qx.collection_ids IS NULL OR f.collection = ANY(qx.collection_ids))
+        LIMIT 1
+    ) q ON TRUE
+    JOIN parts p ON (p.collection = f.collection)
+    WHERE
+        f.uses >= min_uses
+        AND NOT EXISTS (SELECT 1 FROM idx WHERE idx.partition = p.partition AND idx.lead_key = q.key)
+    GROUP BY 1, 2, 3, 4, 5
+    UNION ALL
+    SELECT
+        'create_sort_index',
+        s.collection,
+        s.fields,
+        s.searches,
+        s.uses,
+        NULL,
+        sum(p.reltuples)::bigint,
+        (sum(p.reltuples) * (16 + 16 * s.nkeys))::bigint,
+        array_agg(format('CREATE INDEX ON %I USING btree (%s);', p.partition, s.cols) ORDER BY p.partition)
+    FROM sort_uses s
+    JOIN parts p ON (p.collection = s.collection)
+    WHERE
+        s.uses >= min_uses
+        AND NOT EXISTS (
+            SELECT 1 FROM idx
+            WHERE idx.partition = p.partition AND (
+                starts_with(idx.cols_key || ',', index_expr_key(s.cols) || ',')
+                OR starts_with(idx.cols_key || ',', index_expr_key(s.rcols) || ',')
+            )
+        )
+    GROUP BY 1, 2, 3, 4, 5
+    UNION ALL
+    SELECT
+        'drop_index',
+        i.collection,
+        ARRAY[q.field],
+        coalesce(f.searches, 0),
+        coalesce(f.uses, 0),
+        sum(i.idx_scan)::bigint,
+        sum(i.reltuples)::bigint,
+        sum(i.size)::bigint,
+        array_agg(format('DROP INDEX IF EXISTS %I;', i.indexname) ORDER BY i.indexname)
+    FROM idx i
+    JOIN qx q ON (
+        i.lead_key = q.key AND (q.collection_ids IS NULL OR i.collection = ANY(q.collection_ids))
+    )
+    LEFT JOIN filter_uses f ON (f.collection = i.collection AND f.field = q.field)
+    WHERE NOT i.isunique
+    GROUP BY 1, 2, 3, 4, 5
+    HAVING sum(i.idx_scan) = 0 AND sum(i.scans) > 0
+)
+SELECT * FROM recs
+ORDER BY action, coalesce(uses, 0) * coalesce(estimated_rows, 0) DESC, estimated_size DESC, collection;
+$$ LANGUAGE SQL STABLE;
+
+-- index_advisor: return index_recommendations and, with apply, carry them out through the
+-- queryables so that maintain_partitions keeps them: create_index sets property_index_type on the
+-- queryable (whose trigger then builds the indexes through run_or_queue) and drop_index clears it
+-- before its DROP INDEX statements are run through run_or_queue. create_sort_index has no
+-- queryable equivalent and is only reported. Deferred search usage is flushed first so that
+-- usecount is current.
+CREATE OR REPLACE FUNCTION index_advisor(min_uses bigint DEFAULT 10, apply boolean DEFAULT FALSE)
+RETURNS TABLE(
+    action text,
+    collection text,
+    fields text[],
+    searches bigint,
+    uses bigint,
+    idx_scan bigint,
+    estimated_rows bigint,
+    estimated_size bigint,
+    statements text[]
+) AS $$
+DECLARE
+    rec record;
+    _changes jsonb := '[]'::jsonb;
+    stmt text;
+BEGIN
+    IF NOT pgstac.readonly() THEN
+        PERFORM flush_search_usage();
+    END IF;
+    FOR rec IN SELECT * FROM index_recommendations(min_uses) LOOP
+        action := rec.action;
+        collection := rec.collection;
+        fields := rec.fields;
+        searches := rec.searches;
+        uses := rec.uses;
+        idx_scan := rec.idx_scan;
+        estimated_rows := rec.estimated_rows;
+        estimated_size := rec.estimated_size;
+        statements := rec.statements;
+        RETURN NEXT;
+        IF rec.action IN ('create_index', 'drop_index') THEN
+            _changes := _changes || jsonb_build_object(
+                'qfield', rec.fields[1],
+                'coll', rec.collection,
+                'method', CASE WHEN rec.action = 'create_index' THEN upper(substring(rec.statements[1] FROM 'USING (\w+)')) END,
+                'drops', CASE WHEN rec.action = 'drop_index' THEN to_jsonb(rec.statements) END
+            );
+        END IF;
+    END LOOP;
+    IF NOT apply THEN
+        RETURN;
+    END IF;
+
+    -- One update for all changes so maintain_partitions runs once. A queryable shared by
+    -- collections that want both keeps its index.
+    UPDATE queryables q SET property_index_type = c.method
+    FROM (
+        SELECT DISTINCT ON (q2.id) q2.id, a.method
+        FROM queryables q2
+        JOIN jsonb_to_recordset(_changes) a(qfield text, coll text, method text) ON (
+            replace(q2.name, 'properties.', '') = a.qfield
+            AND (q2.collection_ids IS NULL OR a.coll = ANY(q2.collection_ids))
+        )
+        ORDER BY q2.id, a.method NULLS LAST
+    ) c
+    WHERE q.id = c.id;
+
+    FOR stmt IN
+        SELECT jsonb_array_elements_text(a.drops)
+        FROM jsonb_to_recordset(_changes) a(qfield text, coll text, drops jsonb)
+        WHERE
+            a.drops IS NOT NULL
+            AND NOT EXISTS (
+                SELECT 1 FROM queryables q
+                WHERE
+                    replace(q.name, 'properties.', '') = a.qfield
+                    AND (q.collection_ids IS NULL OR a.coll = ANY(q.collection_ids))
+                    AND q.property_index_type IS NOT NULL
+            )
+    LOOP
+        PERFORM run_or_queue(stmt);
+    END LOOP;
+    RETURN;
+END;
+$$ LANGUAGE PLPGSQL;
+
+-- update_q_tsvector: fill items.q_tsv for the rows that do not have it yet, with one run_or_queue
+-- statement per partition. The vector is built from the hydrated properties so that properties
+-- kept in item fragments are included. With q_tsvector on, the q_tsv GIN indexes are then created
+-- by maintain_partitions.
+CREATE OR REPLACE FUNCTION update_q_tsvector(_collection text DEFAULT NULL) RETURNS VOID AS $$
+DECLARE
+    p record;
+BEGIN
+    FOR p IN
+        SELECT collection, partition_dtrange FROM partition_sys_meta
+        WHERE _collection IS NULL OR collection = _collection
+        ORDER BY partition
+    LOOP
+        PERFORM run_or_queue(format(
+            $q$
+            UPDATE items i
+            SET q_tsv = stac_q_tsvector(content_hydrate(i, '{"include": ["properties"]}'::jsonb)->'properties')
+            WHERE i.collection = %L AND i.datetime >= %L AND i.datetime < %L AND i.q_tsv IS NULL;
+            $q$,
+            p.collection,
+            lower(p.partition_dtrange),
+            upper(p.partition_dtrange)
+        ));
+    END LOOP;
+    IF q_tsvector() THEN
+        PERFORM maintain_partitions();
+    END IF;
+END;
+$$ LANGUAGE PLPGSQL;
@@ -69,10 +69,20 @@ INSERT INTO pgstac_settings (name, value) VALUES
   ('queue_timeout', '10 minutes'),
   ('update_collection_extent', 'false'),
   ('format_cache', 'false'),
-  ('readonly', 'false')
+  ('readonly', 'false'),
+  ('use_item_lookup', 'false'),
+  ('page_cache', 'false'),
+  ('page_cache_ttl', '10 minutes'),
+  ('compiled_searches', 'false'),
+  ('prepared_searches', 'false'),
+  ('defer_search_usage', 'false'),
+  ('q_tsvector', 'false'),
+  ('exact_partition_counts', 'true')
 ON CONFLICT DO NOTHING
 ;
 
+SELECT item_lookup_triggers();
+
 
 INSERT INTO cql2_ops (op, template, types) VALUES
     ('eq', '%s = %s', NULL),
@@ -133,6 +143,7 @@ GRANT EXECUTE ON FUNCTION search TO pgstac_read;
 GRANT EXECUTE ON FUNCTION search_query TO pgstac_read;
 GRANT EXECUTE ON FUNCTION item_by_id TO pgstac_read;
 GRANT EXECUTE ON FUNCTION get_item TO pgstac_read;
+GRANT EXECUTE ON FUNCTION get_items TO pgstac_read;
 GRANT EXECUTE ON FUNCTION content_hydrate TO pgstac_read;
 GRANT EXECUTE ON FUNCTION search_page TO pgstac_read;
 GRANT EXECUTE ON FUNCTION search_plan TO pgstac_read;
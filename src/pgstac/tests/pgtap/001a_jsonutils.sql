@@ -129,3 +129,9 @@ SELECT results_eq(
     $$ SELECT decode('77f18c0a2c2c9f9e4836045bae644ba3d00c0308c9d2c0bd024624c22d532bf7', 'hex') $$,
     'jsonb_hash returns a 32-byte bytea matching an externally-computed sha256 of the canonical form'
 );
+
+SELECT is(
+    jsonb_merge_member('{"a": {"x": 1}, "b": 2}', '{"a": {"y": 3}, "c": 4}', 'a'),
+    jsonb_merge_recursive('{"a": {"x": 1}, "b": 2}', '{"a": {"y": 3}, "c": 4}') -> 'a',
+    'jsonb_merge_member returns one key of jsonb_merge_recursive'
+);
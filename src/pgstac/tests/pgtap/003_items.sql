@@ -10,6 +10,7 @@ SELECT is_partitioned('pgstac'::name,'items'::name);
 
 
 SELECT has_function('pgstac'::name, 'get_item', ARRAY['text','text']);
+SELECT has_function('pgstac'::name, 'get_items', ARRAY['text[]','text[]']);
 SELECT has_function('pgstac'::name, 'delete_item', ARRAY['text','text']);
 SELECT has_function('pgstac'::name, 'create_item', ARRAY['jsonb']);
 SELECT has_function('pgstac'::name, 'update_item', ARRAY['jsonb']);
@@ -434,6 +435,38 @@ SELECT results_eq($$
     $$,
     'get_item hydrates split-storage bbox'
 );
+SELECT results_eq($$
+    SELECT g->>'id' FROM get_items(
+        ARRAY['pgstac-test-item-0005', 'does-not-exist', 'pgstac-test-item-0004'],
+        NULL
+    ) g;
+    $$,$$
+    SELECT * FROM (VALUES ('pgstac-test-item-0005'), ('pgstac-test-item-0004')) v;
+    $$,
+    'get_items returns found items in the requested order'
+);
+SELECT results_eq($$
+    SELECT g FROM get_items(
+        ARRAY['pgstac-test-item-0004'],
+        ARRAY['pgstac-test-collection']
+    ) g;
+    $$,$$
+    SELECT get_item('pgstac-test-item-0004', 'pgstac-test-collection');
+    $$,
+    'get_items hydrates items the same as get_item'
+);
+SELECT is_empty($$
+    SELECT * FROM get_items(ARRAY['pgstac-test-item-0004'], ARRAY['not-a-collection']);
+    $$,
+    'get_items matches ids within the paired collection'
+);
+SELECT throws_ok($$
+    SELECT * FROM get_items(ARRAY['a', 'b'], ARRAY['pgstac-test-collection']);
+    $$,
+    'P0001',
+    'collections must be NULL or have one entry per id.',
+    'get_items requires one collection per id'
+);
 
 SELECT lives_ok($$
     DELETE FROM item_field_registry
@@ -861,3 +894,61 @@ SELECT results_eq(
 );
 
 SELECT delete_item('pgstac-test-range-datetime', 'pgstac-test-collection');
+
+-- ---------------------------------------------------------------------------
+-- item_lookup: optional global id -> partition lookup
+-- ---------------------------------------------------------------------------
+
+SELECT has_table('pgstac'::name, 'item_lookup'::name);
+SELECT is_empty(
+    $$ SELECT tgname FROM pg_trigger WHERE tgrelid = 'items'::regclass AND tgname LIKE 'items_lookup_%'; $$,
+    'item_lookup triggers are not installed while use_item_lookup is off'
+);
+SET pgstac.use_item_lookup TO 'true';
+SELECT ok(item_lookup_triggers(), 'item_lookup_triggers installs the triggers when use_item_lookup is on');
+
+SELECT create_item('{
+  "id": "pgstac-test-lookup-0001",
+  "collection": "pgstac-test-collection",
+  "type": "Feature",
+  "stac_version": "1.0.0",
+  "geometry": {"type": "Point", "coordinates": [0, 0]},
+  "bbox": [0, 0, 0, 0],
+  "links": [], "assets": {},
+  "properties": {"datetime": "2012-01-01T00:00:00Z"}
+}'::jsonb);
+
+SELECT results_eq($$
+    SELECT collection, datetime FROM item_lookup WHERE id = 'pgstac-test-lookup-0001';
+    $$,$$
+    SELECT 'pgstac-test-collection'::text, '2012-01-01T00:00:00Z'::timestamptz;
+    $$,
+    'item_lookup is maintained by item inserts'
+);
+
+SELECT results_eq($$
+    SELECT get_item('pgstac-test-lookup-0001');
+    $$,$$
+    SELECT get_item('pgstac-test-lookup-0001', 'pgstac-test-collection');
+    $$,
+    'get_item without a collection uses item_lookup'
+);
+
+SELECT lives_ok(
+    $$ SELECT delete_item('pgstac-test-lookup-0001'); $$,
+    'delete_item without a collection uses item_lookup'
+);
+
+SELECT is_empty(
+    $$ SELECT * FROM item_lookup WHERE id = 'pgstac-test-lookup-0001'; $$,
+    'item_lookup is maintained by item deletes'
+);
+
+SELECT results_eq(
+    $$ SELECT item_lookup_rebuild(); $$,
+    $$ SELECT count(*) FROM items; $$,
+    'item_lookup_rebuild indexes every item'
+);
+
+RESET pgstac.use_item_lookup;
+SELECT ok(NOT item_lookup_triggers(), 'item_lookup_triggers drops the triggers when use_item_lookup is off');
@@ -113,6 +113,16 @@ SELECT results_eq($$
     'fields with a key in both include and exclude: exclude wins');
 
 
+SELECT ok(
+    fields_to_itemcols('{"include":["id","properties.gsd"]}') ~ '\mi\.properties\M'
+    AND fields_to_itemcols('{"include":["id","properties.gsd"]}') ~ 'NULL::jsonb AS assets',
+    'fields_to_itemcols keeps a column when the include list names a path beneath it');
+
+SELECT ok(
+    fields_to_itemcols('{}', true) ~ 'ST_AsGeoJSON\(i\.geometry, 20\)::jsonb AS geometry'
+    AND fields_to_itemcols('{}', true) !~ '\m(private|item_hash|q_tsv)\M',
+    'fields_to_itemcols for client side hydration returns GeoJSON and skips unused columns');
+
 SELECT has_function('pgstac'::name, 'search_query', ARRAY['jsonb','jsonb']);
 
 SELECT ok(
@@ -833,3 +843,408 @@ SELECT is(
     '2',
     'Make sure all matching items are returned when items with the same ID are in multiple collections, all collections specified. #192'
 );
+
+SET pgstac.page_cache TO 'true';
+
+SELECT is(
+    (SELECT number_returned FROM search_page('{"collections": ["pgstac-test-collection"]}', 2)),
+    2,
+    'search_page builds the page on a page cache miss'
+);
+
+SELECT is(
+    (SELECT count(*) FROM search_page_cache),
+    1::bigint,
+    'search_page stores the page in the page cache'
+);
+
+UPDATE search_page_cache SET features = '[]'::json, number_returned = 0;
+
+SELECT is(
+    (SELECT number_returned FROM search_page('{"collections": ["pgstac-test-collection"]}', 2)),
+    0,
+    'search_page serves a page cache hit from the cache'
+);
+
+SET pgstac.use_queue TO 'true';
+SELECT create_item(jsonb_set(
+    get_item('pgstac-test-item-0003', 'pgstac-test-collection'), '{id}', '"pgstac-test-item-writes"'
+));
+
+SELECT is(
+    (SELECT number_returned FROM search_page('{"collections": ["pgstac-test-collection"]}', 2)),
+    2,
+    'page cache entries are invalidated by writes to a partition in the envelope while partition stats are queued'
+);
+
+SELECT delete_item('pgstac-test-item-writes', 'pgstac-test-collection');
+RESET pgstac.use_queue;
+DELETE FROM query_queue;
+
+RESET pgstac.page_cache;
+
+SELECT is(
+    (SELECT sum(exact_n) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    (SELECT count(*)::numeric FROM items WHERE collection = 'pgstac-test-collection'),
+    'partition_stats.exact_n counts the items in each partition'
+);
+
+SET pgstac.use_queue TO 'true';
+
+SELECT create_item(jsonb_set(
+    get_item('pgstac-test-item-0003', 'pgstac-test-collection'), '{id}', '"pgstac-test-item-exact-n"'
+));
+
+SELECT is(
+    (SELECT sum(exact_n) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    (SELECT count(*)::numeric FROM items WHERE collection = 'pgstac-test-collection'),
+    'partition_stats.exact_n is incremented on insert while partition stats are queued'
+);
+
+SELECT delete_item('pgstac-test-item-exact-n', 'pgstac-test-collection');
+
+SELECT is(
+    (SELECT sum(exact_n) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    (SELECT count(*)::numeric FROM items WHERE collection = 'pgstac-test-collection'),
+    'partition_stats.exact_n is decremented on delete while partition stats are queued'
+);
+
+SELECT create_item(jsonb_set(jsonb_set(
+    get_item('pgstac-test-item-0003', 'pgstac-test-collection'), '{id}', '"pgstac-test-item-exact-n"'
+), '{properties,datetime}', '"2100-01-01T00:00:00Z"'));
+
+SELECT ok(
+    (SELECT bool_or(dtrange @> '2100-01-01T00:00:00Z'::timestamptz) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    'partition_stats.dtrange is widened on insert while partition stats are queued'
+);
+
+SELECT delete_item('pgstac-test-item-exact-n', 'pgstac-test-collection');
+
+SET pgstac.exact_partition_counts TO 'false';
+SELECT create_item(jsonb_set(
+    get_item('pgstac-test-item-0003', 'pgstac-test-collection'), '{id}', '"pgstac-test-item-exact-n"'
+));
+
+SELECT ok(
+    (SELECT bool_or(exact_n IS NULL) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    'with exact_partition_counts off the items triggers clear exact_n instead of counting'
+);
+
+SELECT delete_item('pgstac-test-item-exact-n', 'pgstac-test-collection');
+RESET pgstac.exact_partition_counts;
+
+SELECT partition_written(partition) FROM partition_stats WHERE collection = 'pgstac-test-collection';
+
+SELECT ok(
+    (SELECT bool_and(exact_n IS NULL) FROM partition_stats WHERE collection = 'pgstac-test-collection'),
+    'partition_written clears exact_n until the partition is recounted'
+);
+
+RESET pgstac.use_queue;
+DELETE FROM query_queue;
+SELECT update_partition_stats(partition) FROM partition_stats WHERE collection = 'pgstac-test-collection';
+
+UPDATE partition_stats SET exact_n = exact_n + 1000 WHERE collection = 'pgstac-test-collection';
+
+SELECT is(
+    (SELECT (search('{"collections": ["pgstac-test-collection"], "conf": {"context": "on"}}')->>'numberMatched')::bigint),
+    (SELECT count(*) + 1000 FROM items WHERE collection = 'pgstac-test-collection'),
+    'numberMatched for a collection only search is summed from partition_stats'
+);
+
+UPDATE partition_stats SET exact_n = exact_n - 1000 WHERE collection = 'pgstac-test-collection';
+
+SELECT ok(
+    partition_stats_count(search_to_cql2('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003"]}')) IS NULL,
+    'partition_stats_count does not answer searches with other filters'
+);
+
+SELECT is(
+    (SELECT (search('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"], "conf": {"context": "on"}}')->>'numberMatched')::bigint),
+    3::bigint,
+    'numberMatched is counted per partition'
+);
+
+SELECT is(
+    (SELECT sum(count) FROM search_partition_counts WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"], "conf": {"context": "on"}}')),
+    3::numeric,
+    'context counts are stored per search hash and partition'
+);
+
+INSERT INTO partition_stats (partition, collection) VALUES ('_items_pgstac_test_dropped', 'pgstac-test-collection');
+INSERT INTO search_partition_counts (hash, partition, writes, count) VALUES ('pgstac-test-hash', '_items_pgstac_test_dropped', 0, 5);
+DELETE FROM partition_stats WHERE partition = '_items_pgstac_test_dropped';
+
+SELECT ok(
+    NOT EXISTS (SELECT 1 FROM search_partition_counts WHERE partition = '_items_pgstac_test_dropped'),
+    'context counts are deleted with the stats of their partition'
+);
+
+UPDATE search_partition_counts SET count = count + 1000
+WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"], "conf": {"context": "on"}}');
+
+SELECT is(
+    search_partition_count(
+        search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}'),
+        stac_search_to_where('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}'),
+        search_envelope('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}')
+    ),
+    1003::bigint,
+    'search_partition_count reuses the counts of partitions that have not changed'
+);
+
+SET pgstac.use_queue TO 'true';
+SELECT create_item(jsonb_set(
+    get_item('pgstac-test-item-0003', 'pgstac-test-collection'), '{id}', '"pgstac-test-item-writes"'
+));
+
+SELECT is(
+    search_partition_count(
+        search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}'),
+        stac_search_to_where('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}'),
+        search_envelope('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003", "pgstac-test-item-0004", "pgstac-test-item-0005"]}')
+    ),
+    3::bigint,
+    'search_partition_count recounts partitions written since, while partition stats are queued'
+);
+
+SELECT delete_item('pgstac-test-item-writes', 'pgstac-test-collection');
+RESET pgstac.use_queue;
+DELETE FROM query_queue;
+
+SELECT is(
+    (SELECT count(*) FROM items i
+     WHERE content_hydrate(i) IS DISTINCT FROM
+        content_hydrate_fragment(i, page_fragments(ARRAY[i]) -> (i.fragment_id::text))),
+    0::bigint,
+    'content_hydrate_fragment with the page_fragments map matches content_hydrate'
+);
+
+-- fields_projection builds the same item as content_hydrate without hydrating the excluded parts.
+SELECT results_eq(
+    format(
+        'SELECT %s FROM items i, LATERAL (SELECT page_fragments(ARRAY[i]) -> (i.fragment_id::text) AS frag) fr ORDER BY i.id',
+        fields_projection(f)
+    ),
+    format('SELECT content_hydrate(i, %L::jsonb) FROM items i ORDER BY i.id', f),
+    format('fields_projection matches content_hydrate for %s', f)
+)
+FROM (VALUES
+    ('{"include": ["id", "properties.datetime", "properties.eo:cloud_cover"]}'::jsonb),
+    ('{"include": ["geometry", "assets.image", "links", "properties.nope.deeper"]}'::jsonb),
+    ('{"include": ["properties", "stac_version"], "exclude": ["properties.datetime"]}'::jsonb),
+    ('{"exclude": ["assets", "links", "properties.eo:cloud_cover"]}'::jsonb)
+) t(f);
+
+SELECT results_eq($$
+    SELECT k->>'type' FROM jsonb_array_elements(keyset_sortkeys_typed(
+        '{"sortby": [{"field": "eo:cloud_cover", "direction": "asc"}, {"field": "datetime", "direction": "desc"}]}'
+    )) k ORDER BY (k->>'ord')::int
+    $$, $$
+    VALUES ('double precision'), ('timestamp with time zone'), ('text'), ('text')
+    $$,
+    'keyset_sortkeys_typed reads sort key types from the catalog'
+);
+
+-- Compiled searches are only stored with compiled_searches on, are reused across paging/fields
+-- and are cleared when settings change or by age.
+SELECT search_compile('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003"]}');
+
+SELECT is(
+    (SELECT count(*) FROM search_compiled),
+    0::bigint,
+    'search_compile does not store searches unless compiled_searches is on'
+);
+
+SET pgstac.compiled_searches TO 'true';
+
+SELECT is(
+    (search_compile('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]}, "limit": 5}'))._where,
+    stac_search_to_where('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]}}'),
+    'search_compile produces the same WHERE clause as stac_search_to_where'
+);
+
+SELECT is(
+    (SELECT count(*) FROM search_compiled
+     WHERE key IN (
+        search_compile_key('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]}, "limit": 5}'),
+        search_compile_key('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]}, "limit": 10, "fields": {"include": ["id"]}}')
+     )),
+    1::bigint,
+    'search_compiled is keyed without limit and fields'
+);
+
+UPDATE search_compiled SET created_at = now() - '2 days'::interval;
+
+SELECT is(
+    gc_search_compiled(),
+    1::bigint,
+    'gc_search_compiled deletes compiled searches older than the retention interval'
+);
+
+SELECT search_compile('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0003"]}');
+
+UPDATE pgstac_settings SET value = value WHERE name = 'context';
+
+SELECT is(
+    (SELECT count(*) FROM search_compiled),
+    0::bigint,
+    'changing pgstac_settings clears search_compiled'
+);
+
+RESET pgstac.compiled_searches;
+
+-- Prepared row queries return the same pages as EXECUTE, including keyset pages.
+SELECT is(
+    (search_page('{"collections": ["pgstac-test-collection"], "conf": {"prepared_searches": true}}', 5)).features::text,
+    (search_page('{"collections": ["pgstac-test-collection"]}', 5)).features::text,
+    'search_page returns the same first page with prepared_searches'
+);
+
+SELECT is(
+    (search_page('{"collections": ["pgstac-test-collection"], "conf": {"prepared_searches": true}}', 5,
+        (search_page('{"collections": ["pgstac-test-collection"]}', 5)).next_token)).features::text,
+    (search_page('{"collections": ["pgstac-test-collection"]}', 5,
+        (search_page('{"collections": ["pgstac-test-collection"]}', 5)).next_token)).features::text,
+    'search_page returns the same keyset page with prepared_searches'
+);
+
+SELECT ok(
+    EXISTS (SELECT 1 FROM pg_prepared_statements WHERE name LIKE 'pgstac\_page\_%'),
+    'prepared_searches prepares the search_page row queries'
+);
+
+-- Deferred search usage only appends to search_usage until it is flushed.
+SET pgstac.defer_search_usage TO 'true';
+SELECT search_query('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}');
+SELECT search_query('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}');
+SELECT search_query('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}');
+
+SELECT is(
+    (SELECT usecount FROM searches
+     WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}')),
+    1::bigint,
+    'register_search writes a hash only once with defer_search_usage'
+);
+
+SELECT ok(flush_search_usage() > 0, 'flush_search_usage updates the searches that were used');
+
+SELECT is(
+    (SELECT usecount FROM searches WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}')),
+    3::bigint,
+    'flush_search_usage folds deferred uses into searches'
+);
+RESET pgstac.defer_search_usage;
+
+SELECT search_page('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0008"], "conf": {"context": "on"}}');
+
+SELECT ok(
+    (SELECT anonymous FROM searches WHERE search->'ids' = '["pgstac-test-item-0008"]'::jsonb)
+    AND NOT (SELECT anonymous FROM searches WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}')),
+    'searches registered by search_page are anonymous, those registered by search_query are not'
+);
+
+UPDATE searches SET lastused = now() - '60 days'::interval
+WHERE
+    hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}')
+    OR search->'ids' = '["pgstac-test-item-0008"]'::jsonb;
+
+SELECT ok(gc_searches('30 days') >= 1, 'gc_searches returns the number of searches deleted');
+
+SELECT ok(
+    NOT EXISTS (SELECT 1 FROM searches WHERE search->'ids' = '["pgstac-test-item-0008"]'::jsonb),
+    'gc_searches deletes anonymous searches that have not been used'
+);
+
+SELECT ok(
+    EXISTS (SELECT 1 FROM searches WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "ids": ["pgstac-test-item-0007"]}')),
+    'gc_searches keeps searches registered through search_query'
+);
+
+-- Index advisor.
+SELECT is(
+    index_expr_key($$to_float((properties -> 'eo:cloud_cover'::text))$$),
+    index_expr_key($$to_float(properties->'eo:cloud_cover')$$),
+    'index_expr_key matches deparsed index expressions with queryable expressions'
+);
+
+SELECT is(
+    search_filter_fields('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "properties.eo:cloud_cover"}, 42]}}'),
+    '{eo:cloud_cover}'::text[],
+    'search_filter_fields lists the properties a search filters on'
+);
+
+SELECT search_query('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 42]}, "sortby": [{"field": "eo:cloud_cover", "direction": "asc"}]}');
+UPDATE searches SET usecount = 100
+WHERE hash = search_hash('{"collections": ["pgstac-test-collection"], "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 42]}}');
+
+SELECT ok(
+    EXISTS (
+        SELECT 1 FROM index_recommendations(50)
+        WHERE action = 'create_sort_index' AND collection = 'pgstac-test-collection' AND fields[1] = 'eo:cloud_cover'
+    ),
+    'index_recommendations suggests a sort index for a frequent sortby'
+);
+
+SELECT lives_ok(
+    $$ SELECT * FROM index_advisor(50) $$,
+    'index_advisor runs over the searches history'
+);
+
+SELECT lives_ok(
+    $$ SELECT * FROM index_advisor(50, true) $$,
+    'index_advisor applies its recommendations'
+);
+
+SELECT ok(
+    NOT EXISTS (SELECT 1 FROM index_recommendations(50) WHERE action = 'create_index'),
+    'index_advisor creates the recommended indexes through the queryables'
+);
+
+-- Stored tsvector for the q operator.
+SELECT is(
+    q_op_query('"lizard"'::jsonb),
+    format('stac_q_tsvector(properties) @@ %L', q_to_tsquery('"lizard"'::jsonb)),
+    'q_op_query builds the tsvector from properties by default'
+);
+
+SET pgstac.q_tsvector TO 'true';
+SELECT is(
+    q_op_query('"lizard"'::jsonb),
+    format('COALESCE(q_tsv, stac_q_tsvector(properties)) @@ %L', q_to_tsquery('"lizard"'::jsonb)),
+    'q_op_query matches the stored q_tsv with q_tsvector on'
+);
+
+UPDATE items SET properties = coalesce(properties, '{}'::jsonb) || '{"description": "A large lizard"}'::jsonb
+WHERE id = 'pgstac-test-item-0003';
+
+SELECT is(
+    json_array_length(search('{"q": "lizard"}')->'features'),
+    1,
+    'q matches items whose q_tsv has not been backfilled with q_tsvector on'
+);
+
+UPDATE items SET properties = properties - 'description' WHERE id = 'pgstac-test-item-0003';
+
+SELECT ok(
+    (content_dehydrate('{"id": "pgstac-test-q", "collection": "pgstac-test-collection", "geometry": {"type": "Point", "coordinates": [0, 0]}, "properties": {"datetime": "2011-08-25T00:00:00Z", "description": "A large lizard"}}')).q_tsv @@ to_tsquery('english', 'lizard'),
+    'content_dehydrate stores the q tsvector with q_tsvector on'
+);
+
+SELECT update_q_tsvector('pgstac-test-collection');
+
+SELECT ok(
+    NOT EXISTS (SELECT 1 FROM items WHERE collection = 'pgstac-test-collection' AND q_tsv IS NULL),
+    'update_q_tsvector fills q_tsv for existing items'
+);
+
+SELECT ok(
+    EXISTS (SELECT 1 FROM pg_indexes WHERE schemaname = 'pgstac' AND indexdef LIKE '%USING gin (COALESCE(q_tsv, stac_q_tsvector(properties)))%'),
+    'maintain_partitions creates the q_tsv GIN indexes with q_tsvector on'
+);
+
+SELECT ok(
+    (collection_search_plan('{"q": "lizard"}')).ctx_query !~ 'stac_q_tsvector|COALESCE',
+    'collection search matches q against the collections q_tsv'
+);
+RESET pgstac.q_tsvector;
@@ -119,3 +119,12 @@ SELECT results_eq($$
 SELECT throws_ok($$
     SELECT collection_search('{"token":"next:testcollection_1"}')
     $$, '22P02', NULL, 'collection_search: a malformed pagination token raises');
+
+-- The stored q_tsv of collections is used by q with q_tsvector on.
+SET pgstac.q_tsvector TO 'true';
+SELECT is(
+    (collection_search('{"q": "description", "limit": 1}')->>'numberMatched')::int,
+    (SELECT count(*)::int FROM collections WHERE stac_q_tsvector(content) @@ to_tsquery('english', 'description')),
+    'collection_search matches the stored q_tsv of collections with q_tsvector on'
+);
+RESET pgstac.q_tsvector;
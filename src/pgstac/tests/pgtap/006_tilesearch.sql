@@ -1,3 +1,20 @@
 SELECT has_function('pgstac'::name, 'geometrysearch', ARRAY['geometry','text','jsonb','int','int','interval','boolean','boolean']);
 SELECT has_function('pgstac'::name, 'geojsonsearch', ARRAY['jsonb','text','jsonb','int','int','interval','boolean','boolean']);
 SELECT has_function('pgstac'::name, 'xyzsearch', ARRAY['int','int','int','text','jsonb','int','int','interval','boolean','boolean']);
+
+SELECT ok(
+    (SELECT current_setting('pgstac.geometrysearch_stats', true)::jsonb ?& ARRAY['returned','scanned','bands','covered']
+    FROM geometrysearch(ST_MakeEnvelope(-180, -90, 180, 90, 4326), (SELECT hash FROM search_query('{}'))) g),
+    'geometrysearch records scan counters for the call in pgstac.geometrysearch_stats'
+);
+
+SELECT results_eq($$
+    SELECT current_setting('pgstac.geometrysearch_stats', true)::jsonb->>'returned',
+        current_setting('pgstac.geometrysearch_stats', true)::jsonb->>'scanned'
+    FROM geometrysearch(
+        ST_MakeEnvelope(-180, -90, 180, 90, 4326),
+        (SELECT hash FROM search_query('{"collections":["pgstac-test-no-such-collection"]}'))
+    ) g
+    $$, $$ SELECT '0', '0' $$,
+    'geometrysearch replaces the scan counters of an earlier call when nothing matches'
+);
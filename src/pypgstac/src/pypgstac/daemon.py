@@ -0,0 +1,316 @@
+"""Long running micro-batching ingest of items into pgstac."""
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+import orjson
+
+from .db import PgstacDB
+from .load import Loader, Methods, chunked_iterable, open_std, read_json
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIXES = (".json", ".ndjson")
+
+
+def is_spool_file(path: Path) -> bool:
+    """Return whether a spool directory entry is a completed file to load.
+
+    Producers write a file under a temporary name (a dotfile, or a name ending
+    in ``.tmp``) in the spool directory and rename it into place once it is
+    complete. Only ``.json`` / ``.ndjson`` files that are not dotfiles are read.
+    """
+    return (
+        path.is_file()
+        and not path.name.startswith(".")
+        and path.suffix in SPOOL_SUFFIXES
+    )
+
+
+@dataclass
+class _FileDone:
+    """Marker placed on the queue once every line of a spool file was read."""
+
+    path: Path
+    ok: bool = True
+
+
+@dataclass
+class IngestMetrics:
+    """Throughput and lag counters for an ingest daemon."""
+
+    started: float = field(default_factory=time.time)
+    batches: int = 0
+    items: int = 0
+    rejected: int = 0
+    failed_batches: int = 0
+    last_batch_items: int = 0
+    last_batch_seconds: float = 0.0
+    last_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+    pending: int = 0
+    batch_size: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        """Average items loaded per second since the daemon started."""
+        elapsed = time.time() - self.started
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return metrics as a json serializable dict."""
+        out = asdict(self)
+        out["uptime_seconds"] = time.time() - self.started
+        out["items_per_second"] = self.items_per_second
+        return out
+
+
+class IngestDaemon:
+    """Continuously load items from a spool directory or stream in micro-batches.
+
+    Lines of a stream are buffered until either ``max_items`` have been
+    received or the oldest buffered line has waited ``max_wait`` seconds.
+    Spool files are complete when they appear, so each one is loaded whole as
+    a single batch. The database
+    connection, version check, collection lookups and partition cache are kept
+    warm for the lifetime of the daemon rather than paid on every load.
+
+    If ``latency_target`` is set, the flush size adapts so that each batch is
+    loaded within roughly that many seconds, shrinking after slow batches and
+    growing back towards ``max_items`` after fast ones.
+    """
+
+    def __init__(
+        self,
+        db: PgstacDB,
+        insert_mode: Methods | None = Methods.insert,
+        max_items: int = 5000,
+        max_wait: float = 2.0,
+        latency_target: float | None = None,
+        poll_interval: float = 1.0,
+        metrics_interval: float = 60.0,
+        metrics_file: str | None = None,
+    ):
+        self.db = db
+        self.loader = Loader(db=db)
+        self.insert_mode = insert_mode
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.latency_target = latency_target
+        self.poll_interval = poll_interval
+        self.metrics_interval = metrics_interval
+        self.metrics_file = metrics_file
+        self.metrics = IngestMetrics(batch_size=max_items)
+        self._batch_size = max_items
+        self._queue: queue.Queue = queue.Queue(maxsize=max_items * 4)
+        self._stop = threading.Event()
+        self._seen: set[Path] = set()
+
+    def stop(self) -> None:
+        """Ask the daemon to flush what it has buffered and exit."""
+        self._stop.set()
+
+    def _read_stream(self, stream: TextIO) -> None:
+        for line in stream:
+            if line.strip():
+                self._queue.put((time.time(), line, None))
+            if self._stop.is_set():
+                break
+        self._stop.set()
+
+    def _read_spool(self, spool: Path) -> None:
+        for sub in ("done", "failed"):
+            (spool / sub).mkdir(exist_ok=True)
+        while not self._stop.is_set():
+            files = sorted(
+                (
+                    p
+                    for p in spool.iterdir()
+                    if is_spool_file(p) and p not in self._seen
+                ),
+                key=lambda p: p.stat().st_mtime,
+            )
+            if not files:
+                self._stop.wait(self.poll_interval)
+                continue
+            for path in files:
+                self._seen.add(path)
+                ok = True
+                try:
+                    for record in read_json(str(path)):
+                        self._queue.put((time.time(), record, path))
+                except Exception as e:
+                    logger.warning(f"Could not read spool file {path}: {e}")
+                    ok = False
+                self._queue.put((time.time(), _FileDone(path, ok), path))
+                if self._stop.is_set():
+                    break
+
+    def _format(self, records: list[Any]) -> list[dict[str, Any]]:
+        items = []
+        for record in records:
+            try:
+                raw = record if isinstance(record, dict) else orjson.loads(record)
+                item = self.loader.format_item(raw)
+                item["partition"] = self.loader._partition_update(item)
+            except Exception as e:
+                logger.warning(f"Rejecting item: {e}")
+                self.metrics.rejected += 1
+                continue
+            items.append(item)
+        return items
+
+    def _finish_file(self, path: Path, ok: bool) -> None:
+        """Move a fully processed spool file to ``done/`` or ``failed/``."""
+        dest = path.parent / ("done" if ok else "failed") / path.name
+        try:
+            os.replace(path, dest)
+        except OSError as e:
+            logger.warning(f"Could not move spool file {path} to {dest}: {e}")
+        else:
+            logger.info(f"Moved spool file {path} to {dest}.")
+        # A new file dropped with the same name is picked up again.
+        self._seen.discard(path)
+
+    def flush(self, lines: list[Any], received: float) -> bool:
+        """Load a batch of raw items, returning whether it succeeded.
+
+        The batch is loaded in a single transaction, in chunks of the current
+        batch size, so a failed batch leaves nothing of it committed.
+        """
+        t = time.perf_counter()
+        try:
+            items = self._format(lines)
+            if items:
+                with self.db.connect().transaction():
+                    for chunk in chunked_iterable(items, self._batch_size):
+                        self.loader.load_chunk(chunk, self.insert_mode)
+        except Exception:
+            logger.exception(f"Failed to load batch of {len(lines)} items.")
+            self.metrics.failed_batches += 1
+            # The partition cache may hold bounds that were never committed.
+            self.loader._partition_cache = {}
+            return False
+        elapsed = time.perf_counter() - t
+        lag = time.time() - received
+
+        self.metrics.batches += 1
+        self.metrics.items += len(items)
+        self.metrics.last_batch_items = len(items)
+        self.metrics.last_batch_seconds = elapsed
+        self.metrics.last_lag_seconds = lag
+        self.metrics.max_lag_seconds = max(self.metrics.max_lag_seconds, lag)
+
+        if self.latency_target is not None and lines:
+            if elapsed > self.latency_target:
+                self._batch_size = max(1, self._batch_size // 2)
+            elif elapsed < self.latency_target / 2:
+                self._batch_size = min(self.max_items, self._batch_size * 2)
+            self.metrics.batch_size = self._batch_size
+
+        logger.debug(
+            f"Loaded {len(items)} items in {elapsed}s with {lag}s lag.",
+        )
+        return True
+
+    def report(self) -> None:
+        """Log current metrics and write them to the metrics file if set."""
+        metrics = self.metrics.as_dict()
+        logger.info(f"Ingest metrics: {metrics}")
+        if self.metrics_file is not None:
+            tmp = f"{self.metrics_file}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(metrics))
+            os.replace(tmp, self.metrics_file)
+
+    def run(self, source: str = "stdin") -> IngestMetrics:
+        """Run until the source is exhausted or stop() is called.
+
+        ``source`` is either a spool directory that is polled for ``.json`` /
+        ``.ndjson`` files (see is_spool_file), or a file or stream (``stdin``)
+        of ndjson items. Each spool file is loaded as one batch in a single
+        transaction and moved to ``done/`` once it is committed, or to
+        ``failed/`` with nothing of it committed if it could not be read or
+        loaded.
+        """
+        self.loader.check_version()
+
+        spool = source not in ("-", "stdin") and Path(source).is_dir()
+        if spool:
+            reader = threading.Thread(
+                target=self._read_spool,
+                args=(Path(source),),
+                daemon=True,
+            )
+        else:
+
+            def read() -> None:
+                with open_std(source, "r") as f:
+                    self._read_stream(f)
+
+            reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+
+        lines: list[Any] = []
+        file_lines: dict[Path, list[Any]] = {}
+        file_received: dict[Path, float] = {}
+        received = 0.0
+        last_report = time.time()
+
+        while True:
+            timeout = self.poll_interval
+            if lines:
+                timeout = max(0.0, received + self.max_wait - time.time())
+            try:
+                ts, entry, path = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                if isinstance(entry, _FileDone):
+                    records = file_lines.pop(entry.path, [])
+                    ok = entry.ok
+                    if ok and records:
+                        ok = self.flush(records, file_received[entry.path])
+                    file_received.pop(entry.path, None)
+                    self._finish_file(entry.path, ok)
+                elif path is not None:
+                    file_lines.setdefault(path, []).append(entry)
+                    file_received.setdefault(path, ts)
+                else:
+                    if not lines:
+                        received = ts
+                    lines.append(entry)
+
+            # Check the reader before the queue so nothing it puts is missed.
+            drained = not reader.is_alive() and self._queue.empty()
+            stopping = self._stop.is_set() and self._queue.empty()
+            self.metrics.pending = (
+                len(lines)
+                + sum(len(v) for v in file_lines.values())
+                + self._queue.qsize()
+            )
+
+            if lines and (
+                len(lines) >= self._batch_size
+                or time.time() - received >= self.max_wait
+                or drained
+                or stopping
+            ):
+                self.flush(lines, received)
+                lines = []
+
+            if time.time() - last_report >= self.metrics_interval:
+                self.report()
+                last_report = time.time()
+
+            if drained or (stopping and not spool):
+                break
+
+        self.report()
+        return self.metrics
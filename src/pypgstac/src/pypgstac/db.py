@@ -1,23 +1,39 @@
 """Base library for database interaction with PgSTAC."""
 
+import asyncio
 import atexit
+import base64
+import itertools
 import logging
 import time
-from collections.abc import Generator
+import uuid
+from collections.abc import Generator, Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from types import TracebackType
 from typing import Any
 
 import orjson
 import psycopg
-from psycopg import Connection, rows, sql
-from psycopg.abc import Params
+from psycopg import AsyncConnection, Connection, rows, sql
+from psycopg.abc import Buffer, Params
+from psycopg.adapt import Loader
 from psycopg.types import json as psycopg_json
 from psycopg.types.json import set_json_dumps, set_json_loads
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from tenacity import retry, retry_if_exception_type, stop_after_attempt
 
+from .instrumentation import (
+    NOOP,
+    Instrumentation,
+    QueryEvent,
+    count_retry,
+    result_bytes,
+    take_retries,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +46,92 @@ set_json_dumps(dumps)
 set_json_loads(orjson.loads)
 
 
+SETUP_SQL = """
+    SELECT
+        CASE
+        WHEN
+        current_setting('search_path', false) ~* '\\mpgstac\\M'
+        THEN current_setting('search_path', false)
+        ELSE set_config(
+            'search_path',
+            'pgstac,' || current_setting('search_path', false),
+            false
+            )
+        END
+    ;
+    SET application_name TO 'pgstac';
+"""
+
+# Functions that only read and can be served by a read replica.
+READ_FUNCTIONS = frozenset(
+    {
+        "search",
+        "search_page",
+        "get_item",
+        "get_items",
+        "collection_search",
+        "xyzsearch",
+        "geometrysearch",
+        "geojsonsearch",
+    },
+)
+
+
+class RawJsonLoader(Loader):
+    """Load json and jsonb values as the raw bytes sent by the server."""
+
+    def load(self, data: Buffer) -> bytes:
+        """Return the json text untouched."""
+        return bytes(data)
+
+
+def register_raw_json(cursor: Any) -> None:
+    """Return json columns from a cursor as bytes rather than parsing them."""
+    cursor.adapters.register_loader("json", RawJsonLoader)
+    cursor.adapters.register_loader("jsonb", RawJsonLoader)
+
+
+@dataclass
+class SearchPage:
+    """A page of search results with the features left as raw json."""
+
+    features: bytes
+    number_returned: int
+    next_token: str | None
+    prev_token: str | None
+    number_matched: int | None
+
+
+def keyset_encode(values: list[str | None]) -> str:
+    """Encode sort key values into a token matching keyset_encode in pgstac."""
+    joined = "\x1f".join("\x1e" if v is None else v for v in values)
+    # PostgreSQL base64 wraps lines at 76 characters without a trailing newline.
+    return base64.encodebytes(joined.encode()).decode().rstrip("\n")
+
+
+def keyset_decode(token: str) -> list[str | None]:
+    """Decode a token created by keyset_encode into sort key values."""
+    joined = base64.b64decode("".join(token.split())).decode()
+    return [None if v == "\x1e" else v for v in joined.split("\x1f")]
+
+
+def func_query(
+    function_name: str,
+    args: tuple[Any, ...],
+) -> tuple[sql.Composed, list[Any]]:
+    """Build the query and arguments to call a database function."""
+    placeholders = sql.SQL(", ").join(sql.Placeholder() * len(args))
+    func = sql.Identifier(function_name)
+    cleaned_args = []
+    for arg in args:
+        if isinstance(arg, dict):
+            cleaned_args.append(psycopg_json.Jsonb(arg))
+        else:
+            cleaned_args.append(arg)
+    base_query = sql.SQL("SELECT * FROM {}({})").format(func, placeholders)
+    return base_query, cleaned_args
+
+
 def pg_notice_handler(notice: psycopg.errors.Diagnostic) -> None:
     """Add PG messages to logging."""
     msg = f"{notice.severity} - {notice.message_primary}"
@@ -45,6 +147,9 @@ class Settings(BaseSettings):
     db_max_idle: int = 5
     db_num_workers: int = 1
     db_retries: int = 3
+    db_itersize: int = 1000
+    db_replica_dsns: list[str] = []
+    db_replica_timeout: float = 5.0
 
     model_config = SettingsConfigDict(env_file=Path(".env"), extra="ignore")
 
@@ -63,6 +168,8 @@ class PgstacDB:
         commit_on_exit: bool = True,
         debug: bool = False,
         use_queue: bool = False,
+        replica_dsns: list[str] | None = None,
+        instrumentation: Instrumentation | None = None,
     ) -> None:
         """Initialize Database."""
         self.dsn: str
@@ -71,11 +178,18 @@ class PgstacDB:
         else:
             self.dsn = ""
         self.pool = pool
+        self.replica_dsns = list(
+            replica_dsns if replica_dsns is not None else settings.db_replica_dsns,
+        )
+        self.replica_pools: list[ConnectionPool] = []
+        self._replica_counter = itertools.count()
         self.connection = connection
         self.commit_on_exit = commit_on_exit
         self.initial_version = "0.1.9"
         self.debug = debug
         self.use_queue = use_queue
+        self.instrumentation = instrumentation or NOOP
+        self._pool_wait = 0.0
         if self.debug:
             logging.basicConfig(level=logging.DEBUG)
 
@@ -93,6 +207,34 @@ class PgstacDB:
             )
         return self.pool
 
+    def configure_replica(self, conn: Connection) -> None:
+        """Set up a new replica connection.
+
+        Replicas are marked readonly so that pgstac skips registering searches
+        and caching context counts, which would fail on a hot standby.
+        """
+        conn.autocommit = True
+        conn.execute("SET pgstac.readonly TO TRUE;", prepare=False)
+        conn.execute(SETUP_SQL, prepare=False)
+
+    def get_replica_pools(self) -> list[ConnectionPool]:
+        """Get Database Pools for the read replicas."""
+        if not self.replica_pools:
+            self.replica_pools = [
+                ConnectionPool(
+                    conninfo=dsn,
+                    min_size=settings.db_min_conn_size,
+                    max_size=settings.db_max_conn_size,
+                    max_waiting=settings.db_max_queries,
+                    max_idle=settings.db_max_idle,
+                    num_workers=settings.db_num_workers,
+                    configure=self.configure_replica,
+                    open=True,
+                )
+                for dsn in self.replica_dsns
+            ]
+        return self.replica_pools
+
     def open(self) -> None:
         """Open database pool connection."""
         self.get_pool()
@@ -101,12 +243,17 @@ class PgstacDB:
         """Close database pool connection."""
         if self.pool is not None:
             self.pool.close()
+        for replica in self.replica_pools:
+            replica.close()
+        self.replica_pools = []
 
     def connect(self) -> Connection:
         """Return database connection."""
         pool = self.get_pool()
         if self.connection is None or self.connection.closed or self.connection.broken:
+            t = time.perf_counter()
             self.connection = pool.getconn()
+            self._pool_wait += time.perf_counter() - t
             self.connection.autocommit = True
             if self.debug:
                 self.connection.add_notice_handler(pg_notice_handler)
@@ -120,24 +267,7 @@ class PgstacDB:
                     prepare=False,
                 )
             atexit.register(self.disconnect)
-            self.connection.execute(
-                """
-                    SELECT
-                        CASE
-                        WHEN
-                        current_setting('search_path', false) ~* '\\mpgstac\\M'
-                        THEN current_setting('search_path', false)
-                        ELSE set_config(
-                            'search_path',
-                            'pgstac,' || current_setting('search_path', false),
-                            false
-                            )
-                        END
-                    ;
-                    SET application_name TO 'pgstac';
-                """,
-                prepare=False,
-            )
+            self.connection.execute(SETUP_SQL, prepare=False)
         return self.connection
 
     def wait(self) -> None:
@@ -186,25 +316,76 @@ class PgstacDB:
         """Exit used for context."""
         self.disconnect()
 
+    def _execute(
+        self,
+        cursor: psycopg.Cursor,
+        query: Any,
+        args: Params | None,
+        name: str | None,
+        pool_wait: float | None = None,
+    ) -> psycopg.Cursor:
+        """Execute a query on a cursor, reporting it to the instrumentation."""
+        kwargs: dict[str, Any] = {"prepare": False} if args is None else {}
+        if not self.instrumentation.enabled:
+            return cursor.execute(query, args, **kwargs)
+        if pool_wait is None:
+            pool_wait, self._pool_wait = self._pool_wait, 0.0
+        t = time.perf_counter()
+        try:
+            cursor.execute(query, args, **kwargs)
+        except BaseException as e:
+            self.instrumentation.query(
+                QueryEvent(
+                    name or "query",
+                    time.perf_counter() - t,
+                    retries=take_retries(),
+                    pool_wait=pool_wait,
+                    error=e,
+                ),
+            )
+            raise
+        self.instrumentation.query(
+            QueryEvent(
+                name or "query",
+                time.perf_counter() - t,
+                rows=max(cursor.rowcount, 0),
+                bytes=result_bytes(cursor),
+                retries=take_retries(),
+                pool_wait=pool_wait,
+            ),
+        )
+        return cursor
+
     @retry(
         stop=stop_after_attempt(settings.db_retries),
         retry=retry_if_exception_type(psycopg.errors.OperationalError),
         reraise=True,
+        before_sleep=count_retry,
     )
     def query(
         self,
         query: Any,
         args: Params | None = None,
         row_factory: rows.BaseRowFactory = rows.tuple_row,
+        stream: bool = False,
+        itersize: int | None = None,
+        raw_json: bool = False,
+        name: str | None = None,
     ) -> Generator:
-        """Query the database with parameters."""
+        """Query the database with parameters.
+
+        name is the pgstac function being called, reported to the
+        instrumentation along with the timing of the query.
+        """
+        if stream:
+            yield from self.query_stream(query, args, row_factory, itersize, name)
+            return
         conn = self.connect()
         try:
             with conn.cursor(row_factory=row_factory) as cursor:
-                if args is None:
-                    rows = cursor.execute(query, prepare=False)
-                else:
-                    rows = cursor.execute(query, args)
+                if raw_json:
+                    register_raw_json(cursor)
+                rows = self._execute(cursor, query, args, name)
                 if rows:
                     for row in rows:
                         yield row
@@ -223,6 +404,99 @@ class PgstacDB:
                 conn.rollback()
             raise e
 
+    def query_stream(
+        self,
+        query: Any,
+        args: Params | None = None,
+        row_factory: rows.BaseRowFactory = rows.tuple_row,
+        itersize: int | None = None,
+        name: str | None = None,
+    ) -> Generator:
+        """Stream query results through a server-side named cursor.
+
+        Rows are fetched from the server ``itersize`` at a time so client memory
+        stays constant regardless of the size of the result. The cursor lives in
+        a transaction that is held open until the generator is exhausted or closed.
+        """
+        conn = self.connect()
+        cursor_name = f"pgstac_stream_{uuid.uuid4().hex}"
+        inst = self.instrumentation
+        t = time.perf_counter()
+        n = 0
+        error: BaseException | None = None
+        try:
+            with conn.transaction():
+                with conn.cursor(cursor_name, row_factory=row_factory) as cursor:
+                    cursor.itersize = itersize or settings.db_itersize
+                    cursor.execute(query, args)
+                    if not inst.enabled:
+                        yield from cursor
+                    else:
+                        for row in cursor:
+                            n += 1
+                            yield row
+        except psycopg.errors.OperationalError as e:
+            error = e
+            logger.warning(f"OPERATIONAL ERROR: {e}")
+            if self.pool is None:
+                self.get_pool()
+            else:
+                self.pool.check()
+            raise e
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Covers the whole stream, including time spent by the consumer.
+            if inst.enabled:
+                pool_wait, self._pool_wait = self._pool_wait, 0.0
+                inst.query(
+                    QueryEvent(
+                        name or "query",
+                        time.perf_counter() - t,
+                        rows=n,
+                        retries=take_retries(),
+                        pool_wait=pool_wait,
+                        error=error,
+                    ),
+                )
+
+    def query_replica(
+        self,
+        query: Any,
+        args: Params | None = None,
+        row_factory: rows.BaseRowFactory = rows.tuple_row,
+        raw_json: bool = False,
+        name: str | None = None,
+    ) -> Generator:
+        """Run a read only query on the next replica.
+
+        Replicas are used round robin. If the replica can not be reached or
+        refuses a write, the query is run on the primary instead.
+        """
+        pools = self.get_replica_pools()
+        if pools:
+            pool = pools[next(self._replica_counter) % len(pools)]
+            t = time.perf_counter()
+            try:
+                with pool.connection(timeout=settings.db_replica_timeout) as conn:
+                    pool_wait = time.perf_counter() - t
+                    with conn.cursor(row_factory=row_factory) as cursor:
+                        if raw_json:
+                            register_raw_json(cursor)
+                        self._execute(cursor, query, args, name, pool_wait)
+                        results = cursor.fetchall() if cursor.description else []
+            except (
+                psycopg.errors.OperationalError,
+                psycopg.errors.ReadOnlySqlTransaction,
+                PoolTimeout,
+            ) as e:
+                logger.warning(f"REPLICA ERROR, FALLING BACK TO PRIMARY: {e}")
+            else:
+                yield from results or [None]
+                return
+        yield from self.query(query, args, row_factory, raw_json=raw_json, name=name)
+
     def query_one(self, *args: Any, **kwargs: Any) -> tuple[Any, ...] | str | None:
         """Return results from a query that returns a single row."""
         try:
@@ -291,19 +565,672 @@ class PgstacDB:
                 self.connection.rollback()
             raise Exception("Could not find PG version.")
 
-    def func(self, function_name: str, *args: Any) -> Generator:
-        """Call a database function."""
-        placeholders = sql.SQL(", ").join(sql.Placeholder() * len(args))
-        func = sql.Identifier(function_name)
-        cleaned_args = []
-        for arg in args:
-            if isinstance(arg, dict):
-                cleaned_args.append(psycopg_json.Jsonb(arg))
+    def func(
+        self,
+        function_name: str,
+        *args: Any,
+        raw_json: bool = False,
+    ) -> Generator:
+        """Call a database function.
+
+        Read only functions are sent to a replica when replicas are configured.
+        """
+        base_query, cleaned_args = func_query(function_name, args)
+        if self.replica_dsns and function_name in READ_FUNCTIONS:
+            return self.query_replica(
+                base_query,
+                cleaned_args,
+                raw_json=raw_json,
+                name=function_name,
+            )
+        return self.query(
+            base_query,
+            cleaned_args,
+            raw_json=raw_json,
+            name=function_name,
+        )
+
+    def func_stream(
+        self,
+        function_name: str,
+        *args: Any,
+        itersize: int | None = None,
+    ) -> Generator:
+        """Call a set returning database function, streaming the results."""
+        base_query, cleaned_args = func_query(function_name, args)
+        return self.query_stream(
+            base_query,
+            cleaned_args,
+            itersize=itersize,
+            name=function_name,
+        )
+
+    def func_many(
+        self,
+        calls: Iterable[Sequence[Any]],
+        raw_json: bool = False,
+    ) -> list[list[Any]]:
+        """Call many database functions in a single round trip.
+
+        Each call is a sequence of the function name followed by its arguments.
+        The calls are queued using pipeline mode and the rows returned by each
+        are given back in the same order as the calls. Calls run one after
+        another on the primary, an error in one aborts those after it.
+        """
+        queries = [func_query(c[0], tuple(c[1:])) for c in calls]
+        conn = self.connect()
+        cursors = []
+        t = time.perf_counter()
+        try:
+            with conn.pipeline():
+                for base_query, cleaned_args in queries:
+                    cursor = conn.cursor()
+                    if raw_json:
+                        register_raw_json(cursor)
+                    cursor.execute(base_query, cleaned_args)
+                    cursors.append(cursor)
+            results = [c.fetchall() if c.description else [] for c in cursors]
+            if self.instrumentation.enabled:
+                pool_wait, self._pool_wait = self._pool_wait, 0.0
+                self.instrumentation.query(
+                    QueryEvent(
+                        "func_many",
+                        time.perf_counter() - t,
+                        rows=sum(len(r) for r in results),
+                        retries=take_retries(),
+                        pool_wait=pool_wait,
+                    ),
+                )
+            return results
+        except psycopg.errors.OperationalError as e:
+            logger.warning(f"OPERATIONAL ERROR: {e}")
+            if self.pool is None:
+                self.get_pool()
             else:
-                cleaned_args.append(arg)
-        base_query = sql.SQL("SELECT * FROM {}({});").format(func, placeholders)
-        return self.query(base_query, cleaned_args)
+                self.pool.check()
+            raise e
+        finally:
+            for c in cursors:
+                c.close()
 
-    def search(self, query: dict | str | psycopg_json.Jsonb = "{}") -> str:
-        """Search PgSTAC."""
+    def search(
+        self,
+        query: dict | str | psycopg_json.Jsonb = "{}",
+        raw: bool = False,
+    ) -> str:
+        """Search PgSTAC.
+
+        With raw, the FeatureCollection text is passed through from the database
+        without being parsed and serialized again.
+        """
+        if raw:
+            return next(self.func("search", query, raw_json=True))[0].decode()
         return dumps(next(self.func("search", query))[0])
+
+    def search_page(
+        self,
+        search: dict | str | psycopg_json.Jsonb = "{}",
+        limit: int = 100,
+        token: str | None = None,
+        prev: bool = False,
+        fields: dict | None = None,
+    ) -> SearchPage:
+        """Return a page of search results without parsing the features."""
+        row = next(
+            self.func(
+                "search_page",
+                search,
+                limit,
+                token,
+                prev,
+                fields or {},
+                raw_json=True,
+            ),
+        )
+        return SearchPage(*row)
+
+    def get_items(
+        self,
+        ids: list[str],
+        collections: list[str | None] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return many items by id in the order requested.
+
+        If given, collections holds the collection of each id. Ids that are
+        not found are left out.
+        """
+        if not ids:
+            return []
+        rows = self.func("get_items", list(ids), collections)
+        return [r[0] for r in rows if r is not None and r[0] is not None]
+
+    def stream_search(
+        self,
+        search: dict | None = None,
+        token: str | None = None,
+        limit: int | None = None,
+        hydrator: Any | None = None,
+    ) -> "SearchStream":
+        """Stream search results using the plan from search_plan."""
+        return SearchStream(self, search or {}, token, limit, hydrator)
+
+
+class SearchStream:
+    """Client side execution of a search using search_plan.
+
+    Iterating yields hydrated items as each histogram band arrives. The band
+    query is prepared once and executed per band, walking the per-month
+    histogram in sort order and sizing bands from the observed selectivity in
+    the same way as search_page. When the count is not cached, the context
+    query runs concurrently on a second pool connection if the pool allows it.
+
+    If a hydrator (pypgstac.items.ItemHydrator) is given, the raw split
+    columns are fetched instead and items are assembled client side.
+
+    Once iteration finishes, number_returned and number_matched hold the same
+    values search_page would return, and next_token and prev_token hold its
+    tokens prefixed with "next:" and "prev:", as in the links of search, so
+    they can be passed back as token. When iteration stops early, close() (or
+    using the stream as a context manager) deallocates the band query and
+    cancels the context count.
+    """
+
+    band_margin = 3.0
+    band_safety = 1.5
+    band_cap_months = 18
+
+    def __init__(
+        self,
+        db: PgstacDB,
+        search: dict,
+        token: str | None = None,
+        limit: int | None = None,
+        hydrator: Any | None = None,
+    ) -> None:
+        self.db = db
+        self.search = search
+        self.token = token
+        self.limit = limit
+        self.hydrator = hydrator
+        self.next_token: str | None = None
+        self.prev_token: str | None = None
+        self.number_returned = 0
+        self.number_matched: int | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._count_conn: Connection | None = None
+        self._prepared: sql.Identifier | None = None
+
+    def __enter__(self) -> "SearchStream":
+        """Enter used for context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Exit used for context."""
+        self.close()
+
+    def close(self) -> None:
+        """Deallocate the band query and cancel the context count."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        count_conn = self._count_conn
+        if count_conn is not None:
+            count_conn.cancel()
+        if self._prepared is not None:
+            name, self._prepared = self._prepared, None
+            conn = self.db.connection
+            if conn is not None and not conn.closed and not conn.broken:
+                conn.execute(sql.SQL("DEALLOCATE {};").format(name), prepare=False)
+
+    def _count(self, ctx_query: str) -> int | None:
+        with self.db.get_pool().connection() as conn:
+            conn.autocommit = True
+            self._count_conn = conn
+            try:
+                conn.execute(SETUP_SQL, prepare=False)
+                row = conn.execute(ctx_query, prepare=False).fetchone()
+            finally:
+                self._count_conn = None
+        return row[0] if row else None
+
+    def _execute(self, execute: sql.Composed, args: tuple[Any, ...]) -> list[Any]:
+        row_factory = rows.tuple_row if self.hydrator is None else rows.dict_row
+        return [
+            r
+            for r in self.db.query(execute, args, row_factory, name="search_band")
+            if r is not None
+        ]
+
+    def _bands(
+        self,
+        plan: dict[str, Any],
+        execute: sql.Composed,
+        target: int | None,
+    ) -> Generator:
+        """Execute the prepared band query over the histogram, yielding batches."""
+        histogram = plan["histogram"]
+        if histogram is None:
+            yield self._execute(execute, (target,))
+            return
+
+        months = [h["m"] for h in histogram]
+        counts = [h["n"] for h in histogram]
+        n = len(months)
+        order = list(range(n))
+        if plan["lead_desc"]:
+            order.reverse()
+
+        band_target = (target or settings.db_itersize) * self.band_margin
+        got = 0
+        scanned = 0
+        pos = 0
+        while pos < n:
+            idxs = []
+            cumulative = 0
+            for idx in order[pos : pos + self.band_cap_months]:
+                idxs.append(idx)
+                cumulative += counts[idx]
+                if cumulative >= band_target:
+                    break
+            pos += len(idxs)
+            scanned += cumulative
+            # Open the outermost bands so rows newer than the stats are not lost.
+            lo, hi = min(idxs), max(idxs)
+            start = "-infinity" if lo == 0 else months[lo]
+            end = "infinity" if hi == n - 1 else months[hi + 1]
+            remaining = None if target is None else target - got
+            batch = self._execute(execute, (start, end, remaining))
+            got += len(batch)
+            yield batch
+            if target is not None and got >= target:
+                return
+            obs_sel = max(got, 0.5) / max(scanned, 1)
+            left = settings.db_itersize if target is None else target - got
+            band_target = (left / obs_sel) * self.band_safety
+
+    def __iter__(self) -> Generator[dict[str, Any], None, None]:
+        """Yield items matching the search."""
+        try:
+            yield from self._items()
+        finally:
+            self.close()
+
+    def _items(self) -> Generator[dict[str, Any], None, None]:
+        search = psycopg_json.Jsonb(self.search)
+        is_prev = self.token is not None and self.token.startswith("prev:")
+        [plan] = self.db.query(
+            "SELECT * FROM search_plan(%s, %s, %s);",
+            (search, self.token, self.limit),
+            row_factory=rows.dict_row,
+            name="search_plan",
+        )
+        keys = [
+            r[0]
+            for r in self.db.query(
+                "SELECT expr FROM keyset_sortkeys(%s) ORDER BY ord;",
+                (search,),
+            )
+        ]
+
+        ctx: Future | None = None
+        self.number_matched = plan["context_count"]
+        if plan["context_count"] is None and plan["ctx_query"] is not None:
+            if self.db.get_pool().max_size > 1:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+                ctx = self._executor.submit(self._count, plan["ctx_query"])
+
+        name = sql.Identifier(f"pgstac_band_{uuid.uuid4().hex}")
+        fields = self.search.get("fields") or {}
+        if self.hydrator is None:
+            projection = sql.SQL("content_hydrate(i::items, {}::jsonb)").format(
+                sql.Literal(orjson.dumps(fields).decode()),
+            )
+        else:
+            projection = sql.SQL(self.hydrator.select_list(fields))
+        prepare = sql.SQL(
+            """
+            PREPARE {name} AS
+            SELECT {projection}, {keys} AS pgstac_keys
+            FROM (SELECT (t::items).* FROM ({query}) t) i
+            """,
+        ).format(
+            name=name,
+            projection=projection,
+            keys=sql.SQL(
+                "ARRAY[" + ", ".join(f"({k})::text" for k in keys) + "]::text[]",
+            ),
+            query=sql.SQL(plan["query"]),
+        )
+        if plan["histogram"] is None:
+            execute = sql.SQL("EXECUTE {}(%s);").format(name)
+        else:
+            execute = sql.SQL("EXECUTE {}(%s, %s, %s);").format(name)
+
+        self.db.connect().execute(prepare, prepare=False)
+        self._prepared = name
+        target = None if self.limit is None else self.limit + 1
+        first_keys = None
+        last_keys = None
+        has_more = False
+        buffered = []
+        for band in self._bands(plan, execute, target):
+            rows = band
+            if self.limit is not None:
+                rows = band[: self.limit + 1 - self.number_returned]
+            if self.hydrator is None:
+                row_keys = [r[1] for r in rows]
+                contents = [r[0] for r in rows]
+            else:
+                row_keys = [r.pop("pgstac_keys") for r in rows]
+                contents = self.hydrator.hydrate_rows(rows, fields)
+            for content, keys_ in zip(contents, row_keys):
+                if self.limit is not None and self.number_returned >= self.limit:
+                    has_more = True
+                    break
+                self.number_returned += 1
+                if first_keys is None:
+                    first_keys = keys_
+                last_keys = keys_
+                if is_prev:
+                    buffered.append(content)
+                else:
+                    yield content
+            if has_more:
+                break
+
+        if is_prev:
+            # Prev pages are read in reverse sort order, put them back in order.
+            yield from reversed(buffered)
+            first_keys, last_keys = last_keys, first_keys
+            next_present, prev_present = True, has_more
+        else:
+            next_present, prev_present = has_more, self.token is not None
+        if self.number_returned > 0:
+            if next_present and last_keys is not None:
+                self.next_token = f"next:{keyset_encode(last_keys)}"
+            if prev_present and first_keys is not None:
+                self.prev_token = f"prev:{keyset_encode(first_keys)}"
+
+        if ctx is not None:
+            self.number_matched = ctx.result()
+        elif self.number_matched is None and plan["ctx_query"] is not None:
+            count = self.db.query_one(plan["ctx_query"])
+            self.number_matched = count if isinstance(count, int) else None
+
+
+class AsyncPgstacDB:
+    """Async class for interacting with PgSTAC Database through a pool.
+
+    Unlike PgstacDB, no connection is held by the instance. Each call checks a
+    connection out of the pool for its duration so that many concurrent
+    requests can share a single pool.
+    """
+
+    def __init__(
+        self,
+        dsn: str | None = "",
+        pool: AsyncConnectionPool | None = None,
+        debug: bool = False,
+        use_queue: bool = False,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Initialize Database."""
+        self.dsn: str = dsn if dsn is not None else ""
+        self.pool = pool
+        self.debug = debug
+        self.use_queue = use_queue
+        self.instrumentation = instrumentation or NOOP
+        self._pool_lock = asyncio.Lock()
+        if self.debug:
+            logging.basicConfig(level=logging.DEBUG)
+
+    async def configure(self, conn: AsyncConnection) -> None:
+        """Set up a new pooled connection for use with pgstac."""
+        await conn.set_autocommit(True)
+        if self.debug:
+            conn.add_notice_handler(pg_notice_handler)
+            await conn.execute("SET CLIENT_MIN_MESSAGES TO NOTICE;", prepare=False)
+        if self.use_queue:
+            await conn.execute("SET pgstac.use_queue TO TRUE;", prepare=False)
+        await conn.execute(SETUP_SQL, prepare=False)
+
+    async def get_pool(self) -> AsyncConnectionPool:
+        """Get Database Pool.
+
+        The pool is created on first use. Concurrent first calls wait on a lock
+        so that only one pool is opened.
+        """
+        if self.pool is not None:
+            return self.pool
+        async with self._pool_lock:
+            if self.pool is None:
+                pool = AsyncConnectionPool(
+                    conninfo=self.dsn,
+                    min_size=settings.db_min_conn_size,
+                    max_size=settings.db_max_conn_size,
+                    max_waiting=settings.db_max_queries,
+                    max_idle=settings.db_max_idle,
+                    num_workers=settings.db_num_workers,
+                    configure=self.configure,
+                    open=False,
+                )
+                await pool.open()
+                self.pool = pool
+            return self.pool
+
+    async def open(self) -> None:
+        """Open database pool connection."""
+        await self.get_pool()
+
+    async def close(self) -> None:
+        """Close database pool connection."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def __aenter__(self) -> Any:
+        """Enter used for async context."""
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Exit used for async context."""
+        await self.close()
+
+    async def _execute(
+        self,
+        cursor: psycopg.AsyncCursor,
+        query: Any,
+        args: Params | None,
+        name: str | None,
+        pool_wait: float,
+    ) -> None:
+        """Execute a query on a cursor, reporting it to the instrumentation."""
+        kwargs: dict[str, Any] = {"prepare": False} if args is None else {}
+        if not self.instrumentation.enabled:
+            await cursor.execute(query, args, **kwargs)
+            return
+        t = time.perf_counter()
+        try:
+            await cursor.execute(query, args, **kwargs)
+        except BaseException as e:
+            self.instrumentation.query(
+                QueryEvent(
+                    name or "query",
+                    time.perf_counter() - t,
+                    retries=take_retries(),
+                    pool_wait=pool_wait,
+                    error=e,
+                ),
+            )
+            raise
+        self.instrumentation.query(
+            QueryEvent(
+                name or "query",
+                time.perf_counter() - t,
+                rows=max(cursor.rowcount, 0),
+                bytes=result_bytes(cursor),
+                retries=take_retries(),
+                pool_wait=pool_wait,
+            ),
+        )
+
+    @retry(
+        stop=stop_after_attempt(settings.db_retries),
+        retry=retry_if_exception_type(psycopg.errors.OperationalError),
+        reraise=True,
+        before_sleep=count_retry,
+    )
+    async def query(
+        self,
+        query: Any,
+        args: Params | None = None,
+        row_factory: rows.BaseRowFactory = rows.tuple_row,
+        raw_json: bool = False,
+        name: str | None = None,
+    ) -> list[Any]:
+        """Query the database with parameters.
+
+        name is the pgstac function being called, reported to the
+        instrumentation along with the timing of the query.
+        """
+        pool = await self.get_pool()
+        t = time.perf_counter()
+        try:
+            async with pool.connection() as conn:
+                pool_wait = time.perf_counter() - t
+                async with conn.cursor(row_factory=row_factory) as cursor:
+                    if raw_json:
+                        register_raw_json(cursor)
+                    await self._execute(cursor, query, args, name, pool_wait)
+                    if cursor.description is None:
+                        return []
+                    return await cursor.fetchall()
+        except psycopg.errors.OperationalError as e:
+            # If we get an operational error check the pool and retry
+            logger.warning(f"OPERATIONAL ERROR: {e}")
+            await pool.check()
+            raise e
+
+    async def query_one(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> tuple[Any, ...] | str | None:
+        """Return results from a query that returns a single row."""
+        r = await self.query(*args, **kwargs)
+        if not r or r[0] is None:
+            return None
+        if len(r[0]) == 1:
+            return r[0][0]
+        return r[0]
+
+    async def func(
+        self,
+        function_name: str,
+        *args: Any,
+        raw_json: bool = False,
+    ) -> list[Any]:
+        """Call a database function."""
+        base_query, cleaned_args = func_query(function_name, args)
+        return await self.query(
+            base_query,
+            cleaned_args,
+            raw_json=raw_json,
+            name=function_name,
+        )
+
+    async def get_items(
+        self,
+        ids: list[str],
+        collections: list[str | None] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return many items by id in the order requested.
+
+        If given, collections holds the collection of each id. Ids that are
+        not found are left out.
+        """
+        if not ids:
+            return []
+        rows = await self.func("get_items", list(ids), collections)
+        return [r[0] for r in rows if r is not None and r[0] is not None]
+
+    async def func_many(
+        self,
+        calls: Iterable[Sequence[Any]],
+        raw_json: bool = False,
+    ) -> list[list[Any]]:
+        """Call many database functions in a single round trip.
+
+        Works like PgstacDB.func_many on a single pooled connection.
+        """
+        queries = [func_query(c[0], tuple(c[1:])) for c in calls]
+        pool = await self.get_pool()
+        t = time.perf_counter()
+        async with pool.connection() as conn:
+            pool_wait = time.perf_counter() - t
+            t = time.perf_counter()
+            cursors = []
+            try:
+                async with conn.pipeline():
+                    for base_query, cleaned_args in queries:
+                        cursor = conn.cursor()
+                        if raw_json:
+                            register_raw_json(cursor)
+                        await cursor.execute(base_query, cleaned_args)
+                        cursors.append(cursor)
+                results = [await c.fetchall() if c.description else [] for c in cursors]
+                if self.instrumentation.enabled:
+                    self.instrumentation.query(
+                        QueryEvent(
+                            "func_many",
+                            time.perf_counter() - t,
+                            rows=sum(len(r) for r in results),
+                            retries=take_retries(),
+                            pool_wait=pool_wait,
+                        ),
+                    )
+                return results
+            finally:
+                for c in cursors:
+                    await c.close()
+
+    async def search(
+        self,
+        query: dict | str | psycopg_json.Jsonb = "{}",
+        raw: bool = False,
+    ) -> str:
+        """Search PgSTAC."""
+        if raw:
+            return (await self.func("search", query, raw_json=True))[0][0].decode()
+        return dumps((await self.func("search", query))[0][0])
+
+    async def search_page(
+        self,
+        search: dict | str | psycopg_json.Jsonb = "{}",
+        limit: int = 100,
+        token: str | None = None,
+        prev: bool = False,
+        fields: dict | None = None,
+    ) -> SearchPage:
+        """Return a page of search results without parsing the features."""
+        rows = await self.func(
+            "search_page",
+            search,
+            limit,
+            token,
+            prev,
+            fields or {},
+            raw_json=True,
+        )
+        return SearchPage(*rows[0])
@@ -0,0 +1,285 @@
+"""Generate realistic synthetic STAC items for load and performance testing."""
+
+import random
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+import orjson
+
+from .load import read_json
+
+# The Planetary Computer fixtures in the pgstac test data. They are not part of
+# the package, so this only exists when run from a checkout of the repository.
+DEFAULT_TEMPLATES = (
+    Path(__file__).parents[3] / "pgstac" / "tests" / "testdata" / "planetary-computer"
+)
+# Used for collections with an open ended temporal extent so output only
+# depends on the seed.
+DEFAULT_END = datetime(2025, 1, 1, tzinfo=UTC)
+# Footprint in degrees of items made from a collection without template items.
+DEFAULT_FOOTPRINT = 1.0
+MAX_LATITUDE = 80.0
+COVER_PROPERTIES = ("eo:cloud_cover", "eo:snow_cover")
+SKIP_PROPERTIES = ("datetime", "start_datetime", "end_datetime", "created", "updated")
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _skewed(rng: random.Random, skew: float) -> float:
+    """Return a number in [0, 1) that clusters towards 0 as skew grows."""
+    return rng.random() ** (1.0 + skew)
+
+
+def _shift(coords: Any, dx: float, dy: float) -> Any:
+    if coords and isinstance(coords[0], (int, float)):
+        return [coords[0] + dx, coords[1] + dy, *coords[2:]]
+    return [_shift(c, dx, dy) for c in coords]
+
+
+def _shift_bbox(bbox: list[float], dx: float, dy: float) -> list[float]:
+    half = len(bbox) // 2
+    out = list(bbox)
+    for i in (0, half):
+        out[i] += dx
+        out[i + 1] += dy
+    return out
+
+
+def _template_from_collection(collection: dict[str, Any]) -> dict[str, Any]:
+    """Build a template item from a collection's item_assets and summaries."""
+    properties: dict[str, Any] = {}
+    for key, value in (collection.get("summaries") or {}).items():
+        if key == "eo:bands":
+            continue
+        if isinstance(value, list) and value:
+            properties[key] = value[0]
+        elif isinstance(value, dict) and "minimum" in value:
+            properties[key] = value["minimum"]
+    if any("/eo/" in e for e in collection.get("stac_extensions", [])):
+        properties.setdefault("eo:cloud_cover", 0)
+    item_id = f"{collection['id']}-item"
+    size = DEFAULT_FOOTPRINT
+    return {
+        "type": "Feature",
+        "stac_version": collection.get("stac_version", "1.0.0"),
+        "stac_extensions": collection.get("stac_extensions", []),
+        "id": item_id,
+        "collection": collection["id"],
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[0, 0], [size, 0], [size, size], [0, size], [0, 0]]],
+        },
+        "bbox": [0, 0, size, size],
+        "properties": properties,
+        "assets": {
+            key: {**asset, "href": f"https://example.com/{item_id}/{key}"}
+            for key, asset in (collection.get("item_assets") or {}).items()
+        },
+        "links": [],
+    }
+
+
+class ItemGenerator:
+    """Generate reproducible items shaped like a set of template collections.
+
+    Templates are read from a directory with a ``<collection>/collection.json``
+    and optional ``<collection>/items.ndjson`` per collection, such as the
+    Planetary Computer fixtures in the pgstac test data. Generated items are
+    copies of the template items with new ids, datetimes and footprints.
+    Collections without template items use a template built from their
+    ``item_assets`` and ``summaries``.
+
+    The distribution of the generated items is controlled with:
+
+    - ``time_skew``: 0 spreads datetimes evenly between ``start`` and ``end``,
+      larger values crowd them towards ``end``.
+    - ``space_skew``: the fraction of items placed around one of ``hotspots``
+      points in each collection instead of evenly over its spatial extent.
+    - ``asset_skew``: 0 keeps every template asset, larger values drop more
+      assets from each item.
+    - ``cardinality`` and ``property_skew``: when ``cardinality`` is set,
+      string properties take one of that many values, with larger
+      ``property_skew`` values favouring the first few.
+
+    The same seed and options always produce the same items.
+    """
+
+    def __init__(
+        self,
+        templates: str | Path | None = None,
+        collections: list[str] | None = None,
+        seed: int = 0,
+        start: str | datetime | None = None,
+        end: str | datetime | None = None,
+        time_skew: float = 0.0,
+        space_skew: float = 0.0,
+        hotspots: int = 10,
+        asset_skew: float = 0.0,
+        cardinality: int | None = None,
+        property_skew: float = 0.0,
+    ):
+        if templates is None:
+            if not DEFAULT_TEMPLATES.is_dir():
+                raise ValueError(
+                    "templates is required, the default templates are only "
+                    "available in a checkout of the pgstac repository.",
+                )
+            templates = DEFAULT_TEMPLATES
+        self.templates = Path(templates)
+        self.seed = seed
+        self.start = _parse_datetime(start) if isinstance(start, str) else start
+        self.end = _parse_datetime(end) if isinstance(end, str) else end
+        self.time_skew = time_skew
+        self.space_skew = space_skew
+        self.hotspots = hotspots
+        self.asset_skew = asset_skew
+        self.cardinality = cardinality
+        self.property_skew = property_skew
+
+        data = self.templates / "data"
+        if not data.is_dir():
+            raise ValueError(f"No template collections found in {self.templates}.")
+        self._collections: dict[str, dict[str, Any]] = {}
+        self._items: dict[str, list[tuple[str, bytes]]] = {}
+        for path in sorted(data.glob("*/collection.json")):
+            collection = orjson.loads(path.read_bytes())
+            if collections is not None and collection["id"] not in collections:
+                continue
+            items_file = path.parent / "items.ndjson"
+            if items_file.exists():
+                templates_items = list(read_json(str(items_file)))
+            else:
+                templates_items = [_template_from_collection(collection)]
+            self._collections[collection["id"]] = collection
+            self._items[collection["id"]] = [
+                (i["id"], orjson.dumps(i)) for i in templates_items
+            ]
+        if not self._collections:
+            raise ValueError(f"No template collections found in {self.templates}.")
+
+    def collections(self) -> list[dict[str, Any]]:
+        """Return the template collections items are generated for."""
+        return list(self._collections.values())
+
+    def _interval(self, collection: dict[str, Any]) -> tuple[datetime, float]:
+        interval = collection["extent"]["temporal"]["interval"][0]
+        start = self.start or _parse_datetime(interval[0])
+        end = self.end or (_parse_datetime(interval[1]) if interval[1] else None)
+        end = end or DEFAULT_END
+        return end, (end - start).total_seconds()
+
+    def _hotspots(self, collection_id: str) -> list[tuple[float, float]]:
+        rng = random.Random(f"{self.seed}-{collection_id}-hotspots")
+        west, south, east, north = self._bbox(collection_id)
+        return [
+            (rng.uniform(west, east), rng.uniform(south, north))
+            for _ in range(self.hotspots)
+        ]
+
+    def _bbox(self, collection_id: str) -> tuple[float, float, float, float]:
+        bbox = self._collections[collection_id]["extent"]["spatial"]["bbox"][0]
+        half = len(bbox) // 2
+        west, south, east, north = bbox[0], bbox[1], bbox[half], bbox[half + 1]
+        return (
+            west,
+            max(south, -MAX_LATITUDE),
+            east,
+            min(north, MAX_LATITUDE),
+        )
+
+    def items(
+        self,
+        count: int,
+        collection_id: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Generate count items, spread evenly over the template collections.
+
+        If collection_id is set only items for that collection are generated.
+        """
+        ids = [collection_id] if collection_id else list(self._collections)
+        rng = random.Random(f"{self.seed}-{'-'.join(ids)}")
+        state = {
+            cid: (
+                self._interval(self._collections[cid]),
+                self._bbox(cid),
+                self._hotspots(cid),
+            )
+            for cid in ids
+        }
+        for n in range(count):
+            cid = ids[n % len(ids)]
+            (end, span), bbox, hotspots = state[cid]
+            template_id, template = rng.choice(self._items[cid])
+            yield self._item(
+                rng,
+                template_id,
+                template,
+                n,
+                end,
+                span,
+                bbox,
+                hotspots,
+            )
+
+    def _item(
+        self,
+        rng: random.Random,
+        template_id: str,
+        template: bytes,
+        n: int,
+        end: datetime,
+        span: float,
+        bbox: tuple[float, float, float, float],
+        hotspots: list[tuple[float, float]],
+    ) -> dict[str, Any]:
+        item_id = f"{template_id}-{n:09d}"
+        # Hrefs usually contain the id, keep them unique and consistent.
+        item = orjson.loads(template.replace(template_id.encode(), item_id.encode()))
+
+        properties = item["properties"]
+        dt = end - timedelta(seconds=_skewed(rng, self.time_skew) * span)
+        if properties.get("start_datetime") and properties.get("end_datetime"):
+            duration = _parse_datetime(properties["end_datetime"]) - _parse_datetime(
+                properties["start_datetime"],
+            )
+            properties["start_datetime"] = dt.isoformat()
+            properties["end_datetime"] = (dt + duration).isoformat()
+        properties["datetime"] = dt.isoformat()
+
+        for key, value in properties.items():
+            if key in SKIP_PROPERTIES:
+                continue
+            if key in COVER_PROPERTIES:
+                properties[key] = round(rng.uniform(0, 100), 2)
+            elif self.cardinality and isinstance(value, str):
+                k = int(_skewed(rng, self.property_skew) * self.cardinality)
+                properties[key] = f"{value}-{k}"
+
+        if self.asset_skew and item.get("assets"):
+            keys = list(item["assets"])
+            keep = max(1, round(len(keys) * rng.random() ** self.asset_skew))
+            item["assets"] = {k: item["assets"][k] for k in keys[:keep]}
+
+        west, south, east, north = bbox
+        half = len(item["bbox"]) // 2
+        xmin, ymin = item["bbox"][:2]
+        width = item["bbox"][half] - xmin
+        height = item["bbox"][half + 1] - ymin
+        if hotspots and rng.random() < self.space_skew:
+            x, y = rng.choice(hotspots)
+            x, y = rng.gauss(x, 1.0), rng.gauss(y, 1.0)
+        else:
+            x, y = rng.uniform(west, east), rng.uniform(south, north)
+        x = min(max(x, west), east - width)
+        y = min(max(y, south), north - height)
+        dx, dy = x - xmin, y - ymin
+        item["bbox"] = _shift_bbox(item["bbox"], dx, dy)
+        item["geometry"]["coordinates"] = _shift(
+            item["geometry"]["coordinates"],
+            dx,
+            dy,
+        )
+        return item
@@ -1,7 +1,7 @@
 """Hydrate data in pypgstac rather than on the database."""
 
 from copy import deepcopy
-from typing import Any, Mapping, cast
+from typing import Any, Iterable, Iterator, Mapping, cast
 
 from hydraters import hydrate
 
@@ -142,9 +142,130 @@ def apply_marked_keys(
         pass
 
 
+def _copy(value: Any) -> Any:
+    """Copy dicts and lists, sharing the immutable leaves they contain."""
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class BaseItemPlan:
+    """A base item compiled once for hydrating and dehydrating many items.
+
+    The key set of each dict in the base item and the plans for its nested
+    dicts and lists are worked out up front, so each item only walks the keys
+    it actually has. Results match hydrate_py and dehydrate.
+    """
+
+    __slots__ = ("base", "keys", "children", "copies")
+
+    def __init__(self, base: Mapping[str, Any] | None):
+        if base is None:
+            base = {}
+        self.base = base
+        self.keys = tuple(base)
+        # Plans for nested dicts, and for lists a tuple with a plan per element
+        # that is a dict.
+        self.children: dict[str, Any] = {}
+        # Values that need copying when hydrated onto an item; immutable leaves
+        # are shared rather than copied.
+        self.copies: set[str] = set()
+        for key, value in base.items():
+            if isinstance(value, dict):
+                self.children[key] = BaseItemPlan(value)
+                self.copies.add(key)
+            elif isinstance(value, list):
+                self.children[key] = tuple(
+                    BaseItemPlan(v) if isinstance(v, dict) else None for v in value
+                )
+                self.copies.add(key)
+
+    def dehydrate(self, item: Mapping[str, Any]) -> dict[str, Any]:
+        """Dehydrate an item against the base item, as dehydrate does."""
+        base = self.base
+        out: dict[str, Any] = {}
+        for key, value in item.items():
+            if key not in base:
+                out[key] = value
+                continue
+            base_value = base[key]
+            if base_value == value:
+                continue
+            if isinstance(base_value, list) and isinstance(value, list):
+                if len(base_value) == len(value):
+                    out[key] = [
+                        plan.dehydrate(v)
+                        if plan is not None and isinstance(v, dict)
+                        else v
+                        for plan, v in zip(self.children[key], value)
+                    ]
+                else:
+                    out[key] = value
+                continue
+            if value is None or value == []:
+                continue
+            if isinstance(value, dict) and isinstance(base_value, dict):
+                out[key] = self.children[key].dehydrate(value)
+            else:
+                out[key] = value
+        for key in self.keys:
+            if key not in item:
+                out[key] = DO_NOT_MERGE_MARKER
+        return out
+
+    def hydrate(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Hydrate an item in-place, as hydrate_py does."""
+        for key in self.keys:
+            if key not in item:
+                value = self.base[key]
+                item[key] = _copy(value) if key in self.copies else value
+                continue
+            value = item[key]
+            child = self.children.get(key)
+            if isinstance(child, BaseItemPlan):
+                if isinstance(value, dict):
+                    child.hydrate(value)
+                    continue
+            elif child is not None:
+                if isinstance(value, list):
+                    if len(child) == len(value):
+                        for plan, v in zip(child, value):
+                            if plan is not None and isinstance(v, dict):
+                                plan.hydrate(v)
+                    continue
+            if value == DO_NOT_MERGE_MARKER:
+                del item[key]
+        return item
+
+
+def dehydrate_many(
+    base_item: Mapping[str, Any],
+    items: Iterable[Mapping[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Dehydrate many items against a base item compiled once."""
+    plan = BaseItemPlan(base_item)
+    for item in items:
+        yield plan.dehydrate(item)
+
+
+def hydrate_many(
+    base_item: Mapping[str, Any],
+    items: Iterable[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Hydrate many items in-place with a base item compiled once."""
+    plan = BaseItemPlan(base_item)
+    for item in items:
+        yield plan.hydrate(item)
+
+
 __all__ = [
+    "BaseItemPlan",
     "apply_marked_keys",
     "dehydrate",
+    "dehydrate_many",
     "hydrate",
+    "hydrate_many",
     "hydrate_py",
 ]
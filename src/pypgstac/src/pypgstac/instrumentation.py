@@ -0,0 +1,160 @@
+"""Hooks for timing the database calls made by pypgstac."""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from .version import __version__
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional, installed with pypgstac[telemetry]
+    otel_trace = None
+
+# Retries made by tenacity for the call currently running in this context.
+_retries: ContextVar[int] = ContextVar("pypgstac_retries", default=0)
+
+
+def count_retry(retry_state: Any) -> None:
+    """Count a retry of the current call, for use as a tenacity before_sleep."""
+    _retries.set(_retries.get() + 1)
+
+
+def take_retries() -> int:
+    """Return and reset the retries counted for the current call."""
+    retries = _retries.get()
+    if retries:
+        _retries.set(0)
+    return retries
+
+
+def result_bytes(cursor: Any) -> int:
+    """Return the size of the values in the current result of a cursor."""
+    res = cursor.pgresult
+    if res is None:
+        return 0
+    return sum(
+        res.get_length(row, col)
+        for row in range(res.ntuples)
+        for col in range(res.nfields)
+    )
+
+
+@dataclass
+class QueryEvent:
+    """A query run by PgstacDB or AsyncPgstacDB.
+
+    name is the pgstac function called, or ``query`` for plain SQL. duration
+    is in seconds and covers executing the query and receiving the result,
+    pool_wait is the time spent waiting for a pooled connection first.
+    """
+
+    name: str
+    duration: float
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    pool_wait: float = 0.0
+    error: BaseException | None = None
+
+
+@dataclass
+class LoadEvent:
+    """A batch of items loaded into a partition by the Loader."""
+
+    partition: str
+    method: str | None
+    duration: float
+    rows: int = 0
+    retries: int = 0
+    error: BaseException | None = None
+
+
+class Instrumentation:
+    """Receives events for database calls.
+
+    The base class ignores every event and has ``enabled`` set to False so
+    that callers skip timing and measuring results altogether. Subclasses set
+    ``enabled`` and override the methods for the events they want.
+    """
+
+    enabled: bool = False
+
+    def query(self, event: QueryEvent) -> None:
+        """Handle a finished query."""
+
+    def load(self, event: LoadEvent) -> None:
+        """Handle a finished partition load."""
+
+
+NOOP = Instrumentation()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Record events as OpenTelemetry client spans.
+
+    Spans are created under the span that is current when the call finishes,
+    such as the span of the API request that made it. Requires the
+    opentelemetry-api package, installed with ``pypgstac[telemetry]``.
+    """
+
+    enabled = True
+
+    def __init__(self, tracer: Any | None = None):
+        if otel_trace is None:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires opentelemetry-api, "
+                "install it with `pip install pypgstac[telemetry]`.",
+            )
+        self._trace = otel_trace
+        self.tracer = tracer or otel_trace.get_tracer("pypgstac", __version__)
+
+    def _span(
+        self,
+        name: str,
+        duration: float,
+        attributes: dict[str, Any],
+        error: BaseException | None,
+    ) -> None:
+        end = time.time_ns()
+        span = self.tracer.start_span(
+            name,
+            kind=self._trace.SpanKind.CLIENT,
+            start_time=end - int(duration * 1e9),
+            attributes={"db.system": "postgresql", **attributes},
+        )
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=end)
+
+    def query(self, event: QueryEvent) -> None:
+        """Record a query span."""
+        self._span(
+            f"pgstac {event.name}",
+            event.duration,
+            {
+                "db.operation.name": event.name,
+                "db.response.returned_rows": event.rows,
+                "pgstac.bytes": event.bytes,
+                "pgstac.retries": event.retries,
+                "pgstac.pool_wait": event.pool_wait,
+            },
+            event.error,
+        )
+
+    def load(self, event: LoadEvent) -> None:
+        """Record a partition load span."""
+        self._span(
+            "pgstac load_partition",
+            event.duration,
+            {
+                "db.operation.name": "load_partition",
+                "db.collection.name": event.partition,
+                "pgstac.method": event.method or "insert",
+                "pgstac.rows": event.rows,
+                "pgstac.retries": event.retries,
+            },
+            event.error,
+        )
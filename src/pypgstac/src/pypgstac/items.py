@@ -0,0 +1,341 @@
+"""Client side hydration of split column pgstac item rows."""
+
+import threading
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+import orjson
+from cachetools import LRUCache
+
+from .db import PgstacDB
+
+# Promoted item columns in the order and with the STAC names used by
+# promoted_properties_from_item. Keep in sync with the COLUMN LIST SYNC
+# CONTRACT in 003a_items.sql.
+PROMOTED_PROPERTIES: tuple[tuple[str, str], ...] = (
+    ("created", "created"),
+    ("updated", "updated"),
+    ("platform", "platform"),
+    ("instruments", "instruments"),
+    ("constellation", "constellation"),
+    ("mission", "mission"),
+    ("eo_cloud_cover", "eo:cloud_cover"),
+    ("bands", "bands"),
+    ("eo_snow_cover", "eo:snow_cover"),
+    ("gsd", "gsd"),
+    ("proj_code", "proj:code"),
+    ("proj_geometry", "proj:geometry"),
+    ("proj_wkt2", "proj:wkt2"),
+    ("proj_projjson", "proj:projjson"),
+    ("proj_bbox", "proj:bbox"),
+    ("proj_centroid", "proj:centroid"),
+    ("proj_shape", "proj:shape"),
+    ("proj_transform", "proj:transform"),
+    ("sci_doi", "sci:doi"),
+    ("sci_citation", "sci:citation"),
+    ("sci_publications", "sci:publications"),
+    ("view_off_nadir", "view:off_nadir"),
+    ("view_incidence_angle", "view:incidence_angle"),
+    ("view_azimuth", "view:azimuth"),
+    ("view_sun_azimuth", "view:sun_azimuth"),
+    ("view_sun_elevation", "view:sun_elevation"),
+    ("view_moon_azimuth", "view:moon_azimuth"),
+    ("view_moon_elevation", "view:moon_elevation"),
+    ("file_size", "file:size"),
+    ("file_header_size", "file:header_size"),
+    ("file_checksum", "file:checksum"),
+    ("file_byte_order", "file:byte_order"),
+    ("sat_orbit_state", "sat:orbit_state"),
+    ("sat_relative_orbit", "sat:relative_orbit"),
+    ("sat_absolute_orbit", "sat:absolute_orbit"),
+    (
+        "sat_platform_international_designator",
+        "sat:platform_international_designator",
+    ),
+    ("sat_anx_datetime", "sat:anx_datetime"),
+)
+
+Fragment = tuple[dict[str, Any] | None, list[Any] | None]
+RawFragment = tuple[str | None, str | None]
+
+
+def tstz_to_stac_text(value: datetime | None) -> str | None:
+    """Format a timestamp the same way as tstz_to_stac_text in pgstac."""
+    if value is None:
+        return None
+    text = value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%f")
+    return text.rstrip("0").rstrip(".") + "Z"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return tstz_to_stac_text(value)
+    # float8 -> jsonb drops the fractional part of whole numbers.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def strip_nulls(value: Any) -> Any:
+    """Recursively remove null object members like jsonb_strip_nulls."""
+    if isinstance(value, dict):
+        return {k: strip_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [strip_nulls(v) for v in value]
+    return value
+
+
+def merge_recursive(frag: Any, item: Any) -> Any:
+    """Deep merge fragment and item values like jsonb_merge_recursive."""
+    if frag is None:
+        return item if item is not None else {}
+    if item is None or item == {}:
+        return frag
+    if isinstance(frag, dict) and isinstance(item, dict):
+        out = dict(frag)
+        for k, v in item.items():
+            f = frag.get(k)
+            if isinstance(f, dict) and isinstance(v, dict):
+                out[k] = merge_recursive(f, v)
+            else:
+                out[k] = v
+        return out
+    return item
+
+
+def links_hydrate(links_template: Any, link_hrefs: list[str] | None) -> list[Any]:
+    """Rebuild item links from a template and hrefs like stac_links_hydrate."""
+    if not isinstance(links_template, list):
+        return []
+    if not link_hrefs:
+        return list(links_template)
+    links = []
+    for i, link in enumerate(links_template):
+        if isinstance(link, dict):
+            hydrated = {k: v for k, v in link.items() if k != "href"}
+            if i < len(link_hrefs) and link_hrefs[i] is not None:
+                hydrated["href"] = link_hrefs[i]
+            links.append(hydrated)
+        else:
+            links.append(link)
+    return links
+
+
+def promoted_properties(row: dict[str, Any]) -> dict[str, Any]:
+    """Rebuild properties held in promoted columns."""
+    if row.get("datetime_is_range"):
+        props: dict[str, Any] = {"datetime": None}
+        for key, col in (
+            ("start_datetime", "datetime"),
+            ("end_datetime", "end_datetime"),
+        ):
+            if row.get(col) is not None:
+                props[key] = tstz_to_stac_text(row[col])
+    else:
+        props = {"datetime": tstz_to_stac_text(row.get("datetime"))}
+    for col, name in PROMOTED_PROPERTIES:
+        value = row.get(col)
+        if value is not None:
+            props[name] = strip_nulls(_json_value(value))
+    return props
+
+
+def _get_path(j: Any, path: list[str]) -> Any:
+    for p in path:
+        if isinstance(j, dict):
+            j = j.get(p)
+        elif isinstance(j, list) and p.lstrip("-").isdigit():
+            idx = int(p)
+            j = j[idx] if -len(j) <= idx < len(j) else None
+        else:
+            return None
+        if j is None:
+            return None
+    return j
+
+
+def _set_nested(j: dict[str, Any], path: list[str], value: Any) -> None:
+    for p in path[:-1]:
+        nxt = j.get(p)
+        if not isinstance(nxt, dict):
+            nxt = {}
+            j[p] = nxt
+        j = nxt
+    j[path[-1]] = value
+
+
+def _del_path(j: Any, path: list[str]) -> None:
+    parent = _get_path(j, path[:-1]) if len(path) > 1 else j
+    last = path[-1]
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+    elif isinstance(parent, list) and last.lstrip("-").isdigit():
+        idx = int(last)
+        if -len(parent) <= idx < len(parent):
+            del parent[idx]
+
+
+def include_field(f: str, fields: dict[str, Any] | None) -> bool:
+    """Return whether a top level field is kept, like include_field in pgstac."""
+    if not fields:
+        return True
+    excludes = fields.get("exclude") or []
+    includes = fields.get("include") or []
+    if f in excludes:
+        return False
+    return not includes or f in includes
+
+
+def apply_fields(item: dict[str, Any], fields: dict[str, Any] | None) -> dict[str, Any]:
+    """Apply STAC fields include/exclude like jsonb_fields."""
+    if not fields:
+        return item
+    includes = fields.get("include")
+    if includes:
+        includes = list(includes) + (
+            ["id", "collection"] if "collection" in item else ["id"]
+        )
+        out: dict[str, Any] = {}
+        for f in includes:
+            path = f.split(".")
+            _set_nested(out, path, _get_path(item, path))
+        item = out
+    for f in fields.get("exclude") or []:
+        _del_path(item, f.split("."))
+    return item
+
+
+def hydrate_row(
+    row: dict[str, Any],
+    fragment: Fragment | None = None,
+    fields: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Assemble a STAC item from split columns, as content_hydrate does.
+
+    The geometry column is expected to already be GeoJSON, as returned by
+    ST_AsGeoJSON(geometry, 20)::jsonb.
+    """
+    frag_content, frag_links_template = fragment or (None, None)
+    frag_content = frag_content or {}
+
+    assets = merge_recursive(frag_content.get("assets"), row.get("assets") or {})
+    properties = promoted_properties(row)
+    properties.update(
+        merge_recursive(frag_content.get("properties"), row.get("properties") or {})
+        or {},
+    )
+    stac_version = row.get("stac_version")
+    if stac_version is None:
+        stac_version = frag_content.get("stac_version")
+    stac_extensions = row.get("stac_extensions")
+    if not stac_extensions:
+        stac_extensions = frag_content.get("stac_extensions", stac_extensions)
+    if row.get("fragment_id") is not None:
+        links = links_hydrate(frag_links_template, row.get("link_hrefs"))
+    else:
+        links = row.get("links") or []
+
+    out: dict[str, Any] = {
+        "id": row["id"],
+        "geometry": row.get("geometry") if include_field("geometry", fields) else None,
+        "collection": row["collection"],
+        "type": "Feature",
+    }
+    if row.get("bbox") is not None:
+        out["bbox"] = row["bbox"]
+    if stac_version is not None:
+        out["stac_version"] = stac_version
+    if stac_extensions:
+        out["stac_extensions"] = stac_extensions
+    out["links"] = links
+    if assets != {}:
+        out["assets"] = assets
+    out["properties"] = properties
+    if row.get("extra") is not None:
+        out.update(row["extra"])
+    return apply_fields(out, fields)
+
+
+class FragmentCache:
+    """Bounded LRU cache of item_fragments keyed by fragment_id.
+
+    Fragments are content addressed and never change once written, so cached
+    entries do not need to be invalidated. Entries are kept as json text and
+    parsed per item so hydrated items never share mutable state with the cache.
+    """
+
+    def __init__(self, db: PgstacDB, maxsize: int = 1024):
+        self.db = db
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get_many(self, ids: Iterable[int]) -> dict[int, RawFragment]:
+        """Return fragments for ids, fetching any misses in one query."""
+        wanted = set(ids)
+        with self._lock:
+            found = {i: self._cache[i] for i in wanted if i in self._cache}
+        missing = list(wanted - found.keys())
+        if missing:
+            for fid, content, links_template in self.db.query(
+                """
+                SELECT id, content::text, links_template::text
+                FROM item_fragments WHERE id = ANY(%s);
+                """,
+                (missing,),
+            ):
+                found[fid] = (content, links_template)
+            with self._lock:
+                for fid in missing:
+                    if fid in found:
+                        self._cache[fid] = found[fid]
+        return found
+
+
+class ItemHydrator:
+    """Hydrate split column item rows client side using a fragment cache."""
+
+    def __init__(self, db: PgstacDB, cache_size: int = 1024):
+        self.db = db
+        self.fragments = FragmentCache(db, cache_size)
+        self._select_lists: LRUCache = LRUCache(maxsize=128)
+
+    def select_list(self, fields: dict[str, Any] | None = None) -> str:
+        """Return the SELECT list of raw columns for rows passed to hydrate_rows.
+
+        The list is built by fields_to_itemcols in PgSTAC, so columns that the
+        fields extension leaves out are not fetched, and expects the items
+        table to be aliased as i.
+        """
+        key = orjson.dumps(fields or {}, option=orjson.OPT_SORT_KEYS)
+        if key not in self._select_lists:
+            self._select_lists[key] = str(
+                self.db.query_one(
+                    "SELECT fields_to_itemcols(%s::jsonb, true);",
+                    (key.decode(),),
+                ),
+            )
+        return self._select_lists[key]
+
+    def hydrate_rows(
+        self,
+        rows: list[dict[str, Any]],
+        fields: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Hydrate a batch of rows, fetching uncached fragments together."""
+        fragments = self.fragments.get_many(
+            r["fragment_id"] for r in rows if r.get("fragment_id") is not None
+        )
+        out = []
+        for r in rows:
+            fragment: Fragment | None = None
+            fid = r.get("fragment_id")
+            raw = fragments.get(fid) if fid is not None else None
+            if raw is not None:
+                content, template = raw
+                fragment = (
+                    orjson.loads(content) if content is not None else None,
+                    orjson.loads(template) if template is not None else None,
+                )
+            out.append(hydrate_row(r, fragment, fields))
+        return out
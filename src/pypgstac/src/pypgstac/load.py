@@ -27,6 +27,7 @@ from plpygis.geometry import Geometry
 from psycopg import sql
 from smart_open import open
 from tenacity import (
+    RetryCallState,
     retry,
     retry_if_exception_type,
     stop_after_attempt,
@@ -35,7 +36,8 @@ from tenacity import (
 from version_parser import Version as V
 
 from .db import PgstacDB
-from .hydration import dehydrate
+from .hydration import BaseItemPlan
+from .instrumentation import LoadEvent, count_retry, take_retries
 from .version import __version__
 
 logger = logging.getLogger(__name__)
@@ -158,6 +160,16 @@ def read_json(file: Path | str | Iterator[Any] = "stdin") -> Iterable:
                 raise TypeError("Unsupported json input type in iterable.")
 
 
+def _before_load_partition_retry(retry_state: RetryCallState) -> None:
+    """Count a partition load retry and recheck the partition on a CheckViolation."""
+    count_retry(retry_state)
+    if retry_state.outcome is not None and isinstance(
+        retry_state.outcome.exception(),
+        psycopg.errors.CheckViolation,
+    ):
+        retry_state.args[1].requires_update = True
+
+
 class Loader:
     """Utilities for loading data."""
 
@@ -205,6 +217,18 @@ class Loader:
         logger.debug(f"Found {collection_id} with base_item {base_item}")
         return base_item, key, partition_trunc
 
+    @lru_cache(maxsize=128)
+    def base_item_plan(self, collection_id: str) -> BaseItemPlan:
+        """Get the compiled base item used to dehydrate items of a collection."""
+        base_item, _, _ = self.collection_json(collection_id)
+        return BaseItemPlan(base_item)
+
+    @lru_cache(maxsize=1)
+    def q_tsvector(self) -> bool:
+        """Whether items store the vector of the q operator in q_tsv."""
+        res = self.db.query_one("SELECT q_tsvector();")
+        return bool(res)
+
     def load_collections(
         self,
         file: Path | str | Iterator[Any] = "stdin",
@@ -281,19 +305,7 @@ class Loader:
             | retry_if_exception_type(psycopg.errors.ObjectInUse)
         ),
         reraise=True,
-        before_sleep=lambda retry_state: (
-            setattr(
-                retry_state.args[1],
-                "requires_update",
-                True,
-            )
-            if retry_state.outcome is not None
-            and isinstance(
-                retry_state.outcome.exception(),
-                psycopg.errors.CheckViolation,
-            )
-            else None
-        ),
+        before_sleep=_before_load_partition_retry,
     )
     def load_partition(
         self,
@@ -302,6 +314,42 @@ class Loader:
         insert_mode: Methods | None = Methods.insert,
     ) -> None:
         """Load items data for a single partition."""
+        inst = self.db.instrumentation
+        if not inst.enabled:
+            self._load_partition(partition, items, insert_mode)
+            return
+        items = list(items)
+        t = time.perf_counter()
+        try:
+            self._load_partition(partition, items, insert_mode)
+        except BaseException as e:
+            inst.load(
+                LoadEvent(
+                    partition.name,
+                    insert_mode,
+                    time.perf_counter() - t,
+                    rows=len(items),
+                    retries=take_retries(),
+                    error=e,
+                ),
+            )
+            raise
+        inst.load(
+            LoadEvent(
+                partition.name,
+                insert_mode,
+                time.perf_counter() - t,
+                rows=len(items),
+                retries=take_retries(),
+            ),
+        )
+
+    def _load_partition(
+        self,
+        partition: Partition,
+        items: Iterable[dict[str, Any]],
+        insert_mode: Methods | None = Methods.insert,
+    ) -> None:
         conn = self.db.connect()
         t = time.perf_counter()
 
@@ -338,10 +386,10 @@ class Loader:
 
             with conn.transaction():
                 t = time.perf_counter()
-                if insert_mode in (
-                    None,
-                    Methods.insert,
-                ):
+                q_tsv = self.q_tsvector()
+                # Plain inserts are copied straight into the partition unless
+                # q_tsv has to be computed in the temp table first.
+                if insert_mode in (None, Methods.insert) and not q_tsv:
                     with cur.copy(
                         sql.SQL(
                             """
@@ -369,6 +417,8 @@ class Loader:
                     logger.debug(cur.statusmessage)
                     logger.debug(f"Rows affected: {cur.rowcount}")
                 elif insert_mode in (
+                    None,
+                    Methods.insert,
                     Methods.insert_ignore,
                     Methods.upsert,
                     Methods.delsert,
@@ -379,6 +429,7 @@ class Loader:
                         DROP TABLE IF EXISTS items_ingest_temp;
                         CREATE TEMP TABLE items_ingest_temp
                         (LIKE items INCLUDING DEFAULTS) ON COMMIT DROP;
+                        ALTER TABLE items_ingest_temp ADD COLUMN q_properties jsonb;
                         """,
                     )
                     with cur.copy(
@@ -386,7 +437,7 @@ class Loader:
                         COPY items_ingest_temp
                         (id, collection, datetime,
                         end_datetime, geometry,
-                        content, private)
+                        content, private, q_properties)
                         FROM stdin;
                         """,
                     ) as copy:
@@ -401,11 +452,27 @@ class Loader:
                                     item["geometry"],
                                     item["content"],
                                     item.get("private", None),
+                                    item.get("q_properties", None),
                                 ),
                             )
                     logger.debug(cur.statusmessage)
                     logger.debug(f"Copied rows: {cur.rowcount}")
 
+                    # q_tsv is built from the properties of the item as it was
+                    # given, before dehydration, like content_dehydrate and
+                    # update_q_tsvector do.
+                    if q_tsv:
+                        cur.execute(
+                            """
+                            UPDATE items_ingest_temp
+                            SET q_tsv = stac_q_tsvector(q_properties)
+                            WHERE q_properties IS NOT NULL;
+                            """,
+                        )
+                    cur.execute(
+                        "ALTER TABLE items_ingest_temp DROP COLUMN q_properties;",
+                    )
+
                     cur.execute(
                         sql.SQL(
                             """
@@ -414,6 +481,21 @@ class Loader:
                         ).format(sql.Identifier(partition.name)),
                     )
                     if insert_mode in (
+                        None,
+                        Methods.insert,
+                    ):
+                        cur.execute(
+                            sql.SQL(
+                                """
+                                INSERT INTO {}
+                                SELECT *
+                                FROM items_ingest_temp;
+                                """,
+                            ).format(sql.Identifier(partition.name)),
+                        )
+                        logger.debug(cur.statusmessage)
+                        logger.debug(f"Rows affected: {cur.rowcount}")
+                    elif insert_mode in (
                         Methods.ignore,
                         Methods.insert_ignore,
                     ):
@@ -439,7 +521,8 @@ class Loader:
                                     end_datetime = EXCLUDED.end_datetime,
                                     geometry = EXCLUDED.geometry,
                                     collection = EXCLUDED.collection,
-                                    content = EXCLUDED.content
+                                    content = EXCLUDED.content,
+                                    q_tsv = EXCLUDED.q_tsv
                                 WHERE t IS DISTINCT FROM EXCLUDED
                                 ;
                             """,
@@ -464,7 +547,8 @@ class Loader:
                                     end_datetime = EXCLUDED.end_datetime,
                                     geometry = EXCLUDED.geometry,
                                     collection = EXCLUDED.collection,
-                                    content = EXCLUDED.content
+                                    content = EXCLUDED.content,
+                                    q_tsv = EXCLUDED.q_tsv
                                 WHERE t IS DISTINCT FROM EXCLUDED
                                 ;
                                 """,
@@ -478,7 +562,7 @@ class Loader:
                         f"You entered {insert_mode}.",
                     )
                 logger.debug("Updating Partition Stats")
-                cur.execute("SELECT update_partition_stats_q(%s);", (partition.name,))
+                cur.execute("SELECT partition_written(%s);", (partition.name,))
                 logger.debug(cur.statusmessage)
                 logger.debug(f"Rows affected: {cur.rowcount}")
         logger.debug(
@@ -639,14 +723,22 @@ class Loader:
         else:
             items = self.read_hydrated(file)
 
-        for chunkin in chunked_iterable(items, chunksize):
-            chunk = list(chunkin)
-            chunk.sort(key=lambda x: x["partition"])
-            for k, g in itertools.groupby(chunk, lambda x: x["partition"]):
-                self.load_partition(self._partition_cache[k], list(g), insert_mode)
+        for chunk in chunked_iterable(items, chunksize):
+            self.load_chunk(chunk, insert_mode)
 
         logger.debug(f"Adding data to database took {time.perf_counter() - t} seconds.")
 
+    def load_chunk(
+        self,
+        items: Iterable[dict[str, Any]],
+        insert_mode: Methods | None = Methods.insert,
+    ) -> None:
+        """Load a chunk of formatted items, grouped by partition."""
+        chunk = list(items)
+        chunk.sort(key=lambda x: x["partition"])
+        for k, g in itertools.groupby(chunk, lambda x: x["partition"]):
+            self.load_partition(self._partition_cache[k], list(g), insert_mode)
+
     def format_item(self, _item: Path | str | dict[str, Any]) -> dict[str, Any]:
         """Format an item to insert into a record."""
         out: dict[str, Any] = {}
@@ -659,7 +751,8 @@ class Loader:
         else:
             item = _item
 
-        base_item, key, partition_trunc = self.collection_json(item["collection"])
+        _, key, partition_trunc = self.collection_json(item["collection"])
+        base_item_plan = self.base_item_plan(item["collection"])
 
         out["id"] = item.get("id")
         out["collection"] = item.get("collection")
@@ -704,7 +797,7 @@ class Loader:
             geometry = str(geom.ewkb)
         out["geometry"] = geometry
 
-        content = dehydrate(base_item, item)
+        content = base_item_plan.dehydrate(item)
 
         # Remove keys from the dehydrated item content which are stored directly
         # on the table row.
@@ -719,6 +812,15 @@ class Loader:
 
         out["content"] = orjson.dumps(content).decode()
 
+        if self.q_tsvector():
+            out["q_properties"] = orjson.dumps(
+                {
+                    k: properties[k]
+                    for k in ("description", "title", "keywords")
+                    if k in properties
+                },
+            ).decode()
+
         return out
 
     def __hash__(self) -> int:
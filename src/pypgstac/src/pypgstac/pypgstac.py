@@ -1,15 +1,20 @@
 """Command utilities for managing pgstac."""
 
+import asyncio
 import logging
+import signal
 import sys
 
 import fire
 import orjson
 from smart_open import open
 
+from pypgstac.daemon import IngestDaemon
 from pypgstac.db import PgstacDB
-from pypgstac.load import Loader, Methods, Tables, read_json
+from pypgstac.generate import ItemGenerator
+from pypgstac.load import Loader, Methods, Tables, open_std, read_json
 from pypgstac.migrate import Migrate
+from pypgstac.tileload import TileLoadTest
 
 
 class PgstacCLI:
@@ -75,6 +80,147 @@ class PgstacCLI:
         if table == "items":
             loader.load_items(file, method, dehydrated, chunksize)
 
+    def ingest_daemon(
+        self,
+        source: str = "stdin",
+        method: Methods | None = Methods.insert,
+        max_items: int = 5000,
+        max_wait: float = 2.0,
+        latency_target: float | None = None,
+        metrics_interval: float = 60.0,
+        metrics_file: str | None = None,
+    ) -> None:
+        """Continuously load items from a spool directory or stdin in batches."""
+        # Metrics are reported through logging, make sure they are visible.
+        logging.basicConfig(level=logging.INFO)
+        daemon = IngestDaemon(
+            self._db,
+            insert_mode=method,
+            max_items=max_items,
+            max_wait=max_wait,
+            latency_target=latency_target,
+            metrics_interval=metrics_interval,
+            metrics_file=metrics_file,
+        )
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: daemon.stop())
+        daemon.run(source)
+
+    def generate(
+        self,
+        items: int = 1000,
+        output: str = "stdout",
+        load: bool = False,
+        method: Methods | None = Methods.insert,
+        chunksize: int | None = 10000,
+        partition_trunc: str | None = "month",
+        templates: str | None = None,
+        collections: list[str] | None = None,
+        seed: int = 0,
+        start: str | None = None,
+        end: str | None = None,
+        time_skew: float = 0.0,
+        space_skew: float = 0.0,
+        hotspots: int = 10,
+        asset_skew: float = 0.0,
+        cardinality: int | None = None,
+        property_skew: float = 0.0,
+    ) -> None:
+        """Generate synthetic items from template collections.
+
+        Items are written as ndjson to output or, with load, loaded directly
+        along with their collections. See pypgstac.generate.ItemGenerator for
+        the skew options.
+        """
+        generator = ItemGenerator(
+            templates=templates,
+            collections=collections,
+            seed=seed,
+            start=start,
+            end=end,
+            time_skew=time_skew,
+            space_skew=space_skew,
+            hotspots=hotspots,
+            asset_skew=asset_skew,
+            cardinality=cardinality,
+            property_skew=property_skew,
+        )
+        if not load:
+            with open_std(output, "wb") as f:
+                for item in generator.items(items):
+                    f.write(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+            return
+
+        loader = Loader(db=self._db)
+        loader.check_version()
+        conn = self._db.connect()
+        with conn.transaction():
+            for collection in generator.collections():
+                conn.execute(
+                    "SELECT upsert_collection(%s, %s);",
+                    (orjson.dumps(collection).decode(), partition_trunc),
+                )
+        loader.load_items(generator.items(items), method, chunksize=chunksize)
+
+    def tileload(
+        self,
+        queryhash: list[str] | str | None = None,
+        search: str | dict | None = None,
+        concurrency: int = 10,
+        sessions: int = 10,
+        minzoom: int = 8,
+        maxzoom: int = 14,
+        bbox: list[float] | None = None,
+        seed: int = 0,
+        scanlimit: int = 10000,
+        limit: int = 100,
+        timelimit: str = "5 seconds",
+        exitwhenfull: bool = True,
+        skipcovered: bool = True,
+        output: str = "stdout",
+    ) -> None:
+        """Replay web map tile sessions with concurrent xyzsearch requests.
+
+        Tiles are requested for the registered searches in queryhash and/or a
+        search json that is registered first. A json report of latency
+        percentiles, throughput and geometrysearch scan counters is written to
+        output.
+        """
+        if isinstance(queryhash, str):
+            queryhash = [queryhash]
+        test = TileLoadTest(
+            dsn=self.dsn or "",
+            queryhashes=queryhash,
+            concurrency=concurrency,
+            scanlimit=scanlimit,
+            limit=limit,
+            timelimit=timelimit,
+            exitwhenfull=exitwhenfull,
+            skipcovered=skipcovered,
+        )
+
+        async def run() -> dict:
+            try:
+                if search is not None:
+                    await test.register(
+                        orjson.loads(search) if isinstance(search, str) else search,
+                    )
+                report = await test.run_sessions(
+                    sessions=sessions,
+                    minzoom=minzoom,
+                    maxzoom=maxzoom,
+                    bbox=bbox,
+                    seed=seed,
+                )
+                return report.as_dict()
+            finally:
+                await test.close()
+
+        report = asyncio.run(run())
+        with open_std(output, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            f.write(b"\n")
+
     def runqueue(self) -> str:
         return self._db.run_queued()
 
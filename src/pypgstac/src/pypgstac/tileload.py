@@ -0,0 +1,340 @@
+"""Replay tile requests against pgstac with many concurrent connections."""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import orjson
+from psycopg_pool import AsyncConnectionPool
+
+from .db import AsyncPgstacDB
+
+logger = logging.getLogger(__name__)
+
+MAX_LATITUDE = 85.0511287798066
+
+Tile = tuple[int, int, int]
+
+TILE_QUERY = """
+    SELECT g::text, current_setting('pgstac.geometrysearch_stats', true)
+    FROM xyzsearch(
+        %s, %s, %s, %s, %s::jsonb, %s, %s, %s::interval, %s, %s
+    ) g;
+"""
+
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> tuple[int, int]:
+    """Return the x/y of the WebMercatorQuad tile containing a point."""
+    lat = max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)
+    n = 2**zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def viewport(x: int, y: int, z: int, width: int, height: int) -> list[Tile]:
+    """Return the tiles of a map viewport centered on a tile, center first."""
+    n = 2**z
+    tiles = [
+        ((x + dx) % n, y + dy, z)
+        for dy in range(-(height // 2), height - height // 2)
+        for dx in range(-(width // 2), width - width // 2)
+        if 0 <= y + dy < n
+    ]
+    return sorted(tiles, key=lambda t: abs(t[0] - x) + abs(t[1] - y))
+
+
+def tile_session(
+    lon: float,
+    lat: float,
+    minzoom: int,
+    maxzoom: int,
+    rng: random.Random,
+    width: int = 4,
+    height: int = 3,
+    pans: int = 2,
+) -> list[Tile]:
+    """Return the tiles a web map requests zooming in on a point.
+
+    At each zoom level the whole viewport is requested, then the map is
+    panned ``pans`` times by one tile in a random direction, requesting the
+    tiles that come into view.
+    """
+    tiles: list[Tile] = []
+    for z in range(minzoom, maxzoom + 1):
+        x, y = lonlat_to_tile(lon, lat, z)
+        seen = set(viewport(x, y, z, width, height))
+        tiles.extend(viewport(x, y, z, width, height))
+        for _ in range(pans):
+            dx, dy = rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+            x, y = (x + dx) % 2**z, min(max(y + dy, 0), 2**z - 1)
+            for tile in viewport(x, y, z, width, height):
+                if tile not in seen:
+                    seen.add(tile)
+                    tiles.append(tile)
+    return tiles
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the nearest rank percentile q (0-100) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class TileResult:
+    """Timing and geometrysearch counters for one tile request."""
+
+    queryhash: str
+    x: int
+    y: int
+    z: int
+    seconds: float
+    bytes: int = 0
+    stats: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class TileLoadReport:
+    """Latency, throughput and scan counters for a tile load test."""
+
+    concurrency: int
+    requests: int
+    errors: int
+    elapsed: float
+    requests_per_second: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    mean_returned: float
+    mean_scanned: float
+    p95_scanned: float
+    mean_bands: float
+    covered: float
+    bytes: int
+    by_zoom: dict[str, dict[str, float]]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the report as a json serializable dict."""
+        return asdict(self)
+
+
+def summarize(
+    results: list[TileResult],
+    elapsed: float,
+    concurrency: int,
+) -> TileLoadReport:
+    """Summarize tile results into latency percentiles and counters."""
+    ok = [r for r in results if r.error is None]
+    latencies = [r.seconds for r in ok]
+
+    def mean(key: str) -> float:
+        values = [float(r.stats.get(key) or 0) for r in ok]
+        return sum(values) / len(values) if values else 0.0
+
+    by_zoom: dict[str, dict[str, float]] = {}
+    for z in sorted({r.z for r in ok}):
+        zl = [r.seconds for r in ok if r.z == z]
+        by_zoom[str(z)] = {
+            "requests": len(zl),
+            "p50": percentile(zl, 50),
+            "p95": percentile(zl, 95),
+            "p99": percentile(zl, 99),
+        }
+    return TileLoadReport(
+        concurrency=concurrency,
+        requests=len(results),
+        errors=len(results) - len(ok),
+        elapsed=elapsed,
+        requests_per_second=len(ok) / elapsed if elapsed > 0 else 0.0,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        max=max(latencies, default=0.0),
+        mean_returned=mean("returned"),
+        mean_scanned=mean("scanned"),
+        p95_scanned=percentile([float(r.stats.get("scanned") or 0) for r in ok], 95),
+        mean_bands=mean("bands"),
+        covered=mean("covered"),
+        bytes=sum(r.bytes for r in ok),
+        by_zoom=by_zoom,
+    )
+
+
+class TileLoadTest:
+    """Replay web map tile sessions against registered searches concurrently.
+
+    Each session zooms in on a point and pans at every zoom level, as a user
+    of a web map would. Tiles from all sessions are requested with
+    ``xyzsearch`` over ``concurrency`` connections, cycling through the
+    registered searches by session. Per request latency (including the wait
+    for a pooled connection) is recorded along with the ``geometrysearch``
+    scan counters for the call.
+    """
+
+    def __init__(
+        self,
+        dsn: str = "",
+        queryhashes: list[str] | None = None,
+        concurrency: int = 10,
+        fields: dict[str, Any] | None = None,
+        scanlimit: int = 10000,
+        limit: int = 100,
+        timelimit: str = "5 seconds",
+        exitwhenfull: bool = True,
+        skipcovered: bool = True,
+    ):
+        self.dsn = dsn
+        self.queryhashes = list(queryhashes or [])
+        self.concurrency = concurrency
+        self.fields = fields
+        self.scanlimit = scanlimit
+        self.limit = limit
+        self.timelimit = timelimit
+        self.exitwhenfull = exitwhenfull
+        self.skipcovered = skipcovered
+        self.db = AsyncPgstacDB(dsn=dsn)
+
+    async def open(self) -> None:
+        """Open a pool with a connection per concurrent client."""
+        if self.db.pool is None:
+            self.db.pool = AsyncConnectionPool(
+                conninfo=self.dsn,
+                min_size=self.concurrency,
+                max_size=self.concurrency,
+                configure=self.db.configure,
+                open=False,
+            )
+            await self.db.pool.open(wait=True)
+
+    async def close(self) -> None:
+        """Close the pool."""
+        await self.db.close()
+
+    async def register(self, search: dict[str, Any]) -> str:
+        """Register a search and use it for the load test, returning its hash."""
+        await self.open()
+        queryhash = await self.db.query_one(
+            "SELECT hash FROM search_query(%s);",
+            (orjson.dumps(search).decode(),),
+        )
+        self.queryhashes.append(str(queryhash))
+        return str(queryhash)
+
+    async def centers(
+        self,
+        sessions: int,
+        seed: int = 0,
+        bbox: list[float] | None = None,
+    ) -> list[tuple[float, float]]:
+        """Pick session centers in a bbox, or from a sample of item centroids."""
+        rng = random.Random(seed)
+        if bbox is not None:
+            return [
+                (rng.uniform(bbox[0], bbox[2]), rng.uniform(bbox[1], bbox[3]))
+                for _ in range(sessions)
+            ]
+        await self.open()
+        rows = await self.db.query(
+            """
+            SELECT ST_X(c), ST_Y(c) FROM (
+                SELECT ST_PointOnSurface(geometry) AS c FROM items
+                ORDER BY md5(id || %s) LIMIT %s
+            ) s;
+            """,
+            (str(seed), sessions),
+        )
+        if not rows:
+            raise ValueError("No items found to center tile sessions on.")
+        return [rows[i % len(rows)] for i in range(sessions)]
+
+    async def request(self, queryhash: str, tile: Tile) -> TileResult:
+        """Request one tile, recording its latency and scan counters."""
+        x, y, z = tile
+        t = time.perf_counter()
+        try:
+            rows = await self.db.query(
+                TILE_QUERY,
+                (
+                    x,
+                    y,
+                    z,
+                    queryhash,
+                    orjson.dumps(self.fields).decode() if self.fields else None,
+                    self.scanlimit,
+                    self.limit,
+                    self.timelimit,
+                    self.exitwhenfull,
+                    self.skipcovered,
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Tile {z}/{x}/{y} failed: {e}")
+            return TileResult(queryhash, x, y, z, time.perf_counter() - t, error=str(e))
+        elapsed = time.perf_counter() - t
+        features, stats = rows[0]
+        return TileResult(
+            queryhash,
+            x,
+            y,
+            z,
+            elapsed,
+            bytes=len(features or ""),
+            stats=orjson.loads(stats) if stats else {},
+        )
+
+    async def run_async(self, sessions: list[list[Tile]]) -> list[TileResult]:
+        """Request every tile of every session and return the results."""
+        if not self.queryhashes:
+            raise ValueError("No registered searches to request tiles for.")
+        await self.open()
+        queue: asyncio.Queue = asyncio.Queue()
+        # Interleave sessions so concurrent clients pan different maps.
+        for i in range(max((len(s) for s in sessions), default=0)):
+            for n, session in enumerate(sessions):
+                if i < len(session):
+                    queue.put_nowait(
+                        (self.queryhashes[n % len(self.queryhashes)], session[i]),
+                    )
+        results: list[TileResult] = []
+
+        async def worker() -> None:
+            while True:
+                try:
+                    queryhash, tile = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append(await self.request(queryhash, tile))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+    async def run_sessions(
+        self,
+        sessions: int = 10,
+        minzoom: int = 8,
+        maxzoom: int = 14,
+        bbox: list[float] | None = None,
+        seed: int = 0,
+        width: int = 4,
+        height: int = 3,
+        pans: int = 2,
+    ) -> TileLoadReport:
+        """Generate tile sessions, replay them and summarize the results."""
+        rng = random.Random(seed)
+        tiles = [
+            tile_session(lon, lat, minzoom, maxzoom, rng, width, height, pans)
+            for lon, lat in await self.centers(sessions, seed, bbox)
+        ]
+        t = time.perf_counter()
+        results = await self.run_async(tiles)
+        return summarize(results, time.perf_counter() - t, self.concurrency)
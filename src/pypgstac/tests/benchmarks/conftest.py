@@ -0,0 +1,156 @@
+"""Fixtures and synthetic data for the pgstac benchmark suite.
+
+Items are generated with pypgstac.generate from the Planetary Computer
+fixtures.
+
+The size of the generated data is controlled with environment variables so the
+same suite can be run quickly in CI or at scale:
+
+- ``PGSTAC_BENCH_COLLECTIONS``: number of template collections (default 3)
+- ``PGSTAC_BENCH_ITEMS``: items per collection (default 1000)
+- ``PGSTAC_BENCH_MONTHS``: months the item datetimes are spread over (default 12)
+- ``PGSTAC_BENCH_SEED``: seed for the generator (default 0)
+- ``PGSTAC_BENCH_ROUNDS``: rounds for each benchmark (default 3)
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Generator, Iterable, Iterator
+
+import orjson
+import psycopg
+import pytest
+from psycopg import sql
+
+from pypgstac.db import PgstacDB
+from pypgstac.generate import ItemGenerator
+from pypgstac.load import chunked_iterable
+from pypgstac.version import __version__
+
+BENCH_DATABASE = "pypgstacbenchdb"
+START = datetime(2020, 1, 1, tzinfo=UTC)
+
+# Details of the benchmarked database, saved alongside the results.
+RUN_INFO: dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of the synthetic benchmark data."""
+
+    collections: int
+    items: int
+    months: int
+    seed: int
+    rounds: int
+
+    @classmethod
+    def from_env(cls) -> "Scale":
+        """Read the scale from PGSTAC_BENCH_* environment variables."""
+        return cls(
+            collections=int(os.getenv("PGSTAC_BENCH_COLLECTIONS", "3")),
+            items=int(os.getenv("PGSTAC_BENCH_ITEMS", "1000")),
+            months=int(os.getenv("PGSTAC_BENCH_MONTHS", "12")),
+            seed=int(os.getenv("PGSTAC_BENCH_SEED", "0")),
+            rounds=int(os.getenv("PGSTAC_BENCH_ROUNDS", "3")),
+        )
+
+
+@lru_cache
+def item_generator(scale: Scale) -> ItemGenerator:
+    """Return a generator using the Planetary Computer fixtures as templates."""
+    return ItemGenerator(
+        seed=scale.seed,
+        start=START,
+        end=START + timedelta(days=scale.months * 30.44),
+    )
+
+
+def synthetic_collections(scale: Scale) -> list[dict[str, Any]]:
+    """Return the collections for the synthetic data."""
+    return item_generator(scale).collections()[: scale.collections]
+
+
+def synthetic_items(scale: Scale, collection_id: str) -> Iterator[dict[str, Any]]:
+    """Generate reproducible items for a collection."""
+    return item_generator(scale).items(scale.items, collection_id)
+
+
+def all_items(scale: Scale) -> list[dict[str, Any]]:
+    """Return every synthetic item for every collection."""
+    return [
+        item
+        for collection in synthetic_collections(scale)
+        for item in synthetic_items(scale, collection["id"])
+    ]
+
+
+def load_collections(db: PgstacDB, scale: Scale) -> None:
+    """Load the synthetic collections, partitioned by month."""
+    conn = db.connect()
+    for collection in synthetic_collections(scale):
+        conn.execute(
+            "SELECT upsert_collection(%s, 'month');",
+            (orjson.dumps(collection).decode(),),
+        )
+
+
+def stage_items(
+    db: PgstacDB,
+    items: Iterable[dict[str, Any]],
+    table: str,
+    chunksize: int = 10000,
+) -> None:
+    """Ingest items through one of the items_staging tables."""
+    conn = db.connect()
+    copy_sql = sql.SQL("COPY {} (content) FROM stdin;").format(sql.Identifier(table))
+    for chunk in chunked_iterable(items, chunksize):
+        with conn.cursor() as cur:
+            with cur.copy(copy_sql) as copy:
+                for item in chunk:
+                    copy.write_row((orjson.dumps(item).decode(),))
+
+
+@pytest.fixture(scope="session")
+def scale() -> Scale:
+    """Size of the synthetic benchmark data."""
+    return Scale.from_env()
+
+
+@pytest.fixture(scope="session")
+def bench_db(scale: Scale) -> Generator[PgstacDB, None, None]:
+    """Database loaded with the synthetic data, shared by read benchmarks."""
+    with psycopg.connect(autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE} WITH (FORCE);")
+        conn.execute(
+            f"CREATE DATABASE {BENCH_DATABASE} TEMPLATE pgstac_test_db_template;",
+        )
+
+    db = PgstacDB(dsn=f"dbname={BENCH_DATABASE}")
+    load_collections(db, scale)
+    for collection in synthetic_collections(scale):
+        stage_items(db, synthetic_items(scale, collection["id"]), "items_staging")
+    db.connect().execute("ANALYZE;")
+    RUN_INFO["pgstac_version"] = db.version
+    RUN_INFO["pg_version"] = db.pg_version
+
+    yield db
+
+    db.close()
+    with psycopg.connect(autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE} WITH (FORCE);")
+
+
+def pytest_benchmark_update_json(
+    config: Any,
+    benchmarks: Any,
+    output_json: dict[str, Any],
+) -> None:
+    """Record the versions and data scale with saved benchmark results."""
+    output_json["pgstac"] = {
+        **RUN_INFO,
+        "pypgstac_version": __version__,
+        "scale": asdict(Scale.from_env()),
+    }
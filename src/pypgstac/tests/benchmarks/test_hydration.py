@@ -0,0 +1,67 @@
+"""Benchmarks for dehydrating and hydrating the synthetic items."""
+
+from copy import deepcopy
+from typing import Any, Callable
+
+import pytest
+
+from pypgstac import hydration
+
+from .conftest import Scale, synthetic_collections, synthetic_items
+
+Items = list[dict[str, Any]]
+
+
+def _base_item_and_items(scale: Scale) -> tuple[dict[str, Any], Items]:
+    collection = synthetic_collections(scale)[0]
+    # Same shape as the base item pgstac builds from a collection.
+    base_item = {
+        "type": "Feature",
+        "stac_version": collection["stac_version"],
+        "assets": collection["item_assets"],
+        "collection": collection["id"],
+    }
+    return base_item, list(synthetic_items(scale, collection["id"]))
+
+
+@pytest.mark.benchmark(group="hydration-dehydrate")
+@pytest.mark.parametrize(
+    "func",
+    [
+        lambda base, items: [hydration.dehydrate(base, i) for i in items],
+        lambda base, items: list(hydration.dehydrate_many(base, items)),
+    ],
+    ids=["dehydrate", "dehydrate_many"],
+)
+def test_dehydrate(
+    benchmark: Any,
+    scale: Scale,
+    func: Callable[[dict[str, Any], Items], Items],
+) -> None:
+    """Dehydrate one collection worth of items."""
+    base_item, items = _base_item_and_items(scale)
+    benchmark.pedantic(func, args=(base_item, items), rounds=scale.rounds)
+
+
+@pytest.mark.benchmark(group="hydration-hydrate")
+@pytest.mark.parametrize(
+    "func",
+    [
+        lambda base, items: [hydration.hydrate_py(base, i) for i in items],
+        lambda base, items: list(hydration.hydrate_many(base, items)),
+    ],
+    ids=["hydrate_py", "hydrate_many"],
+)
+def test_hydrate(
+    benchmark: Any,
+    scale: Scale,
+    func: Callable[[dict[str, Any], Items], Items],
+) -> None:
+    """Hydrate one collection worth of dehydrated items."""
+    base_item, items = _base_item_and_items(scale)
+    dehydrated = [hydration.dehydrate(base_item, i) for i in items]
+
+    def setup() -> Any:
+        return (base_item, deepcopy(dehydrated)), {}
+
+    benchmark.pedantic(func, setup=setup, rounds=scale.rounds)
@@ -0,0 +1,59 @@
+"""Benchmarks for loading items into pgstac."""
+
+from copy import deepcopy
+from typing import Any
+
+import pytest
+
+from pypgstac.db import PgstacDB
+from pypgstac.load import Loader, Methods
+
+from .conftest import Scale, all_items, load_collections, stage_items
+
+STAGING_TABLES = ("items_staging", "items_staging_ignore", "items_staging_upsert")
+
+
+@pytest.mark.benchmark(group="ingest-load_items")
+@pytest.mark.parametrize("method", list(Methods), ids=[m.value for m in Methods])
+def test_load_items(
+    benchmark: Any,
+    db: PgstacDB,
+    loader: Loader,
+    scale: Scale,
+    method: Methods,
+) -> None:
+    """Load the synthetic items with each insert mode."""
+    load_collections(db, scale)
+    items = all_items(scale)
+    if method != Methods.insert:
+        # Every other mode is measured against items that already exist.
+        loader.load_items(iter(deepcopy(items)), insert_mode=Methods.insert)
+
+    def setup() -> Any:
+        if method == Methods.insert:
+            db.connect().execute("DELETE FROM items;")
+        return (iter(deepcopy(items)),), {"insert_mode": method}
+
+    benchmark.pedantic(loader.load_items, setup=setup, rounds=scale.rounds)
+
+
+@pytest.mark.benchmark(group="ingest-staging")
+@pytest.mark.parametrize("table", STAGING_TABLES)
+def test_stage_items(
+    benchmark: Any,
+    db: PgstacDB,
+    scale: Scale,
+    table: str,
+) -> None:
+    """Load the synthetic items through the items_staging tables."""
+    load_collections(db, scale)
+    items = all_items(scale)
+    if table != "items_staging":
+        stage_items(db, items, "items_staging")
+
+    def setup() -> Any:
+        if table == "items_staging":
+            db.connect().execute("DELETE FROM items;")
+        return (db, items, table), {}
+
+    benchmark.pedantic(stage_items, setup=setup, rounds=scale.rounds)
@@ -0,0 +1,149 @@
+"""Benchmarks for searching the synthetic items."""
+
+from typing import Any
+
+import orjson
+import pytest
+from psycopg import sql
+
+from pypgstac.db import PgstacDB
+
+from .conftest import Scale, synthetic_collections
+
+SORTS = {
+    "datetime": {},
+    "cloud_cover": {
+        "sortby": [{"field": "properties.eo:cloud_cover", "direction": "desc"}],
+    },
+}
+FIELDS = {
+    "all": None,
+    "include": {"include": ["id", "properties.datetime"]},
+    "include_geometry": {
+        "include": ["id", "geometry", "properties.eo:cloud_cover"],
+    },
+    "exclude": {"exclude": ["assets", "links"]},
+}
+TILE = "ST_MakeEnvelope(-20, -20, 20, 20, 4326)"
+
+
+@pytest.mark.benchmark(group="search-search_page")
+@pytest.mark.parametrize("fields", FIELDS.values(), ids=FIELDS.keys())
+@pytest.mark.parametrize("sort", SORTS.values(), ids=SORTS.keys())
+def test_search_page(
+    benchmark: Any,
+    bench_db: PgstacDB,
+    sort: dict[str, Any],
+    fields: dict[str, Any] | None,
+) -> None:
+    """Fetch a first page sorted by datetime or by a property."""
+    search = {"filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]}}
+    benchmark(bench_db.search_page, {**search, **sort}, 100, fields=fields)
+
+
+PAGE_STATEMENTS = sql.SQL(
+    r"SELECT name FROM pg_prepared_statements WHERE name LIKE 'pgstac\_page\_%'",
+)
+
+
+def planning_ms(db: PgstacDB, search: dict[str, Any], prepared: bool) -> float:
+    """Return the server planning time of the row query search_page runs.
+
+    The query is the statement search_page prepares for the search. Without
+    prepared_searches every execution is planned with its values, which
+    force_custom_plan reproduces; with it the plan cache may switch to a
+    generic plan after a few executions, as it does in a long lived session.
+    """
+    conn = db.connect()
+    for (name,) in conn.execute(PAGE_STATEMENTS).fetchall():
+        conn.execute(sql.SQL("DEALLOCATE {}").format(sql.Identifier(name)))
+    conf = {**search.get("conf", {}), "prepared_searches": True}
+    db.search_page({**search, "conf": conf}, 100)
+    row = conn.execute(PAGE_STATEMENTS).fetchone()
+    if row is None:
+        raise RuntimeError("search_page did not prepare a row query.")
+    explain = sql.SQL(
+        "EXPLAIN (SUMMARY, FORMAT JSON) EXECUTE {}({}, {}, {}, {})"
+    ).format(
+        sql.Identifier(row[0]),
+        sql.Literal("-infinity"),
+        sql.Literal("infinity"),
+        sql.Literal(101),
+        sql.Literal(None),
+    )
+    if prepared:
+        for _ in range(5):
+            conn.execute(explain)
+    else:
+        conn.execute("SET plan_cache_mode TO force_custom_plan")
+    try:
+        plan = conn.execute(explain).fetchone()
+    finally:
+        if not prepared:
+            conn.execute("RESET plan_cache_mode")
+    if plan is None:
+        raise RuntimeError("EXPLAIN returned no plan.")
+    return float(plan[0][0]["Planning Time"])
+
+
+@pytest.mark.benchmark(group="search-prepared")
+@pytest.mark.parametrize("prepared", [False, True], ids=["execute", "prepared"])
+def test_search_page_prepared(
+    benchmark: Any,
+    bench_db: PgstacDB,
+    prepared: bool,
+) -> None:
+    """Page through a search with the row queries planned per request or prepared."""
+    search = {
+        "filter": {"op": "<", "args": [{"property": "eo:cloud_cover"}, 50]},
+        "conf": {"prepared_searches": prepared},
+    }
+
+    def pages() -> None:
+        token = None
+        for _ in range(3):
+            token = bench_db.search_page(search, 100, token).next_token
+            if token is None:
+                return
+
+    benchmark.extra_info["planning_ms"] = planning_ms(bench_db, search, prepared)
+    benchmark(pages)
+
+
+@pytest.mark.benchmark(group="search-context")
+@pytest.mark.parametrize("context", ["off", "auto", "on"])
+def test_search_context(
+    benchmark: Any,
+    bench_db: PgstacDB,
+    scale: Scale,
+    context: str,
+) -> None:
+    """Search with each of the counting modes."""
+    search = {
+        "collections": [synthetic_collections(scale)[0]["id"]],
+        "limit": 100,
+        "conf": {"context": context},
+    }
+    benchmark(bench_db.search, search, raw=True)
+
+
+@pytest.mark.benchmark(group="search-collection_search")
+def test_collection_search(benchmark: Any, bench_db: PgstacDB) -> None:
+    """Search the collections."""
+    benchmark(lambda: list(bench_db.func("collection_search", {})))
+
+
+@pytest.mark.benchmark(group="search-geometrysearch")
+@pytest.mark.parametrize("fields", FIELDS.values(), ids=FIELDS.keys())
+def test_geometrysearch(
+    benchmark: Any,
+    bench_db: PgstacDB,
+    fields: dict[str, Any] | None,
+) -> None:
+    """Fill a tile from a registered search."""
+    queryhash = bench_db.query_one("SELECT hash FROM search_query('{}');")
+    benchmark(
+        bench_db.query_one,
+        f"SELECT geometrysearch({TILE}, %s, %s::jsonb)::text;",
+        (queryhash, orjson.dumps(fields).decode() if fields else None),
+    )
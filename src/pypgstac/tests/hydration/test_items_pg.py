@@ -0,0 +1,96 @@
+"""Test client side hydration against content_hydrate in PgSTAC."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+from pypgstac.db import PgstacDB
+from pypgstac.items import ItemHydrator
+from pypgstac.load import Loader, Methods
+
+HERE = Path(__file__).parent
+TEST_DATA_DIR = HERE.parent.parent.parent / "pgstac" / "tests" / "testdata"
+PC_DIR = TEST_DATA_DIR / "planetary-computer"
+PC_COLLECTIONS = PC_DIR / "collections.ndjson"
+PC_ITEMS = sorted((PC_DIR / "data").glob("*/items.ndjson"))
+
+FIELDS: list[dict[str, Any]] = [
+    {},
+    {"include": ["id", "properties.gsd", "properties.datetime"]},
+    {"include": ["assets", "links", "geometry.coordinates"]},
+    {"exclude": ["assets", "links"]},
+    {"exclude": ["geometry", "properties.proj:code", "assets.image.href"]},
+]
+
+
+@pytest.fixture
+def pc_db(db: PgstacDB, loader: Loader) -> PgstacDB:
+    """Database with the planetary computer fixtures loaded through staging."""
+    loader.load_collections(str(PC_COLLECTIONS), insert_mode=Methods.upsert)
+    conn = db.connect()
+    with conn.cursor() as cur:
+        for items in PC_ITEMS:
+            with cur.copy("COPY items_staging (content) FROM stdin;") as copy:
+                with open(items) as f:
+                    for line in f:
+                        copy.write_row((line.strip(),))
+    return db
+
+
+@pytest.mark.parametrize("fields", FIELDS)
+def test_client_hydrate_parity(pc_db: PgstacDB, fields: dict[str, Any]) -> None:
+    """Test that client side hydration matches content_hydrate."""
+    hydrator = ItemHydrator(pc_db, cache_size=8)
+    rows = list(
+        pc_db.query(
+            f"SELECT {hydrator.select_list(fields)} FROM items i ORDER BY i.id;",
+            row_factory=dict_row,
+        ),
+    )
+    assert rows
+    assert any(r["fragment_id"] is not None for r in rows)
+
+    expected = [
+        r[0]
+        for r in pc_db.query(
+            "SELECT content_hydrate(i, %s) FROM items i ORDER BY i.id;",
+            (Jsonb(fields),),
+        )
+    ]
+    assert hydrator.hydrate_rows(rows, fields) == expected
+
+
+@pytest.mark.parametrize("fields", FIELDS)
+def test_fields_projection_parity(pc_db: PgstacDB, fields: dict[str, Any]) -> None:
+    """Test that the compiled fields projection matches content_hydrate."""
+    projection = pc_db.query_one("SELECT fields_projection(%s);", (Jsonb(fields),))
+    projected = [
+        r[0]
+        for r in pc_db.query(
+            f"""
+            SELECT {projection} FROM items i, LATERAL (
+                SELECT page_fragments(ARRAY[i]) -> (i.fragment_id::text) AS frag
+            ) fr ORDER BY i.id;
+            """,
+        )
+    ]
+    expected = [
+        r[0]
+        for r in pc_db.query(
+            "SELECT content_hydrate(i, %s) FROM items i ORDER BY i.id;",
+            (Jsonb(fields),),
+        )
+    ]
+    assert projected == expected
+
+
+def test_stream_search_client_hydrate(pc_db: PgstacDB) -> None:
+    """Test streaming with client side hydration matches server hydration."""
+    search = {"limit": 50, "fields": {"exclude": ["links"]}}
+    hydrator = ItemHydrator(pc_db)
+    client = list(pc_db.stream_search(search, limit=50, hydrator=hydrator))
+    server = list(pc_db.stream_search(search, limit=50))
+    assert client == server
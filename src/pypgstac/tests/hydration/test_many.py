@@ -0,0 +1,120 @@
+"""Test batch hydration with a compiled base item."""
+
+import json
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from pypgstac import hydration
+
+from .test_dehydrate import TestDehydrate as TDehydrate
+from .test_hydrate import TestHydrate as THydrate
+
+HERE = Path(__file__).parent
+HYDRATION_DIR = HERE / ".." / "data-files" / "hydration"
+FIXTURES = {
+    "landsat-c2-l1": "LM04_L1GS_001001_19830527_02_T2.json",
+    "sentinel-1-grd": (
+        "S1A_IW_GRDH_1SDV_20220428T034417_20220428T034442_042968_05213C.json"
+    ),
+}
+BENCHMARK_ITEMS = 1000
+
+
+class TestHydrateMany(THydrate):
+    """Test hydrate_many against hydrate_py."""
+
+    def hydrate(
+        self,
+        base_item: Dict[str, Any],
+        item: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        expected = hydration.hydrate_py(deepcopy(base_item), deepcopy(item))
+        base_copy = deepcopy(base_item)
+        [hydrated] = hydration.hydrate_many(base_item, [deepcopy(item)])
+        assert hydrated == expected
+        assert base_item == base_copy
+        return hydrated
+
+
+class TestDehydrateMany(TDehydrate):
+    """Test dehydrate_many against dehydrate."""
+
+    def dehydrate(
+        self,
+        base_item: Dict[str, Any],
+        item: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        [dehydrated] = hydration.dehydrate_many(base_item, [item])
+        assert dehydrated == hydration.dehydrate(base_item, item)
+        return dehydrated
+
+
+def test_hydrate_many_does_not_share_base_values() -> None:
+    """Test that hydrated items can be mutated without changing the base item."""
+    base_item = {"assets": {"data": {"roles": ["data"]}}, "type": "Feature"}
+    first, second = hydration.hydrate_many(base_item, [{}, {}])
+    first["assets"]["data"]["roles"].append("metadata")
+    assert second["assets"]["data"]["roles"] == ["data"]
+    assert base_item["assets"]["data"]["roles"] == ["data"]
+
+
+def _fixture(collection_id: str) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    with open(HYDRATION_DIR / "collections" / f"{collection_id}.json") as f:
+        collection = json.load(f)
+    item_file = HYDRATION_DIR / "raw-items" / collection_id / FIXTURES[collection_id]
+    with open(item_file) as f:
+        item = json.load(f)
+    # Same shape as the base item pgstac builds from a collection.
+    base_item = {
+        "type": "Feature",
+        "stac_version": collection["stac_version"],
+        "assets": collection.get("item_assets", {}),
+        "collection": collection["id"],
+    }
+    return base_item, [deepcopy(item) for _ in range(BENCHMARK_ITEMS)]
+
+
+@pytest.mark.benchmark(group="dehydrate")
+@pytest.mark.parametrize("collection_id", FIXTURES)
+@pytest.mark.parametrize(
+    "func",
+    [
+        lambda base, items: [hydration.dehydrate(base, i) for i in items],
+        lambda base, items: list(hydration.dehydrate_many(base, items)),
+    ],
+    ids=["dehydrate", "dehydrate_many"],
+)
+def test_benchmark_dehydrate(
+    benchmark: Any,
+    collection_id: str,
+    func: Callable[[Dict[str, Any], List[Dict[str, Any]]], List[Dict[str, Any]]],
+) -> None:
+    base_item, items = _fixture(collection_id)
+    benchmark(func, base_item, items)
+
+
+@pytest.mark.benchmark(group="hydrate")
+@pytest.mark.parametrize("collection_id", FIXTURES)
+@pytest.mark.parametrize(
+    "func",
+    [
+        lambda base, items: [hydration.hydrate_py(base, i) for i in items],
+        lambda base, items: list(hydration.hydrate_many(base, items)),
+    ],
+    ids=["hydrate_py", "hydrate_many"],
+)
+def test_benchmark_hydrate(
+    benchmark: Any,
+    collection_id: str,
+    func: Callable[[Dict[str, Any], List[Dict[str, Any]]], List[Dict[str, Any]]],
+) -> None:
+    base_item, items = _fixture(collection_id)
+    dehydrated = [hydration.dehydrate(base_item, i) for i in items]
+
+    def setup() -> Any:
+        return (base_item, deepcopy(dehydrated)), {}
+
+    benchmark.pedantic(func, setup=setup, rounds=10)
@@ -0,0 +1,119 @@
+"""Tests for the pypgstac ingest daemon."""
+
+import shutil
+from pathlib import Path
+
+from pypgstac.daemon import IngestDaemon, is_spool_file
+from pypgstac.db import PgstacDB
+from pypgstac.load import Loader, Methods
+
+HERE = Path(__file__).parent
+TEST_DATA_DIR = HERE.parent.parent / "pgstac" / "tests" / "testdata"
+TEST_COLLECTIONS = TEST_DATA_DIR / "collections.ndjson"
+TEST_ITEMS = TEST_DATA_DIR / "items_private.ndjson"
+
+
+def _count(db: PgstacDB) -> int:
+    return db.query_one("SELECT count(*) FROM items;")
+
+
+def test_daemon_stream_batches(db: PgstacDB, loader: Loader) -> None:
+    """Test that the daemon flushes a stream in size bound batches."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+
+    daemon = IngestDaemon(db, max_items=30, max_wait=10, poll_interval=0.1)
+    metrics = daemon.run(str(TEST_ITEMS))
+
+    assert _count(db) == 100
+    assert metrics.items == 100
+    assert metrics.batches == 4
+    assert metrics.rejected == 0
+    assert metrics.failed_batches == 0
+
+
+def test_daemon_finish_file(tmp_path: Path) -> None:
+    """Test that finished spool files are moved to done/ or failed/."""
+    for sub in ("done", "failed"):
+        (tmp_path / sub).mkdir()
+    good = tmp_path / "good.ndjson"
+    bad = tmp_path / "bad.ndjson"
+    good.write_text("{}\n")
+    bad.write_text("{not json\n")
+
+    daemon = IngestDaemon(PgstacDB(dsn=""))
+    daemon._seen |= {good, bad}
+    daemon._finish_file(good, True)
+    daemon._finish_file(bad, False)
+
+    assert not good.exists()
+    assert not bad.exists()
+    assert (tmp_path / "done" / "good.ndjson").read_text() == "{}\n"
+    assert (tmp_path / "failed" / "bad.ndjson").exists()
+    assert not daemon._seen
+
+
+def test_daemon_spool(db: PgstacDB, loader: Loader, tmp_path: Path) -> None:
+    """Test that spool files are loaded and moved once committed."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    shutil.copy(TEST_ITEMS, tmp_path / "items.ndjson")
+    (tmp_path / "bad.ndjson").write_text("{not json\n")
+
+    daemon = IngestDaemon(
+        db,
+        insert_mode=Methods.upsert,
+        max_wait=0.1,
+        poll_interval=0.1,
+        metrics_file=str(tmp_path / "metrics.json"),
+    )
+    original_finish = daemon._finish_file
+
+    def finish(path: Path, ok: bool) -> None:
+        original_finish(path, ok)
+        if not any(is_spool_file(p) for p in tmp_path.iterdir()):
+            daemon.stop()
+
+    (tmp_path / ".partial.ndjson").write_text("{not json\n")
+    (tmp_path / "partial.ndjson.tmp").write_text("{not json\n")
+    daemon._finish_file = finish  # type: ignore[method-assign]
+    daemon.run(str(tmp_path))
+
+    assert _count(db) == 100
+    assert (tmp_path / ".partial.ndjson").exists()
+    assert (tmp_path / "partial.ndjson.tmp").exists()
+    assert (tmp_path / "done" / "items.ndjson").exists()
+    assert (tmp_path / "failed" / "bad.ndjson").exists()
+    assert (tmp_path / "metrics.json").exists()
+
+
+def test_is_spool_file(tmp_path: Path) -> None:
+    """Test that only completed, renamed spool files are read."""
+    for name in ("a.json", "b.ndjson", ".c.ndjson", "d.ndjson.tmp", "e.txt"):
+        (tmp_path / name).write_text("{}\n")
+    (tmp_path / "f.ndjson").mkdir()
+
+    found = sorted(p.name for p in tmp_path.iterdir() if is_spool_file(p))
+    assert found == ["a.json", "b.ndjson"]
+
+
+def test_daemon_spool_file_is_atomic(
+    db: PgstacDB,
+    loader: Loader,
+    tmp_path: Path,
+) -> None:
+    """Test that a spool file failing part way through commits none of its items."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    lines = TEST_ITEMS.read_text().splitlines()
+    (tmp_path / "partial.ndjson").write_text("\n".join([*lines, "{not json"]) + "\n")
+
+    daemon = IngestDaemon(db, max_items=30, max_wait=0.1, poll_interval=0.1)
+    original_finish = daemon._finish_file
+
+    def finish(path: Path, ok: bool) -> None:
+        original_finish(path, ok)
+        daemon.stop()
+
+    daemon._finish_file = finish  # type: ignore[method-assign]
+    daemon.run(str(tmp_path))
+
+    assert _count(db) == 0
+    assert (tmp_path / "failed" / "partial.ndjson").exists()
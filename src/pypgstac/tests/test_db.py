@@ -0,0 +1,252 @@
+"""Tests for pypgstac database access."""
+
+import asyncio
+from pathlib import Path
+
+import orjson
+import pytest
+
+from pypgstac.db import (
+    AsyncPgstacDB,
+    PgstacDB,
+    keyset_decode,
+    keyset_encode,
+    settings,
+)
+from pypgstac.load import Loader, Methods
+
+HERE = Path(__file__).parent
+TEST_DATA_DIR = HERE.parent.parent / "pgstac" / "tests" / "testdata"
+TEST_COLLECTIONS = TEST_DATA_DIR / "collections.ndjson"
+TEST_ITEMS = TEST_DATA_DIR / "items_private.ndjson"
+
+
+def test_query_stream(db: PgstacDB) -> None:
+    """Test streaming a large result through a server-side cursor."""
+    rows = db.query_stream("SELECT generate_series(1, 10000)", itersize=500)
+    assert sum(r[0] for r in rows) == sum(range(1, 10001))
+
+
+def test_query_stream_flag(db: PgstacDB) -> None:
+    """Test that query(stream=True) matches a buffered query."""
+    q = "SELECT generate_series(1, 100)"
+    assert list(db.query(q, stream=True, itersize=7)) == list(db.query(q))
+
+
+def test_func_stream(db: PgstacDB) -> None:
+    """Test streaming a set returning function."""
+    rows = list(db.func_stream("generate_series", 1, 50, itersize=10))
+    assert [r[0] for r in rows] == list(range(1, 51))
+
+
+def test_async_db(db: PgstacDB) -> None:
+    """Test concurrent queries sharing an async pool."""
+
+    async def run() -> None:
+        async with AsyncPgstacDB() as adb:
+            assert await adb.query_one("SHOW application_name;") == "pgstac"
+            results = await asyncio.gather(
+                *(adb.query_one("SELECT %s::int;", (i,)) for i in range(10)),
+            )
+            assert results == list(range(10))
+            out = orjson.loads(await adb.search({"limit": 1}))
+            assert out["type"] == "FeatureCollection"
+
+    asyncio.run(run())
+
+
+def test_search_raw(db: PgstacDB, loader: Loader) -> None:
+    """Test that raw search returns the same document as a parsed search."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    q = {"limit": 5}
+    assert orjson.loads(db.search(q, raw=True)) == orjson.loads(db.search(q))
+
+
+def test_search_page_raw(db: PgstacDB, loader: Loader) -> None:
+    """Test that search_page returns raw features with typed paging values."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    page = db.search_page({}, limit=10)
+    assert isinstance(page.features, bytes)
+    assert len(orjson.loads(page.features)) == page.number_returned == 10
+    assert page.next_token is not None
+    assert page.prev_token is None
+
+    nextpage = db.search_page({}, limit=10, token=page.next_token)
+    assert nextpage.prev_token is not None
+    first_id = orjson.loads(page.features)[0]["id"]
+    assert orjson.loads(nextpage.features)[0]["id"] != first_id
+
+
+def test_keyset_encode_roundtrip() -> None:
+    """Test keyset tokens round trip, including NULL values and long keys."""
+    values = ["2011-08-16T00:00:00+00:00", None, "x" * 200, "pgstac-test-collection"]
+    token = keyset_encode(values)
+    assert "\n" in token
+    assert keyset_decode(token) == values
+
+
+def test_stream_search(db: PgstacDB, loader: Loader) -> None:
+    """Test that streaming matches search_page results and tokens."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+
+    streamed = [i["id"] for i in db.stream_search({})]
+    assert len(streamed) == 100
+    assert len(set(streamed)) == 100
+
+    page = db.search_page({}, limit=10)
+    stream = db.stream_search({}, limit=10)
+    items = list(stream)
+    assert [i["id"] for i in items] == [i["id"] for i in orjson.loads(page.features)]
+    assert stream.number_returned == 10
+    assert stream.next_token == f"next:{page.next_token}"
+    assert stream.prev_token is None
+    assert stream.number_matched == page.number_matched
+
+    nextstream = db.stream_search({}, token=stream.next_token, limit=10)
+    nextitems = list(nextstream)
+    assert [i["id"] for i in nextitems] == streamed[10:20]
+    assert nextstream.prev_token is not None
+
+    prevstream = db.stream_search({}, token=nextstream.prev_token, limit=10)
+    assert [i["id"] for i in prevstream] == streamed[:10]
+
+
+def test_stream_search_close(db: PgstacDB, loader: Loader) -> None:
+    """Test that closing a stream early deallocates its band query."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    statements = r"""
+        SELECT count(*) FROM pg_prepared_statements
+        WHERE name LIKE 'pgstac\_band\_%';
+    """
+
+    with db.stream_search({}, limit=50) as stream:
+        items = iter(stream)
+        next(items)
+        assert db.query_one(statements) == 1
+    assert db.query_one(statements) == 0
+    items.close()
+
+
+def test_replica_routing(db: PgstacDB, loader: Loader) -> None:
+    """Test that read only calls use a readonly replica connection."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    searches = db.query_one("SELECT count(*) FROM searches;")
+
+    replicadb = PgstacDB(replica_dsns=[db.dsn, db.dsn])
+    try:
+        out = orjson.loads(replicadb.search({"limit": 5, "ids": ["replica-test"]}))
+        assert out["type"] == "FeatureCollection"
+        assert replicadb.replica_pools
+        assert db.query_one("SELECT count(*) FROM searches;") == searches
+        page = replicadb.search_page({}, limit=10)
+        assert page.number_returned == 10
+        with replicadb.replica_pools[0].connection() as conn:
+            assert conn.execute("SELECT readonly();").fetchone() == (True,)
+        assert db.query_one("SELECT readonly();") is False
+    finally:
+        replicadb.close()
+
+
+def test_replica_fallback(
+    db: PgstacDB,
+    loader: Loader,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that calls fall back to the primary when a replica is down."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    monkeypatch.setattr(settings, "db_replica_timeout", 0.5)
+
+    replicadb = PgstacDB(
+        replica_dsns=["host=127.0.0.1 port=1 connect_timeout=1"],
+    )
+    try:
+        page = replicadb.search_page({}, limit=10)
+        assert page.number_returned == 10
+    finally:
+        replicadb.close()
+
+
+def test_func_many(db: PgstacDB, loader: Loader) -> None:
+    """Test that pipelined calls return the same results, in order."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    ids = [r[0] for r in db.query("SELECT id FROM items ORDER BY id LIMIT 5;")]
+
+    calls: list[tuple[str, ...]] = [
+        ("get_item", i, "pgstac-test-collection") for i in reversed(ids)
+    ]
+    calls.append(("get_collection", "pgstac-test-collection"))
+    results = db.func_many(calls)
+
+    assert len(results) == len(calls)
+    assert [r[0][0]["id"] for r in results[:-1]] == list(reversed(ids))
+    assert results[-1][0][0]["id"] == "pgstac-test-collection"
+    assert results[0][0][0] == next(db.func("get_item", ids[-1]))[0]
+
+    raw = db.func_many([("get_item", ids[0])], raw_json=True)
+    assert orjson.loads(raw[0][0][0])["id"] == ids[0]
+
+
+def test_async_func_many(db: PgstacDB, loader: Loader) -> None:
+    """Test pipelined calls on the async pool."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+
+    async def run() -> None:
+        async with AsyncPgstacDB() as adb:
+            results = await adb.func_many(
+                [("get_collection", "pgstac-test-collection")] * 3,
+            )
+            assert [r[0][0]["id"] for r in results] == ["pgstac-test-collection"] * 3
+
+    asyncio.run(run())
+
+
+def test_get_items(db: PgstacDB, loader: Loader) -> None:
+    """Test fetching many items by id in the order requested."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    ids = [r[0] for r in db.query("SELECT id FROM items ORDER BY id LIMIT 20;")]
+    wanted = list(reversed(ids)) + ["does-not-exist"]
+
+    items = db.get_items(wanted)
+    assert [i["id"] for i in items] == list(reversed(ids))
+    assert items[0] == next(db.func("get_item", ids[-1]))[0]
+
+    paired = db.get_items(ids[:2], ["pgstac-test-collection", "not-a-collection"])
+    assert [i["id"] for i in paired] == ids[:1]
+    assert db.get_items([]) == []
+
+
+def test_async_get_pool_concurrent(db: PgstacDB) -> None:
+    """Test that concurrent first calls to get_pool share one pool."""
+
+    async def run() -> None:
+        adb = AsyncPgstacDB()
+        try:
+            pools = await asyncio.gather(*(adb.get_pool() for _ in range(5)))
+            assert all(p is pools[0] for p in pools)
+        finally:
+            await adb.close()
+
+    asyncio.run(run())
+
+
+def test_async_get_items(db: PgstacDB, loader: Loader) -> None:
+    """Test that the async get_items matches the sync one."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.upsert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+    ids = [r[0] for r in db.query("SELECT id FROM items ORDER BY id LIMIT 20;")]
+    wanted = list(reversed(ids)) + ["does-not-exist"]
+
+    async def run() -> None:
+        async with AsyncPgstacDB() as adb:
+            assert await adb.get_items(wanted) == db.get_items(wanted)
+            assert await adb.get_items([]) == []
+
+    asyncio.run(run())
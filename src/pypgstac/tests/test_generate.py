@@ -0,0 +1,80 @@
+"""Tests for the synthetic item generator."""
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from pypgstac import generate
+from pypgstac.db import PgstacDB
+from pypgstac.generate import ItemGenerator
+from pypgstac.load import read_json
+from pypgstac.pypgstac import PgstacCLI
+
+START = datetime(2020, 1, 1, tzinfo=UTC)
+END = datetime(2021, 1, 1, tzinfo=UTC)
+
+
+def test_generate_reproducible() -> None:
+    """Test that the same seed and options produce the same items."""
+    generator = ItemGenerator(seed=1, time_skew=1, space_skew=0.5)
+    items = list(generator.items(30))
+    assert items == list(ItemGenerator(seed=1, time_skew=1, space_skew=0.5).items(30))
+    assert items != list(ItemGenerator(seed=2).items(30))
+    assert len({i["id"] for i in items}) == 30
+    assert {i["collection"] for i in items} == {
+        c["id"] for c in generator.collections()
+    }
+
+
+def test_generate_ranges() -> None:
+    """Test that items fall in the requested time range and collection bbox."""
+    generator = ItemGenerator(collections=["naip"], start=START, end=END)
+    [collection] = generator.collections()
+    west, south, east, north = collection["extent"]["spatial"]["bbox"][0]
+    for item in generator.items(100):
+        dt = datetime.fromisoformat(item["properties"]["datetime"])
+        assert START <= dt <= END
+        xmin, ymin, xmax, ymax = item["bbox"]
+        assert west <= xmin <= xmax <= east
+        assert south <= ymin <= ymax <= north
+
+
+def test_generate_skew() -> None:
+    """Test the asset count and property cardinality controls."""
+    generator = ItemGenerator(
+        collections=["sentinel-2-l2a"],
+        asset_skew=3,
+        cardinality=4,
+    )
+    [collection] = generator.collections()
+    items = list(generator.items(200))
+    assert min(len(i["assets"]) for i in items) < len(collection["item_assets"])
+    assert len({i["properties"]["platform"] for i in items}) <= 4
+
+
+def test_generate_requires_templates(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that templates are required when the default ones are missing."""
+    monkeypatch.setattr(generate, "DEFAULT_TEMPLATES", tmp_path / "missing")
+    with pytest.raises(ValueError, match="templates is required"):
+        ItemGenerator()
+
+
+def test_generate_load(db: PgstacDB) -> None:
+    """Test that generate loads collections and items into pgstac."""
+    cli = PgstacCLI(dsn=db.dsn)
+    cli.generate(items=300, load=True, seed=3)
+    assert db.query_one("SELECT count(*) FROM collections;") == 3
+    assert db.query_one("SELECT count(*) FROM items;") == 300
+    trunc = db.query_one("SELECT count(DISTINCT partition_trunc) FROM collections;")
+    assert trunc == 1
+
+
+def test_generate_ndjson(tmp_path: Path) -> None:
+    """Test that generate writes ndjson that reads back as the same items."""
+    out = tmp_path / "items.ndjson"
+    PgstacCLI(dsn="mock_dsn").generate(items=20, output=str(out), seed=3)
+    assert list(read_json(str(out))) == list(ItemGenerator(seed=3).items(20))
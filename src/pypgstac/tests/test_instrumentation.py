@@ -0,0 +1,83 @@
+"""Tests for database instrumentation hooks."""
+
+import asyncio
+from pathlib import Path
+
+import psycopg
+import pytest
+
+from pypgstac.db import AsyncPgstacDB, PgstacDB
+from pypgstac.instrumentation import Instrumentation, LoadEvent, QueryEvent
+from pypgstac.load import Loader, Methods
+
+HERE = Path(__file__).parent
+TEST_DATA_DIR = HERE.parent.parent / "pgstac" / "tests" / "testdata"
+TEST_COLLECTIONS = TEST_DATA_DIR / "collections.ndjson"
+TEST_ITEMS = TEST_DATA_DIR / "items.ndjson"
+
+
+class Recorder(Instrumentation):
+    """Keep every event."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.queries: list[QueryEvent] = []
+        self.loads: list[LoadEvent] = []
+
+    def query(self, event: QueryEvent) -> None:
+        self.queries.append(event)
+
+    def load(self, event: LoadEvent) -> None:
+        self.loads.append(event)
+
+
+def test_query_events(db: PgstacDB) -> None:
+    """Test that queries, function calls and searches are reported."""
+    recorder = Recorder()
+    instrumented = PgstacDB(dsn=db.dsn, instrumentation=recorder)
+    loader = Loader(db=instrumented)
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.insert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+
+    assert recorder.loads
+    assert sum(e.rows for e in recorder.loads) == 100
+    assert all(e.error is None and e.duration > 0 for e in recorder.loads)
+
+    recorder.queries.clear()
+    instrumented.search({"limit": 5})
+    list(instrumented.query("SELECT * FROM items LIMIT 3;"))
+    search, query = recorder.queries
+    assert search.name == "search"
+    assert search.rows == 1
+    assert search.bytes > 0
+    assert search.duration > 0
+    assert query.name == "query"
+    assert query.rows == 3
+
+    with pytest.raises(psycopg.errors.UndefinedFunction):
+        list(instrumented.func("get_item", "missing", "no-collection", "extra"))
+    assert recorder.queries[-1].name == "get_item"
+    assert recorder.queries[-1].error is not None
+    instrumented.close()
+
+
+def test_async_query_events(db: PgstacDB) -> None:
+    """Test that AsyncPgstacDB reports queries with their pool wait."""
+    recorder = Recorder()
+
+    async def run() -> None:
+        async with AsyncPgstacDB(dsn=db.dsn, instrumentation=recorder) as adb:
+            await adb.search({"limit": 1})
+
+    asyncio.run(run())
+    [event] = recorder.queries
+    assert event.name == "search"
+    assert event.pool_wait >= 0
+    assert event.error is None
+
+
+def test_noop_instrumentation(db: PgstacDB) -> None:
+    """Test that the default instrumentation is disabled."""
+    assert db.instrumentation.enabled is False
+    assert db.query_one("SELECT 1;") == 1
@@ -0,0 +1,35 @@
+"""Tests for the OpenTelemetry instrumentation adapter."""
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from pypgstac.db import PgstacDB
+from pypgstac.instrumentation import OpenTelemetryInstrumentation
+
+
+def test_opentelemetry_instrumentation(db: PgstacDB) -> None:
+    """Test that the OpenTelemetry adapter records client spans."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    instrumentation = OpenTelemetryInstrumentation(provider.get_tracer("test"))
+    instrumented = PgstacDB(dsn=db.dsn, instrumentation=instrumentation)
+    instrumented.search({"limit": 1})
+    instrumented.close()
+
+    [span] = exporter.get_finished_spans()
+    assert span.name == "pgstac search"
+    attributes = span.attributes
+    assert attributes is not None
+    assert attributes["db.system"] == "postgresql"
+    assert attributes["db.operation.name"] == "search"
+    assert span.start_time is not None
+    assert span.end_time is not None
+    assert span.end_time > span.start_time
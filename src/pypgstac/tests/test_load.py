@@ -12,6 +12,7 @@ from psycopg.errors import UniqueViolation
 from version_parser import Version as V
 
 from pypgstac.db import PgstacDB
+from pypgstac.hydration import dehydrate
 from pypgstac.load import Loader, Methods, __version__, read_json
 
 HERE = Path(__file__).parent
@@ -188,6 +189,33 @@ def test_load_items_delsert_succeeds(loader: Loader) -> None:
     )
 
 
+@pytest.mark.parametrize("insert_mode", [Methods.insert, Methods.upsert])
+def test_load_items_q_tsvector(loader: Loader, insert_mode: Methods) -> None:
+    """Test that the loader fills q_tsv from the hydrated properties."""
+    loader.load_collections(
+        str(TEST_COLLECTIONS),
+        insert_mode=Methods.ignore,
+    )
+    if loader.db.connection is not None:
+        loader.db.connection.execute("SET pgstac.q_tsvector TO 'true';")
+
+    loader.load_items(
+        str(TEST_ITEMS),
+        insert_mode=insert_mode,
+    )
+
+    mismatched = loader.db.query_one(
+        """
+        SELECT count(*) FROM items
+        WHERE q_tsv IS DISTINCT FROM stac_q_tsvector(
+            content_hydrate(items, '{"include": ["properties"]}'::jsonb)->'properties'
+        );
+    """,
+    )
+
+    assert mismatched == 0
+
+
 def test_partition_loads_default(loader: Loader) -> None:
     """Test pypgstac items ignore loader."""
     loader.load_collections(
@@ -312,6 +340,33 @@ def test_format_items_keys(loader: Loader) -> None:
     assert "bbox" in content_json
 
 
+def test_format_item_partition_and_content(loader: Loader) -> None:
+    """Test format_item names the partition and dehydrates against the base item."""
+    loader.load_collections(
+        str(TEST_COLLECTIONS_JSON),
+        insert_mode=Methods.ignore,
+    )
+    if loader.db.connection is not None:
+        loader.db.connection.execute(
+            """
+            UPDATE collections SET partition_trunc='month';
+        """,
+        )
+
+    item_json = next(iter(read_json(str(TEST_ITEMS))))
+    base_item, key, _ = loader.collection_json(item_json["collection"])
+    out = loader.format_item(item_json)
+
+    month = item_json["properties"]["datetime"].replace("-", "")[:6]
+    assert out["partition"] == f"_items_{key}_{month}"
+    assert out["datetime"] == item_json["properties"]["datetime"]
+
+    expected = dehydrate(base_item, item_json)
+    for k in ("id", "collection", "geometry", "private"):
+        expected.pop(k, None)
+    assert json.loads(out["content"]) == expected
+
+
 def test_s1_grd_load_and_query(loader: Loader) -> None:
     """Test pypgstac items ignore loader."""
     loader.load_collections(
@@ -0,0 +1,63 @@
+"""Tests for the concurrent tile load harness."""
+
+import asyncio
+import random
+from pathlib import Path
+
+from pypgstac.db import PgstacDB
+from pypgstac.load import Loader, Methods
+from pypgstac.tileload import (
+    TileLoadTest,
+    lonlat_to_tile,
+    percentile,
+    tile_session,
+)
+
+HERE = Path(__file__).parent
+TEST_DATA_DIR = HERE.parent.parent / "pgstac" / "tests" / "testdata"
+TEST_COLLECTIONS = TEST_DATA_DIR / "collections.ndjson"
+TEST_ITEMS = TEST_DATA_DIR / "items.ndjson"
+
+
+def test_tile_session() -> None:
+    """Test that sessions zoom in on a point and pan at every zoom."""
+    assert lonlat_to_tile(0, 0, 1) == (1, 1)
+    assert lonlat_to_tile(-180, 90, 3) == (0, 0)
+    tiles = tile_session(-87.75, 30.69, 10, 12, random.Random(0), pans=2)
+    assert [z for _, _, z in tiles] == sorted(z for _, _, z in tiles)
+    for z in (10, 11, 12):
+        zoom_tiles = [t for t in tiles if t[2] == z]
+        assert len(zoom_tiles) == len(set(zoom_tiles)) > 12
+        assert zoom_tiles[0][:2] == lonlat_to_tile(-87.75, 30.69, z)
+    assert tiles == tile_session(-87.75, 30.69, 10, 12, random.Random(0), pans=2)
+
+
+def test_percentile() -> None:
+    """Test nearest rank percentiles."""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0
+
+
+def test_tileload(db: PgstacDB, loader: Loader) -> None:
+    """Test replaying tile sessions against a registered search."""
+    loader.load_collections(str(TEST_COLLECTIONS), insert_mode=Methods.insert)
+    loader.load_items(str(TEST_ITEMS), insert_mode=Methods.insert)
+
+    async def run() -> dict:
+        test = TileLoadTest(dsn=db.dsn, concurrency=3)
+        try:
+            await test.register({"collections": ["pgstac-test-collection"]})
+            report = await test.run_sessions(sessions=2, minzoom=10, maxzoom=11)
+        finally:
+            await test.close()
+        return report.as_dict()
+
+    report = asyncio.run(run())
+    assert report["requests"] > 0
+    assert report["errors"] == 0
+    assert report["p50"] <= report["p95"] <= report["p99"] <= report["max"]
+    assert report["mean_returned"] > 0
+    assert report["mean_scanned"] >= report["mean_returned"]
+    assert set(report["by_zoom"]) == {"10", "11"}